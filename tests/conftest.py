@@ -37,3 +37,17 @@ pytest_plugins = [
     'tests.fixtures.fixture_user',
     'tests.fixtures.fixture_data',
 ]
+
+import pytest
+
+
+@pytest.fixture(autouse=True, scope='session')
+def temporary_caches(tmp_path_factory):
+    # Файловые кэши тестов во временном каталоге (core.testing).
+    from django.test import override_settings
+
+    from core.testing import temporary_caches as caches_in
+
+    root = tmp_path_factory.mktemp('caches')
+    with override_settings(CACHES=caches_in(str(root))):
+        yield
@@ -0,0 +1,133 @@
+import json
+from datetime import timedelta
+
+from django.contrib.auth import get_user_model
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive_posts
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class PostApiTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestApi')
+        cls.group = Group.objects.create(
+            title='LucyTestGroup',
+            slug='Testovaya',
+            description='Эта группа создана для тестирования'
+        )
+        cls.posts = [
+            Post.objects.create(
+                text=f'Тестовый текст поста_{i}', author=cls.user,
+                group=cls.group if i % 2 else None
+            )
+            for i in range(15)
+        ]
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def get_json(self, url, status=200, **params):
+        response = self.guest_client.get(url, params)
+        self.assertEqual(response.status_code, status)
+        content = (b''.join(response.streaming_content)
+                   if response.streaming else response.content)
+        return json.loads(content)
+
+    def test_cursor_walk(self):
+        """Курсор ведет по всем постам без повторов, новые первыми."""
+        ids = []
+        url, params = reverse('api:posts'), {'limit': 4}
+        while url:
+            document = self.get_json(url, **params)
+            ids.extend(post['id'] for post in document['results'])
+            url, params = document['next'], {}
+        self.assertEqual(ids, [post.id for post in reversed(self.posts)])
+
+    def test_scoped_lists(self):
+        """Списки по группе и по автору."""
+        document = self.get_json(
+            reverse('api:group_posts', args=[self.group.slug])
+        )
+        self.assertEqual({post['group'] for post in document['results']},
+                         {self.group.slug})
+        document = self.get_json(
+            reverse('api:author_posts', args=[self.user.username])
+        )
+        self.assertEqual({post['author'] for post in document['results']},
+                         {self.user.username})
+        self.get_json(reverse('api:group_posts', args=['missing']), 404)
+        self.get_json(reverse('api:author_posts', args=['missing']), 404)
+
+    def test_sparse_fields(self):
+        """fields= убирает поля из ответа и из SQL."""
+        with CaptureQueriesContext(connection) as queries:
+            document = self.get_json(reverse('api:posts'), fields='id,group')
+        self.assertEqual(set(document['results'][0]), {'id', 'group'})
+        sql = queries[0]['sql']
+        self.assertNotIn('"text"', sql)
+        self.assertNotIn('auth_user', sql)
+        self.get_json(reverse('api:posts'), 400, fields='id,password')
+
+    def test_fixed_query_count(self):
+        """Число запросов не зависит от размера страницы."""
+        cases = (
+            (reverse('api:posts'), {'limit': 100}, 1),
+            (reverse('api:group_posts', args=[self.group.slug]), {}, 2),
+            (reverse('api:author_posts', args=[self.user.username]), {}, 2),
+            (reverse('api:post_detail', args=[self.posts[0].id]), {}, 1),
+            (reverse('api:post_batch'), {'ids': '1,2,3,4,5'}, 1),
+        )
+        for url, params, queries in cases:
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    self.get_json(url, **params)
+
+    def test_author_with_archive_query_count(self):
+        """У автора с архивом нет лишнего COUNT(*): автор и две ленты."""
+        author = User.objects.create_user(username='LucyTestApiArchive')
+        old = timezone.now() - timedelta(days=400)
+        for i in range(3):
+            post = Post.objects.create(text=f'Пост {i}', author=author)
+            if i < 2:
+                Post.objects.filter(id=post.id).update(pub_date=old)
+        archive_posts(timezone.now() - timedelta(days=365))
+        url = reverse('api:author_posts', args=[author.username])
+        with CaptureQueriesContext(connection) as queries:
+            document = self.get_json(url)
+        self.assertEqual(len(document['results']), 3)
+        self.assertEqual(len(queries), 3)
+        self.assertNotIn('COUNT(', ' '.join(q['sql'] for q in queries))
+
+    def test_detail(self):
+        """Один пост со всеми полями."""
+        post = self.posts[1]
+        document = self.get_json(reverse('api:post_detail', args=[post.id]))
+        self.assertEqual(document['text'], post.text)
+        self.assertEqual(document['group'], self.group.slug)
+        self.get_json(reverse('api:post_detail', args=[10 ** 6]), 404)
+
+    def test_batch(self):
+        """Пакет возвращает посты в порядке ids и список ненайденных."""
+        ids = [self.posts[3].id, self.posts[0].id, 10 ** 6]
+        document = self.get_json(
+            reverse('api:post_batch'), ids=','.join(map(str, ids))
+        )
+        self.assertEqual([post['id'] for post in document['results']],
+                         ids[:2])
+        self.assertEqual(document['missing'], [10 ** 6])
+        self.get_json(reverse('api:post_batch'), 400, ids='1,x')
+        self.get_json(reverse('api:post_batch'), 400)
+
+    def test_streamed(self):
+        """Списки отдаются потоком."""
+        response = self.guest_client.get(reverse('api:posts'))
+        self.assertTrue(response.streaming)
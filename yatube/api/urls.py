@@ -0,0 +1,17 @@
+from django.urls import path
+
+from . import views
+
+app_name = 'api'
+
+urlpatterns = [
+    path('posts/', views.post_list, name='posts'),
+    path('posts/batch/', views.post_batch, name='post_batch'),
+    path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
+    path('groups/<slug:slug>/posts/', views.group_posts, name='group_posts'),
+    path(
+        'authors/<str:username>/posts/',
+        views.author_posts,
+        name='author_posts'
+    ),
+]
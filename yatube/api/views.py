@@ -0,0 +1,210 @@
+from functools import wraps
+
+from django.core.serializers.json import DjangoJSONEncoder
+from django.http import JsonResponse, StreamingHttpResponse
+from django.utils.http import urlencode
+
+from core.db_router import read_from_replica
+from posts.models import (ArchivedPost, Group, Post, User,
+                          author_archived_count)
+from posts.paginators import CursorPaginator, FeedWithArchive
+from posts.views import POST_LIMIT
+
+MAX_LIMIT = 100
+BATCH_LIMIT = 100
+
+# Поле ответа -> (колонки для only(), связь для select_related, значение)
+FIELDS = {
+    'id': ((), None, lambda post: post.pk),
+    'text': (('text',), None, lambda post: post.text),
+    'pub_date': ((), None, lambda post: post.pub_date),
+    'updated': (('updated',), None, lambda post: post.updated),
+    'author': (
+        ('author__username',), 'author', lambda post: post.author.username
+    ),
+    'group': (
+        ('group__slug',), 'group',
+        lambda post: post.group.slug if post.group is not None else None
+    ),
+}
+
+encoder = DjangoJSONEncoder(ensure_ascii=False)
+
+
+class ApiError(Exception):
+    def __init__(self, detail, status=400):
+        super().__init__(detail)
+        self.detail = detail
+        self.status = status
+
+
+def api_view(view):
+    """Ошибки ApiError превращаем в JSON {"detail": ...}"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        try:
+            return view(request, *args, **kwargs)
+        except ApiError as error:
+            return JsonResponse(
+                {'detail': error.detail}, status=error.status,
+                json_dumps_params={'ensure_ascii': False}
+            )
+    return read_from_replica(wrapper)
+
+
+def parse_fields(request):
+    """?fields=id,author: отдаем и читаем из БД только эти поля"""
+    if 'fields' not in request.GET:
+        return list(FIELDS)
+    fields = [
+        field.strip() for field in request.GET['fields'].split(',')
+        if field.strip()
+    ]
+    unknown = sorted(set(fields) - set(FIELDS))
+    if unknown or not fields:
+        raise ApiError(
+            'Неизвестные поля: {}. Доступны: {}.'.format(
+                ', '.join(unknown) or '-', ', '.join(FIELDS)
+            )
+        )
+    return list(dict.fromkeys(fields))
+
+
+def parse_limit(request):
+    try:
+        limit = int(request.GET.get('limit', POST_LIMIT))
+    except ValueError:
+        raise ApiError('limit должен быть числом.')
+    if not 1 <= limit <= MAX_LIMIT:
+        raise ApiError(f'limit должен быть от 1 до {MAX_LIMIT}.')
+    return limit
+
+
+def select_fields(queryset, fields):
+    """Один запрос: нужные колонки и JOIN только для author и group"""
+    # author_id и group_id читает post_init-сигнал posts.signals.
+    columns = ['id', 'pub_date', 'author', 'group']
+    related = []
+    for field in fields:
+        field_columns, relation, _ = FIELDS[field]
+        columns.extend(field_columns)
+        if relation is not None:
+            related.append(relation)
+    if related:
+        # select_related() без аргументов присоединил бы все связи.
+        queryset = queryset.select_related(*related)
+    return queryset.only(*columns)
+
+
+def as_dict(post, fields):
+    return {field: FIELDS[field][2](post) for field in fields}
+
+
+def serialize(posts, fields):
+    for post in posts:
+        yield encoder.encode(as_dict(post, fields))
+
+
+def stream_json(head, items, tail):
+    """Отдаем документ по объектам: страница не собирается в одну строку"""
+    def chunks():
+        yield head
+        for number, item in enumerate(items):
+            yield item if number == 0 else ',' + item
+        yield tail
+    return StreamingHttpResponse(chunks(), content_type='application/json')
+
+
+def page_url(request, cursor):
+    if cursor is None:
+        return None
+    query = request.GET.copy()
+    query['cursor'] = cursor
+    return request.build_absolute_uri(
+        f'{request.path}?{urlencode(sorted(query.items()))}'
+    )
+
+
+def list_posts(request, queryset, archive=None):
+    fields = parse_fields(request)
+    posts = select_fields(queryset, fields)
+    if archive is not None:
+        posts = FeedWithArchive(posts, select_fields(archive, fields))
+    page = CursorPaginator(posts, parse_limit(request)).get_page(
+        request.GET.get('cursor')
+    )
+    tail = '],"next":{},"previous":{}}}'.format(
+        encoder.encode(page_url(request, page.next_cursor)),
+        encoder.encode(page_url(request, page.previous_cursor)),
+    )
+    return stream_json(
+        '{"results":[', serialize(page.object_list, fields), tail
+    )
+
+
+@api_view
+def post_list(request):
+    """Все посты, новые первыми; ?cursor=, ?limit=, ?fields="""
+    return list_posts(request, Post.objects.all())
+
+
+@api_view
+def group_posts(request, slug):
+    """Посты группы"""
+    group = Group.objects.filter(slug=slug).only('id').first()
+    if group is None:
+        raise ApiError('Группа не найдена.', status=404)
+    return list_posts(request, Post.objects.filter(group=group))
+
+
+@api_view
+def author_posts(request, username):
+    """Посты автора, вместе с архивом"""
+    author = User.objects.filter(username=username).select_related(
+        'post_counter'
+    ).only('id', 'post_counter__archived_count').first()
+    if author is None:
+        raise ApiError('Автор не найден.', status=404)
+    archive = None
+    if author_archived_count(author):
+        archive = ArchivedPost.objects.filter(author=author)
+    return list_posts(request, Post.objects.filter(author=author), archive)
+
+
+@api_view
+def post_detail(request, post_id):
+    """Один пост"""
+    fields = parse_fields(request)
+    for model in (Post, ArchivedPost):
+        post = select_fields(model.objects.filter(id=post_id), fields).first()
+        if post is not None:
+            break
+    else:
+        raise ApiError('Пост не найден.', status=404)
+    return JsonResponse(
+        as_dict(post, fields), json_dumps_params={'ensure_ascii': False}
+    )
+
+
+@api_view
+def post_batch(request):
+    """Посты по списку ?ids=1,2,3 одним запросом, в порядке ids"""
+    fields = parse_fields(request)
+    try:
+        ids = [int(pk) for pk in request.GET.get('ids', '').split(',') if pk]
+    except ValueError:
+        raise ApiError('ids - список чисел через запятую.')
+    if not 1 <= len(ids) <= BATCH_LIMIT:
+        raise ApiError(f'В ids должно быть от 1 до {BATCH_LIMIT} чисел.')
+    found = select_fields(Post.objects.filter(id__in=ids), fields).in_bulk()
+    missing = [pk for pk in dict.fromkeys(ids) if pk not in found]
+    if missing:
+        found.update(select_fields(
+            ArchivedPost.objects.filter(id__in=missing), fields
+        ).in_bulk())
+        missing = [pk for pk in missing if pk not in found]
+    posts = [found[pk] for pk in dict.fromkeys(ids) if pk in found]
+    return stream_json(
+        '{"results":[', serialize(posts, fields),
+        '],"missing":{}}}'.format(encoder.encode(missing))
+    )
@@ -1,5 +1,16 @@
 from django.apps import AppConfig
+from django.conf import settings
+from django.db.backends.signals import connection_created
 
 
 class CoreConfig(AppConfig):
     name = 'core'
+
+    def ready(self):
+        from . import sqlite
+        connection_created.connect(
+            sqlite.configure_connection, dispatch_uid='core.sqlite'
+        )
+        if settings.INSTRUMENTATION_ENABLED:
+            from . import instrumentation
+            instrumentation.install()
@@ -0,0 +1,72 @@
+import json
+import platform
+import sqlite3
+import statistics
+import time
+from contextlib import contextmanager
+
+import django
+from django.db import connection
+from django.test.utils import setup_test_environment, teardown_test_environment
+
+
+def summarize(samples):
+    """Перцентили и среднее по замерам в секундах, результат в мс"""
+    samples = sorted(samples)
+    if not samples:
+        return {}
+
+    def percentile(share):
+        index = min(len(samples) - 1, round(share * (len(samples) - 1)))
+        return round(samples[index] * 1000, 3)
+
+    return {
+        'count': len(samples),
+        'mean_ms': round(statistics.mean(samples) * 1000, 3),
+        'p50_ms': percentile(0.50),
+        'p90_ms': percentile(0.90),
+        'p95_ms': percentile(0.95),
+        'p99_ms': percentile(0.99),
+        'max_ms': round(samples[-1] * 1000, 3),
+    }
+
+
+def timed(func, *args, **kwargs):
+    started = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - started, result
+
+
+def environment():
+    """Окружение прогона, чтобы сравнивать отчеты между релизами"""
+    return {
+        'python': platform.python_version(),
+        'django': django.get_version(),
+        'sqlite': sqlite3.sqlite_version,
+        'platform': platform.platform(),
+        'started_at': time.strftime('%Y-%m-%dT%H:%M:%S%z'),
+    }
+
+
+def write_report(path, report):
+    with open(path, 'w', encoding='utf-8') as stream:
+        json.dump(report, stream, ensure_ascii=False, indent=2,
+                  sort_keys=True)
+        stream.write('\n')
+
+
+@contextmanager
+def benchmark_database(keepdb=False):
+    """Отдельная тестовая БД: замеры не трогают рабочую базу"""
+    setup_test_environment()
+    old_name = connection.settings_dict['NAME']
+    connection.creation.create_test_db(
+        verbosity=0, autoclobber=True, serialize=False, keepdb=keepdb
+    )
+    try:
+        yield
+    finally:
+        connection.creation.destroy_test_db(
+            old_name, verbosity=0, keepdb=keepdb
+        )
+        teardown_test_environment()
@@ -0,0 +1,72 @@
+"""SQLite с общим для потоков пулом соединений.
+
+ENGINE = 'core.db.sqlite3_pool', настройки пула - в ключе POOL базы
+(MIN_SIZE, MAX_SIZE, TIMEOUT, MAX_IDLE, см. core.pool.DEFAULTS).
+С CONN_MAX_AGE = 0 соединение возвращается в пул в конце запроса,
+а не закрывается; база в памяти работает без пула.
+"""
+from functools import partial
+
+from django.conf import settings
+from django.db.backends.sqlite3 import base
+
+from core import pool
+from core.sqlite import pragma_statements
+
+Database = base.Database
+
+
+def check_connection(connection):
+    """Проверка при выдаче из пула: соединение живо и без транзакции"""
+    if connection.in_transaction:
+        raise Database.OperationalError('Незавершенная транзакция')
+    connection.execute('SELECT 1').fetchone()
+
+
+def open_connection(conn_params, statements):
+    """Новое соединение для пула: как у sqlite3-бэкенда Django, и сразу
+    SQLITE_PRAGMAS - один раз за жизнь соединения, а не на каждую выдачу.
+    """
+    # get_new_connection бэкенда не обращается к self: пул не держит
+    # обертку потока, который его создал.
+    connection = base.DatabaseWrapper.get_new_connection(None, conn_params)
+    for statement in statements:
+        connection.execute(statement)
+    return connection
+
+
+class DatabaseWrapper(base.DatabaseWrapper):
+    connection_pool = None
+
+    def get_pool(self, conn_params):
+        return pool.get_pool(
+            self.alias, self.settings_dict['NAME'],
+            self.settings_dict.get('POOL', {}),
+            connect=partial(
+                open_connection, conn_params,
+                pragma_statements(settings.SQLITE_PRAGMAS)
+            ),
+            check=check_connection,
+        )
+
+    def get_new_connection(self, conn_params):
+        if self.is_in_memory_db():
+            return super().get_new_connection(conn_params)
+        self.connection_pool = self.get_pool(conn_params)
+        try:
+            return self.connection_pool.acquire()
+        except pool.PoolTimeout as error:
+            raise Database.OperationalError(str(error)) from error
+
+    def _close(self):
+        if self.connection is None or self.connection_pool is None:
+            return super()._close()
+        returned_to, self.connection_pool = self.connection_pool, None
+        broken = False
+        if self.connection.in_transaction:
+            # Транзакцию, прерванную на середине, другому потоку не отдаем.
+            try:
+                self.connection.rollback()
+            except Database.Error:
+                broken = True
+        returned_to.release(self.connection, broken=broken)
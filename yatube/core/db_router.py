@@ -0,0 +1,71 @@
+import contextvars
+import random
+import time
+from contextlib import contextmanager
+from functools import wraps
+
+from django.conf import settings
+
+PIN_COOKIE = 'db_primary_until'
+
+_read_from_replica = contextvars.ContextVar(
+    'read_from_replica', default=False
+)
+
+
+@contextmanager
+def use_replica():
+    """Чтения внутри блока уходят на реплику, записи - на основную БД"""
+    token = _read_from_replica.set(True)
+    try:
+        yield
+    finally:
+        _read_from_replica.reset(token)
+
+
+def reading_from_replica():
+    """Чтения сейчас уходят на реплику"""
+    return _read_from_replica.get() and bool(settings.DATABASE_REPLICAS)
+
+
+def is_pinned_to_primary(request):
+    """Пользователь только что писал: читает свои записи с основной БД"""
+    try:
+        return float(request.COOKIES.get(PIN_COOKIE, 0)) > time.time()
+    except ValueError:
+        return False
+
+
+def read_from_replica(view):
+    """Подсказка для роутера: view только читает и терпит отставание"""
+    @wraps(view)
+    def wrapper(request, *args, **kwargs):
+        if not settings.DATABASE_REPLICAS or is_pinned_to_primary(request):
+            return view(request, *args, **kwargs)
+        with use_replica():
+            return view(request, *args, **kwargs)
+    return wrapper
+
+
+class PrimaryReplicaRouter:
+    """Чтения из views с read_from_replica - на случайную реплику из
+    DATABASE_REPLICAS, все остальное - на default.
+    """
+
+    def db_for_read(self, model, **hints):
+        if reading_from_replica():
+            return random.choice(settings.DATABASE_REPLICAS)
+        return None
+
+    def db_for_write(self, model, **hints):
+        return 'default'
+
+    def allow_relation(self, obj1, obj2, **hints):
+        # Реплики - копии default, объекты с них связываются свободно.
+        return True
+
+    def allow_migrate(self, db, app_label, model_name=None, **hints):
+        # Схема приходит на реплики вместе с данными основной БД.
+        if db in settings.DATABASE_REPLICAS:
+            return False
+        return None
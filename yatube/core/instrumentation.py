@@ -0,0 +1,146 @@
+import contextvars
+import re
+import time
+from collections import Counter, defaultdict
+from contextlib import contextmanager
+
+from django.template.base import Template
+
+_current = contextvars.ContextVar('request_metrics', default=None)
+
+
+class RequestMetrics:
+    """Замеры одного запроса: БД, шаблоны, кэш и произвольные таймеры"""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.queries = 0
+        self.db_time = 0.0
+        self.templates = defaultdict(lambda: [0, 0.0])
+        self.template_depth = 0
+        self.template_time = 0.0
+        self.counters = Counter()
+        self.timings = defaultdict(float)
+
+    def total(self):
+        return time.perf_counter() - self.started
+
+
+def current():
+    """Замеры текущего запроса или None, если он не попал в выборку"""
+    return _current.get()
+
+
+def start():
+    metrics = RequestMetrics()
+    return metrics, _current.set(metrics)
+
+
+def stop(token):
+    _current.reset(token)
+
+
+def incr(name, value=1):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.counters[name] += value
+
+
+def record(name, seconds):
+    metrics = _current.get()
+    if metrics is not None:
+        metrics.timings[name] += seconds
+
+
+@contextmanager
+def timer(name):
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        record(name, time.perf_counter() - started)
+
+
+def db_wrapper(execute, sql, params, many, context):
+    """connection.execute_wrapper: число и время запросов к БД"""
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.queries += 1
+        metrics.db_time += time.perf_counter() - started
+
+
+_original_render = Template.render
+
+
+def _timed_render(self, context):
+    metrics = _current.get()
+    if metrics is None:
+        return _original_render(self, context)
+    metrics.template_depth += 1
+    started = time.perf_counter()
+    try:
+        return _original_render(self, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        metrics.template_depth -= 1
+        # Время шаблона включает вложенные include.
+        entry = metrics.templates[self.name or '<string>']
+        entry[0] += 1
+        entry[1] += elapsed
+        if metrics.template_depth == 0:
+            metrics.template_time += elapsed
+
+
+def install():
+    """Замеряем Template.render: и страницы, и каждый include"""
+    Template.render = _timed_render
+
+
+def metric_name(name):
+    """Имя метрики Server-Timing должно быть токеном RFC 7230"""
+    return re.sub(r"[^!#$%&'*+\-.^_`|~0-9A-Za-z]", '_', name)
+
+
+def server_timing(metrics):
+    entries = [
+        f'total;dur={metrics.total() * 1000:.2f}',
+        f'db;dur={metrics.db_time * 1000:.2f};desc="{metrics.queries} q"',
+        f'tpl;dur={metrics.template_time * 1000:.2f}',
+    ]
+    for name, (count, seconds) in sorted(metrics.templates.items()):
+        entries.append(
+            f'tpl-{metric_name(name)};dur={seconds * 1000:.2f};'
+            f'desc="{count}x"'
+        )
+    for name, seconds in sorted(metrics.timings.items()):
+        entries.append(f'{metric_name(name)};dur={seconds * 1000:.2f}')
+    for name, value in sorted(metrics.counters.items()):
+        entries.append(f'{metric_name(name)};desc="{value}"')
+    return ', '.join(entries)
+
+
+def as_log_record(metrics, request, response):
+    return {
+        'method': request.method,
+        'path': request.path,
+        'view': getattr(request.resolver_match, 'view_name', None),
+        'status': response.status_code,
+        'total_ms': round(metrics.total() * 1000, 2),
+        'db_ms': round(metrics.db_time * 1000, 2),
+        'queries': metrics.queries,
+        'template_ms': round(metrics.template_time * 1000, 2),
+        'templates': {
+            name: {'count': count, 'ms': round(seconds * 1000, 2)}
+            for name, (count, seconds) in metrics.templates.items()
+        },
+        'timings_ms': {
+            name: round(seconds * 1000, 2)
+            for name, seconds in metrics.timings.items()
+        },
+        'counters': dict(metrics.counters),
+    }
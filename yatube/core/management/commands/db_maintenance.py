@@ -0,0 +1,74 @@
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+
+AUTO_VACUUM_INCREMENTAL = 2
+
+
+class Command(BaseCommand):
+    help = (
+        'Обслуживание SQLite: ANALYZE для планировщика, инкрементальный '
+        'VACUUM свободных страниц и checkpoint журнала WAL.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+        parser.add_argument(
+            '--pages', type=int, default=0,
+            help='Сколько свободных страниц вернуть системе (0 - все)'
+        )
+        parser.add_argument(
+            '--enable-incremental-vacuum', action='store_true',
+            help='Включить auto_vacuum=INCREMENTAL; полный VACUUM, '
+                 'база блокируется на время перестройки'
+        )
+
+    def pragma(self, cursor, name):
+        cursor.execute(f'PRAGMA {name}')
+        return cursor.fetchone()[0]
+
+    def step(self, name, cursor, *statements):
+        started = time.perf_counter()
+        for statement in statements:
+            cursor.execute(statement)
+            cursor.fetchall()
+        self.stdout.write(
+            f'{name:20} {(time.perf_counter() - started) * 1000:8.1f} мс'
+        )
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite.')
+        with connection.cursor() as cursor:
+            free_before = self.pragma(cursor, 'freelist_count')
+            pages_before = self.pragma(cursor, 'page_count')
+            if options['enable_incremental_vacuum']:
+                self.step(
+                    'VACUUM', cursor,
+                    'PRAGMA auto_vacuum = INCREMENTAL', 'VACUUM'
+                )
+            self.step('ANALYZE', cursor, 'ANALYZE')
+            if self.pragma(cursor, 'auto_vacuum') == AUTO_VACUUM_INCREMENTAL:
+                pages = options['pages'] or free_before
+                self.step(
+                    'incremental_vacuum', cursor,
+                    f'PRAGMA incremental_vacuum({int(pages)})'
+                )
+            else:
+                self.stdout.write(self.style.WARNING(
+                    'auto_vacuum выключен: свободные страницы остаются в '
+                    'файле, см. --enable-incremental-vacuum'
+                ))
+            if self.pragma(cursor, 'journal_mode') == 'wal':
+                self.step(
+                    'wal_checkpoint', cursor,
+                    'PRAGMA wal_checkpoint(TRUNCATE)'
+                )
+            free_after = self.pragma(cursor, 'freelist_count')
+            pages_after = self.pragma(cursor, 'page_count')
+        self.stdout.write(self.style.SUCCESS(
+            f'Страниц: {pages_before} -> {pages_after}, '
+            f'свободных: {free_before} -> {free_after}'
+        ))
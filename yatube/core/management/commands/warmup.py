@@ -0,0 +1,23 @@
+from django.core.management.base import BaseCommand
+
+from core import warmup
+
+
+class Command(BaseCommand):
+    help = (
+        'Прогревает процесс: компилирует шаблоны, строит таблицы URL, '
+        'загружает переводы и валидаторы паролей; печатает время шагов.'
+    )
+
+    def handle(self, *args, **options):
+        # Процесс мог что-то прогреть раньше: меряем с холодного старта.
+        warmup.reset()
+        total = 0.0
+        for name, count, elapsed in warmup.run():
+            total += elapsed
+            self.stdout.write(
+                f'{name:12} {count:5}  {elapsed * 1000:8.1f} мс'
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f'Прогрев занял {total * 1000:.1f} мс'
+        ))
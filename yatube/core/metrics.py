@@ -0,0 +1,311 @@
+import bisect
+import fcntl
+import json
+import os
+import tempfile
+import threading
+import time
+import weakref
+
+from django.conf import settings
+
+LATENCY_BUCKETS = (
+    0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+QUERY_BUCKETS = (0, 1, 2, 3, 5, 10, 20, 50, 100)
+SIZE_BUCKETS = (1024, 4096, 16384, 65536, 262144, 1048576)
+RATIO_BUCKETS = (0.1, 0.2, 0.3, 0.4, 0.5, 0.6, 0.7, 0.8, 0.9, 1.0)
+CPU_BUCKETS = (0.0001, 0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05)
+WAIT_BUCKETS = (0.0001, 0.001, 0.005, 0.01, 0.05, 0.1, 0.5, 1.0, 5.0)
+# Сумма последних снимков завершившихся воркеров в METRICS_MULTIPROCESS_DIR.
+RETIRED_FILE = 'retired.json'
+
+_metrics = {}
+_shards = []
+# Значения завершившихся потоков: счетчики не должны уменьшаться.
+_retired = {}
+_shards_lock = threading.Lock()
+_local = threading.local()
+_last_flush = [0.0]
+
+
+class _ShardOwner:
+    """Живет в thread-local потока и умирает вместе с потоком"""
+
+
+def _retire(shard):
+    """Поток завершился: его значения переходят в общий словарь"""
+    with _shards_lock:
+        _shards.remove(shard)
+        for key, values in shard.items():
+            _add(_retired, key, values)
+
+
+def _shard():
+    """Значения метрик текущего потока.
+
+    Каждый поток пишет только в свой словарь, поэтому запись идет без
+    блокировок; блокировка берется один раз - при регистрации потока.
+    Когда поток завершается, словарь сливается в _retired и убирается
+    из _shards: при потоке на запрос список не растет. Чтение для
+    /metrics суммирует все словари.
+    """
+    shard = getattr(_local, 'shard', None)
+    if shard is None:
+        shard = _local.shard = {}
+        _local.owner = _ShardOwner()
+        weakref.finalize(_local.owner, _retire, shard)
+        with _shards_lock:
+            _shards.append(shard)
+    return shard
+
+
+class Metric:
+    kind = None
+
+    def __init__(self, name, documentation, labelnames=()):
+        self.name = name
+        self.documentation = documentation
+        self.labelnames = tuple(labelnames)
+        _metrics[name] = self
+
+    def _values(self, labels, size):
+        key = (self.name, tuple(labels[name] for name in self.labelnames))
+        shard = _shard()
+        values = shard.get(key)
+        if values is None:
+            values = shard[key] = [0.0] * size
+        return values
+
+
+class Counter(Metric):
+    kind = 'counter'
+
+    def inc(self, value=1, **labels):
+        self._values(labels, 1)[0] += value
+
+    def samples(self, labels, values):
+        yield self.name + '_total', labels, values[0]
+
+
+class Histogram(Metric):
+    kind = 'histogram'
+
+    def __init__(self, name, documentation, labelnames=(), buckets=()):
+        super().__init__(name, documentation, labelnames)
+        self.buckets = tuple(buckets)
+
+    def observe(self, value, **labels):
+        # [счетчики корзин..., +Inf, сумма]
+        values = self._values(labels, len(self.buckets) + 2)
+        values[bisect.bisect_left(self.buckets, value)] += 1
+        values[-1] += value
+
+    def samples(self, labels, values):
+        cumulative = 0
+        for bound, count in zip(self.buckets + ('+Inf',), values[:-1]):
+            cumulative += count
+            yield self.name + '_bucket', {**labels, 'le': str(bound)}, (
+                cumulative
+            )
+        yield self.name + '_sum', labels, values[-1]
+        yield self.name + '_count', labels, cumulative
+
+
+REQUEST_LATENCY = Histogram(
+    'yatube_request_duration_seconds', 'Request latency by view.',
+    ['view'], LATENCY_BUCKETS
+)
+REQUEST_QUERIES = Histogram(
+    'yatube_request_queries', 'Database queries per request by view.',
+    ['view'], QUERY_BUCKETS
+)
+RESPONSE_SIZE = Histogram(
+    'yatube_response_size_bytes', 'Response body size by view.',
+    ['view'], SIZE_BUCKETS
+)
+COMPRESSION_RATIO = Histogram(
+    'yatube_compression_ratio', 'Compressed to original body size by view.',
+    ['view'], RATIO_BUCKETS
+)
+COMPRESSION_CPU = Histogram(
+    'yatube_compression_cpu_seconds', 'CPU time spent compressing by view.',
+    ['view'], CPU_BUCKETS
+)
+REQUESTS = Counter(
+    'yatube_requests', 'Requests by view and status class.',
+    ['view', 'status']
+)
+ERRORS = Counter(
+    'yatube_request_errors', 'Requests answered with 5xx by view.',
+    ['view']
+)
+RATE_LIMITED = Counter(
+    'yatube_rate_limited', 'Requests rejected with 429 by policy.',
+    ['scope']
+)
+DB_POOL_CHECKOUTS = Counter(
+    'yatube_db_pool_checkouts',
+    'Connection pool checkouts by alias and result (reused, created, '
+    'timeout).',
+    ['alias', 'result']
+)
+DB_POOL_CLOSED = Counter(
+    'yatube_db_pool_closed',
+    'Pooled connections closed by alias and reason (idle, unhealthy, '
+    'broken).',
+    ['alias', 'reason']
+)
+DB_POOL_WAIT = Histogram(
+    'yatube_db_pool_wait_seconds', 'Time to check out a pooled connection.',
+    ['alias'], WAIT_BUCKETS
+)
+
+
+def snapshot():
+    """Сумма значений всех потоков процесса"""
+    merged = {}
+    with _shards_lock:
+        for shard in (_retired, *_shards):
+            for key, values in list(shard.items()):
+                _add(merged, key, values)
+    return merged
+
+
+def _add(merged, key, values):
+    total = merged.get(key)
+    if total is None:
+        merged[key] = list(values)
+    else:
+        for index, value in enumerate(values):
+            total[index] += value
+
+
+def _snapshot_path(directory, pid=None):
+    return os.path.join(directory, f'{pid or os.getpid()}.json')
+
+
+def _process_exists(pid):
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        pass
+    return True
+
+
+def _read_snapshot(path, merged):
+    """Прибавляем значения из файла снимка к merged"""
+    try:
+        with open(path) as stream:
+            data = json.load(stream)
+    except (OSError, ValueError):
+        return
+    for name, labels, values in data:
+        _add(merged, (name, tuple(labels)), values)
+
+
+def _write_snapshot(path, values):
+    """Снимок целиком или никак: читатели не видят половину файла"""
+    data = [[name, list(labels), numbers]
+            for (name, labels), numbers in values.items()]
+    descriptor, tmp_path = tempfile.mkstemp(
+        dir=os.path.dirname(path), suffix='.tmp'
+    )
+    with os.fdopen(descriptor, 'w') as stream:
+        json.dump(data, stream)
+    os.replace(tmp_path, path)
+
+
+def _retire_process(directory, path):
+    """Воркер завершился: его последний снимок прибавляется к RETIRED_FILE.
+
+    Счетчики не уменьшаются при перезапуске воркера, иначе Prometheus
+    видит сброс счетчика. Блокировка не дает двум воркерам учесть один
+    снимок дважды.
+    """
+    with open(os.path.join(directory, 'retired.lock'), 'w') as lock:
+        fcntl.flock(lock, fcntl.LOCK_EX)
+        if not os.path.exists(path):
+            return
+        retired = {}
+        retired_path = os.path.join(directory, RETIRED_FILE)
+        _read_snapshot(retired_path, retired)
+        _read_snapshot(path, retired)
+        _write_snapshot(retired_path, retired)
+        os.remove(path)
+
+
+def flush(force=False):
+    """Пишем снимок процесса в METRICS_MULTIPROCESS_DIR не чаще
+    METRICS_FLUSH_INTERVAL секунд, чтобы /metrics любого воркера
+    видел все процессы.
+    """
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if not directory:
+        return
+    now = time.monotonic()
+    if not force and now - _last_flush[0] < settings.METRICS_FLUSH_INTERVAL:
+        return
+    _last_flush[0] = now
+    _write_snapshot(_snapshot_path(directory), snapshot())
+
+
+def collect():
+    """Значения всех процессов: свой свежий снимок, файлы остальных и
+    сумма завершившихся воркеров.
+    """
+    merged = snapshot()
+    directory = settings.METRICS_MULTIPROCESS_DIR
+    if directory and os.path.isdir(directory):
+        own = _snapshot_path(directory)
+        for entry in os.scandir(directory):
+            pid = entry.name[:-len('.json')]
+            if (not entry.name.endswith('.json') or entry.path == own
+                    or not pid.isdigit()):
+                continue
+            if _process_exists(int(pid)):
+                _read_snapshot(entry.path, merged)
+            else:
+                _retire_process(directory, entry.path)
+        _read_snapshot(os.path.join(directory, RETIRED_FILE), merged)
+    return merged
+
+
+def _format_labels(labels):
+    if not labels:
+        return ''
+    pairs = ','.join(
+        '{}="{}"'.format(
+            name,
+            str(value).replace('\\', r'\\').replace('"', r'\"')
+            .replace('\n', r'\n')
+        )
+        for name, value in labels.items()
+    )
+    return '{' + pairs + '}'
+
+
+def _format_value(value):
+    value = float(value)
+    return str(int(value)) if value.is_integer() else repr(value)
+
+
+def render():
+    """Текстовый формат Prometheus 0.0.4"""
+    values = collect()
+    lines = []
+    for name, metric in sorted(_metrics.items()):
+        lines.append(f'# HELP {name} {metric.documentation}')
+        lines.append(f'# TYPE {name} {metric.kind}')
+        for (metric_name, label_values), data in sorted(values.items()):
+            if metric_name != name:
+                continue
+            labels = dict(zip(metric.labelnames, label_values))
+            for sample, sample_labels, value in metric.samples(labels, data):
+                lines.append(
+                    f'{sample}{_format_labels(sample_labels)} '
+                    f'{_format_value(value)}'
+                )
+    return '\n'.join(lines) + '\n'
@@ -0,0 +1,115 @@
+import time
+import zlib
+
+from django.conf import settings
+from django.utils.cache import patch_vary_headers
+
+from core import instrumentation, metrics
+from core.middleware.static import accepts_gzip
+
+
+class CompressionStats:
+    """Байты до и после сжатия и процессорное время одного ответа"""
+
+    def __init__(self, request):
+        match = request.resolver_match
+        self.view = match.view_name if match is not None else 'unresolved'
+        self.metrics = instrumentation.current()
+        self.raw = self.packed = 0
+        self.cpu = 0.0
+
+    def add(self, compress, data):
+        started = time.thread_time()
+        packed = compress(data)
+        self.cpu += time.thread_time() - started
+        self.raw += len(data)
+        self.packed += len(packed)
+        return packed
+
+    def report(self):
+        # Потоковый ответ сжимается после выхода из middleware, поэтому
+        # пишем в замеры, сохраненные при его создании.
+        if self.metrics is not None:
+            self.metrics.timings['gzip'] += self.cpu
+            self.metrics.counters['gzip-in'] += self.raw
+            self.metrics.counters['gzip-out'] += self.packed
+        if settings.METRICS_ENABLED and self.raw:
+            metrics.COMPRESSION_RATIO.observe(
+                self.packed / self.raw, view=self.view
+            )
+            metrics.COMPRESSION_CPU.observe(self.cpu, view=self.view)
+
+
+class CompressionMiddleware:
+    """gzip для обычных и потоковых ответов.
+
+    Пропускает ответы короче GZIP_MIN_LENGTH, типы из GZIP_EXCLUDED_TYPES
+    (уже сжатые) и no-transform; уровень - GZIP_LEVEL. Степень сжатия и
+    процессорное время видны в Server-Timing (gzip, gzip-in, gzip-out) и
+    в гистограммах /metrics.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.level = settings.GZIP_LEVEL
+        self.min_length = settings.GZIP_MIN_LENGTH
+        self.excluded_types = tuple(settings.GZIP_EXCLUDED_TYPES)
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if not self.should_compress(response):
+            return response
+        patch_vary_headers(response, ('Accept-Encoding',))
+        if not accepts_gzip(request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            return response
+        stats = CompressionStats(request)
+        if response.streaming:
+            response.streaming_content = self.compress_stream(
+                response.streaming_content, stats
+            )
+            del response['Content-Length']
+        else:
+            content = self.compress(response.content, stats)
+            if len(content) >= len(response.content):
+                return response
+            response.content = content
+            response['Content-Length'] = str(len(content))
+            stats.report()
+        etag = response.get('ETag')
+        if etag and etag.startswith('"'):
+            response['ETag'] = 'W/' + etag
+        response['Content-Encoding'] = 'gzip'
+        return response
+
+    def should_compress(self, response):
+        if response.has_header('Content-Encoding'):
+            return False
+        if not response.streaming and len(response.content) < self.min_length:
+            return False
+        if 'no-transform' in response.get('Cache-Control', ''):
+            return False
+        content_type = response.get('Content-Type', '').lower()
+        return not content_type.startswith(self.excluded_types)
+
+    def compressor(self):
+        return zlib.compressobj(self.level, zlib.DEFLATED, 16 + zlib.MAX_WBITS)
+
+    def compress(self, content, stats):
+        compressor = self.compressor()
+        packed = stats.add(compressor.compress, content)
+        tail = compressor.flush()
+        stats.packed += len(tail)
+        return packed + tail
+
+    def compress_stream(self, chunks, stats):
+        compressor = self.compressor()
+        try:
+            for chunk in chunks:
+                packed = stats.add(compressor.compress, chunk)
+                if packed:
+                    yield packed
+            tail = compressor.flush()
+            stats.packed += len(tail)
+            yield tail
+        finally:
+            stats.report()
@@ -0,0 +1,29 @@
+import time
+
+from django.conf import settings
+
+from core.db_router import PIN_COOKIE
+
+
+class PrimaryPinMiddleware:
+    """После успешной записи читаем с основной БД DATABASE_REPLICA_PIN
+    секунд, пока реплики догоняют: пользователь видит свой новый пост.
+    """
+    safe_methods = ('GET', 'HEAD', 'OPTIONS', 'TRACE')
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+
+    def __call__(self, request):
+        response = self.get_response(request)
+        if (settings.DATABASE_REPLICAS
+                and request.method not in self.safe_methods
+                and response.status_code < 400):
+            response.set_cookie(
+                PIN_COOKIE,
+                str(time.time() + settings.DATABASE_REPLICA_PIN),
+                max_age=settings.DATABASE_REPLICA_PIN,
+                httponly=True,
+                samesite='Lax'
+            )
+        return response
@@ -0,0 +1,50 @@
+import json
+import logging
+import random
+from contextlib import ExitStack
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db import connections
+
+from core import instrumentation
+
+logger = logging.getLogger('core.instrumentation')
+
+
+class InstrumentationMiddleware:
+    """Server-Timing и структурная строка лога для выборки запросов.
+
+    В выборку попадает доля запросов INSTRUMENTATION_SAMPLE_RATE;
+    остальные проходят без замеров и без накладных расходов.
+    """
+
+    def __init__(self, get_response):
+        if not settings.INSTRUMENTATION_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+        self.sample_rate = settings.INSTRUMENTATION_SAMPLE_RATE
+
+    def __call__(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        metrics, token = instrumentation.start()
+        try:
+            with ExitStack() as stack:
+                for connection in connections.all():
+                    stack.enter_context(
+                        connection.execute_wrapper(instrumentation.db_wrapper)
+                    )
+                with instrumentation.timer('view'):
+                    response = self.get_response(request)
+            response['Server-Timing'] = instrumentation.server_timing(
+                metrics
+            )
+            if logger.isEnabledFor(logging.INFO):
+                logger.info(json.dumps(
+                    instrumentation.as_log_record(metrics, request, response),
+                    ensure_ascii=False
+                ))
+            return response
+        finally:
+            instrumentation.stop(token)
@@ -0,0 +1,41 @@
+import time
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from core import instrumentation, metrics
+
+
+class MetricsMiddleware:
+    """Гистограммы задержек, запросов к БД и размеров ответов по view.
+
+    Число запросов к БД берется из core.instrumentation и есть только у
+    запросов, попавших в его выборку.
+    """
+
+    def __init__(self, get_response):
+        if not settings.METRICS_ENABLED:
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        started = time.perf_counter()
+        response = self.get_response(request)
+        elapsed = time.perf_counter() - started
+        match = request.resolver_match
+        view = match.view_name if match is not None else 'unresolved'
+        metrics.REQUEST_LATENCY.observe(elapsed, view=view)
+        metrics.REQUESTS.inc(
+            view=view, status=f'{response.status_code // 100}xx'
+        )
+        if response.status_code >= 500:
+            metrics.ERRORS.inc(view=view)
+        if not response.streaming:
+            metrics.RESPONSE_SIZE.observe(len(response.content), view=view)
+        request_metrics = instrumentation.current()
+        if request_metrics is not None:
+            metrics.REQUEST_QUERIES.observe(
+                request_metrics.queries, view=view
+            )
+        metrics.flush()
+        return response
@@ -0,0 +1,95 @@
+import mimetypes
+import os
+
+from django.conf import settings
+from django.contrib.staticfiles.storage import staticfiles_storage
+from django.core.exceptions import MiddlewareNotUsed
+from django.http import FileResponse, HttpResponseNotModified
+from django.utils.http import http_date
+
+IMMUTABLE = 'public, max-age=31536000, immutable'
+REVALIDATE = 'public, max-age=60'
+
+
+def accepts_gzip(header):
+    """Разбираем Accept-Encoding: gzip или * без q=0"""
+    for part in header.split(','):
+        coding, _, params = part.partition(';')
+        if coding.strip().lower() in ('gzip', '*'):
+            _, _, quality = params.partition('q=')
+            try:
+                return float(quality or 1) > 0
+            except ValueError:
+                return True
+    return False
+
+
+class StaticFile:
+    def __init__(self, path, immutable):
+        stat = os.stat(path)
+        self.path = path
+        self.gzip_path = path + '.gz' if os.path.exists(path + '.gz') else None
+        self.content_type = (
+            mimetypes.guess_type(path)[0] or 'application/octet-stream'
+        )
+        self.last_modified = http_date(stat.st_mtime)
+        self.etag = f'"{stat.st_size:x}-{int(stat.st_mtime):x}"'
+        self.cache_control = IMMUTABLE if immutable else REVALIDATE
+
+
+class StaticFilesMiddleware:
+    """Отдаем собранную статику из STATIC_ROOT прямо из процесса.
+
+    Файлы находим при старте, поэтому на запрос не приходится ни одного
+    stat(); FileResponse позволяет WSGI-серверу отдать файл через
+    sendfile. Имена с хэшем кэшируются навсегда.
+    """
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.files = self.find_files()
+        if not self.files:
+            raise MiddlewareNotUsed
+
+    def find_files(self):
+        root = settings.STATIC_ROOT
+        if not root or not os.path.isdir(root):
+            return {}
+        hashed = set(getattr(staticfiles_storage, 'hashed_files', {})
+                     .values())
+        files = {}
+        for directory, _, filenames in os.walk(root):
+            for filename in filenames:
+                if filename.endswith('.gz'):
+                    continue
+                path = os.path.join(directory, filename)
+                name = os.path.relpath(path, root).replace(os.sep, '/')
+                files[settings.STATIC_URL + name] = StaticFile(
+                    path, name in hashed
+                )
+        return files
+
+    def __call__(self, request):
+        static_file = self.files.get(request.path_info)
+        if static_file is None or request.method not in ('GET', 'HEAD'):
+            return self.get_response(request)
+        return self.serve(request, static_file)
+
+    def serve(self, request, static_file):
+        path, etag = static_file.path, static_file.etag
+        if static_file.gzip_path and accepts_gzip(
+                request.META.get('HTTP_ACCEPT_ENCODING', '')):
+            path, etag = static_file.gzip_path, etag[:-1] + '-gzip"'
+        if request.META.get('HTTP_IF_NONE_MATCH') == etag:
+            response = HttpResponseNotModified()
+        else:
+            response = FileResponse(open(path, 'rb'))
+            response['Content-Type'] = static_file.content_type
+            if path == static_file.gzip_path:
+                response['Content-Encoding'] = 'gzip'
+        response['ETag'] = etag
+        response['Last-Modified'] = static_file.last_modified
+        response['Cache-Control'] = static_file.cache_control
+        if static_file.gzip_path:
+            response['Vary'] = 'Accept-Encoding'
+        return response
@@ -0,0 +1,261 @@
+import logging
+import os
+import threading
+import time
+from collections import Counter, deque
+
+from . import instrumentation, metrics
+
+logger = logging.getLogger(__name__)
+
+DEFAULTS = {
+    # Столько соединений пул держит открытыми даже без нагрузки.
+    'MIN_SIZE': 1,
+    # Больше соединений не открывается: остальные потоки ждут TIMEOUT.
+    'MAX_SIZE': 10,
+    'TIMEOUT': 10.0,
+    # Простаивающие дольше соединения закрываются (до MIN_SIZE).
+    'MAX_IDLE': 300.0,
+}
+
+_pools = {}
+_pools_lock = threading.Lock()
+_pools_pid = [os.getpid()]
+
+
+class PoolTimeout(Exception):
+    """Все MAX_SIZE соединений заняты дольше TIMEOUT секунд"""
+
+
+class Waiter:
+    """Поток в очереди за соединением"""
+
+    def __init__(self):
+        self.event = threading.Event()
+        self.connection = None
+
+
+class Pool:
+    """Потокобезопасный пул соединений DB-API.
+
+    connect открывает новое соединение, check проверяет взятое из пула
+    (исключение - соединение сломано и заменяется новым). Ждущие потоки
+    обслуживаются по очереди: освободившееся соединение передается
+    первому из них, а не тому, кто успел раньше.
+    """
+
+    def __init__(self, alias, connect, check, min_size=1, max_size=10,
+                 timeout=10.0, max_idle=300.0):
+        if not 0 <= min_size <= max_size or max_size < 1:
+            raise ValueError('Нужно 0 <= MIN_SIZE <= MAX_SIZE, MAX_SIZE >= 1')
+        self.alias = alias
+        self.connect = connect
+        self.check = check
+        self.min_size = min_size
+        self.max_size = max_size
+        self.timeout = timeout
+        self.max_idle = max_idle
+        # Открытые соединения, включая выданные и открываемые сейчас.
+        self.size = 0
+        # (соединение, когда вернули): берем с конца - самое "теплое".
+        self.idle = deque()
+        self.waiters = deque()
+        self.lock = threading.Lock()
+        self.counters = Counter()
+        self.wait_time = 0.0
+
+    def __repr__(self):
+        return (
+            f'<Pool {self.alias}: {self.size - len(self.idle)} in use, '
+            f'{len(self.idle)} idle of {self.max_size}>'
+        )
+
+    def _free_slot(self):
+        """Под блокировкой: место закрытого соединения - первому в
+        очереди, он откроет новое.
+        """
+        self.size -= 1
+        if self.waiters:
+            self.size += 1
+            self.waiters.popleft().event.set()
+
+    def _open(self):
+        """Открываем соединение в счет уже занятого места в size"""
+        try:
+            connection = self.connect()
+        except BaseException:
+            with self.lock:
+                self._free_slot()
+            raise
+        with self.lock:
+            self.counters['created'] += 1
+        instrumentation.incr('db-pool-connect')
+        return connection
+
+    def _discard(self, connection, reason):
+        try:
+            connection.close()
+        except Exception:
+            logger.debug('Ошибка при закрытии соединения', exc_info=True)
+        with self.lock:
+            self._free_slot()
+            self.counters['closed'] += 1
+            self.counters[f'closed_{reason}'] += 1
+        metrics.DB_POOL_CLOSED.inc(alias=self.alias, reason=reason)
+
+    def _evict_idle(self, now):
+        """Под блокировкой: вынимаем простаивающие дольше max_idle"""
+        expired = []
+        while (self.idle and self.size - len(expired) > self.min_size
+               and now - self.idle[0][1] >= self.max_idle):
+            expired.append(self.idle.popleft()[0])
+        return expired
+
+    def fill(self):
+        """Открываем соединения до min_size"""
+        while True:
+            with self.lock:
+                if self.size >= self.min_size:
+                    return
+                self.size += 1
+            self.release(self._open())
+
+    def _checkout(self, deadline):
+        """Свободное соединение, None - место под новое или PoolTimeout"""
+        waiter = None
+        with self.lock:
+            expired = self._evict_idle(time.monotonic())
+            if self.idle:
+                connection = self.idle.pop()[0]
+            elif self.size < self.max_size:
+                self.size += 1
+                connection = None
+            else:
+                waiter = Waiter()
+                self.waiters.append(waiter)
+                self.counters['waits'] += 1
+        for stale in expired:
+            self._discard(stale, 'idle')
+        if waiter is None:
+            return connection
+        if not waiter.event.wait(max(deadline - time.monotonic(), 0)):
+            with self.lock:
+                if not waiter.event.is_set():
+                    self.waiters.remove(waiter)
+                    self.counters['timeouts'] += 1
+                    metrics.DB_POOL_CHECKOUTS.inc(
+                        alias=self.alias, result='timeout'
+                    )
+                    raise PoolTimeout(
+                        f'Пул {self.alias}: все {self.max_size} '
+                        f'соединений заняты дольше {self.timeout} с'
+                    )
+        return waiter.connection
+
+    def acquire(self):
+        started = time.perf_counter()
+        deadline = time.monotonic() + self.timeout
+        while True:
+            connection = self._checkout(deadline)
+            if connection is None:
+                connection, result = self._open(), 'created'
+                break
+            try:
+                self.check(connection)
+            except Exception:
+                logger.warning(
+                    'Пул %s: соединение не прошло проверку', self.alias,
+                    exc_info=True
+                )
+                self._discard(connection, 'unhealthy')
+                continue
+            result = 'reused'
+            break
+        elapsed = time.perf_counter() - started
+        with self.lock:
+            self.counters['checkouts'] += 1
+            self.wait_time += elapsed
+        instrumentation.record('db-pool-wait', elapsed)
+        metrics.DB_POOL_CHECKOUTS.inc(alias=self.alias, result=result)
+        metrics.DB_POOL_WAIT.observe(elapsed, alias=self.alias)
+        return connection
+
+    def release(self, connection, broken=False):
+        if broken:
+            self._discard(connection, 'broken')
+            return
+        now = time.monotonic()
+        with self.lock:
+            if self.waiters:
+                waiter = self.waiters.popleft()
+                waiter.connection = connection
+                waiter.event.set()
+                return
+            self.idle.append((connection, now))
+            expired = self._evict_idle(now)
+        for stale in expired:
+            self._discard(stale, 'idle')
+
+    def close(self):
+        """Закрываем свободные соединения, занятые закроются при возврате"""
+        with self.lock:
+            idle, self.idle = self.idle, deque()
+            self.min_size = 0
+            self.max_idle = 0
+        for connection, _ in idle:
+            self._discard(connection, 'idle')
+
+    def stats(self):
+        with self.lock:
+            idle = len(self.idle)
+            return {
+                'size': self.size,
+                'idle': idle,
+                'in_use': self.size - idle,
+                'waiting': len(self.waiters),
+                'min_size': self.min_size,
+                'max_size': self.max_size,
+                'wait_ms': round(self.wait_time * 1000, 2),
+                **self.counters,
+            }
+
+
+def get_pool(alias, name, options, connect, check):
+    """Общий для всех потоков пул соединений alias к файлу name.
+
+    После fork пулы родителя не используются: его соединения нельзя
+    передавать в дочерний процесс.
+    """
+    with _pools_lock:
+        if _pools_pid[0] != os.getpid():
+            _pools.clear()
+            _pools_pid[0] = os.getpid()
+        pool = _pools.get((alias, name))
+        if pool is None:
+            options = {**DEFAULTS, **options}
+            pool = _pools[(alias, name)] = Pool(
+                alias, connect, check,
+                min_size=options['MIN_SIZE'], max_size=options['MAX_SIZE'],
+                timeout=options['TIMEOUT'], max_idle=options['MAX_IDLE'],
+            )
+            created = True
+        else:
+            created = False
+    if created:
+        pool.fill()
+    return pool
+
+
+def pool_stats():
+    """Статистика всех пулов процесса: {alias: {...}}"""
+    with _pools_lock:
+        pools = list(_pools.values())
+    return {pool.alias: pool.stats() for pool in pools}
+
+
+def close_pools():
+    with _pools_lock:
+        pools = list(_pools.values())
+        _pools.clear()
+    for pool in pools:
+        pool.close()
@@ -0,0 +1,147 @@
+import threading
+import time
+from collections import OrderedDict
+from functools import lru_cache, wraps
+
+from django.conf import settings
+from django.core.cache import caches
+from django.http import HttpResponse
+from django.utils.module_loading import import_string
+
+from core import instrumentation, metrics
+
+PERIODS = {'s': 1, 'm': 60, 'h': 60 * 60, 'd': 60 * 60 * 24}
+
+
+class HttpResponseTooManyRequests(HttpResponse):
+    status_code = 429
+
+
+def parse_rate(rate):
+    """'10/m' -> (10, 60): емкость корзины и период ее наполнения"""
+    count, _, period = rate.partition('/')
+    return int(count), PERIODS[period[-1]] * int(period[:-1] or 1)
+
+
+class BaseStorage:
+    """Корзина токенов: емкость count, полностью наполняется за period.
+
+    Наследники хранят состояние (токены, время) по ключу.
+    """
+
+    def load(self, key):
+        raise NotImplementedError
+
+    def store(self, key, state, period):
+        raise NotImplementedError
+
+    def consume(self, key, count, period, now=None):
+        """Берем токен; возвращаем 0 или секунды до следующего токена"""
+        now = time.time() if now is None else now
+        tokens, updated = self.load(key) or (count, now)
+        tokens = min(count, tokens + (now - updated) * count / period)
+        if tokens < 1:
+            self.store(key, (tokens, now), period)
+            return (1 - tokens) * period / count
+        self.store(key, (tokens - 1, now), period)
+        return 0
+
+
+class LocalStorage(BaseStorage):
+    """Корзины в памяти процесса: лимит действует на каждый процесс"""
+    max_entries = 10000
+
+    def __init__(self):
+        self.buckets = OrderedDict()
+        self.lock = threading.Lock()
+
+    def consume(self, key, count, period, now=None):
+        with self.lock:
+            return super().consume(key, count, period, now)
+
+    def load(self, key):
+        return self.buckets.get(key)
+
+    def store(self, key, state, period):
+        self.buckets[key] = state
+        self.buckets.move_to_end(key)
+        if len(self.buckets) > self.max_entries:
+            self.buckets.popitem(last=False)
+
+    def reset(self):
+        with self.lock:
+            self.buckets.clear()
+
+
+class CacheStorage(BaseStorage):
+    """Корзины в RATELIMIT_CACHE: общий лимит для всех процессов.
+
+    Чтение и запись не атомарны, при гонке запрос-другой может пройти
+    сверх лимита.
+    """
+
+    def __init__(self):
+        self.cache = caches[settings.RATELIMIT_CACHE]
+
+    def load(self, key):
+        return self.cache.get(f'ratelimit:{key}')
+
+    def store(self, key, state, period):
+        self.cache.set(f'ratelimit:{key}', state, period)
+
+    def reset(self):
+        pass
+
+
+@lru_cache(maxsize=None)
+def get_storage(path):
+    return import_string(path)()
+
+
+def client_ip(request):
+    # За прокси REMOTE_ADDR должен выставлять сам сервер приложения.
+    return request.META.get('REMOTE_ADDR', '')
+
+
+def request_keys(request, by):
+    keys = []
+    if 'user' in by and request.user.is_authenticated:
+        keys.append(f'user:{request.user.pk}')
+    if 'ip' in by or not keys:
+        keys.append(f'ip:{client_ip(request)}')
+    return keys
+
+
+def ratelimit(scope, by=('user', 'ip'), methods=('POST',)):
+    """Ограничиваем частоту запросов к view политикой RATELIMITS[scope].
+
+    by - по чему считать: 'user' (анонимных - по IP), 'ip' или оба;
+    каждый ключ - своя корзина. Ставится под @login_required: отказ 429
+    отдается до формы, хэширования пароля и записи в БД.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            rate = settings.RATELIMITS.get(scope)
+            if (not settings.RATELIMIT_ENABLED or rate is None
+                    or request.method not in methods):
+                return view(request, *args, **kwargs)
+            count, period = parse_rate(rate)
+            storage = get_storage(settings.RATELIMIT_STORAGE)
+            retry_after = max(
+                storage.consume(f'{scope}:{key}', count, period)
+                for key in request_keys(request, by)
+            )
+            if retry_after:
+                instrumentation.incr('ratelimited')
+                if settings.METRICS_ENABLED:
+                    metrics.RATE_LIMITED.inc(scope=scope)
+                response = HttpResponseTooManyRequests(
+                    'Слишком много запросов, попробуйте позже.',
+                    content_type='text/plain; charset=utf-8'
+                )
+                response['Retry-After'] = str(int(retry_after) + 1)
+                return response
+            return view(request, *args, **kwargs)
+        return wrapper
+    return decorator
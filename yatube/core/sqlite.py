@@ -0,0 +1,37 @@
+# Порядок важен: busy_timeout первым, чтобы смена journal_mode ждала
+# чужую блокировку, а не падала сразу.
+PRAGMA_ORDER = ('busy_timeout', 'journal_mode', 'synchronous', 'cache_size',
+                'mmap_size', 'temp_store')
+# Для базы в памяти журнал и отображение файла не имеют смысла.
+FILE_ONLY_PRAGMAS = ('journal_mode', 'mmap_size')
+
+
+def pragma_statements(pragmas, in_memory=False):
+    names = sorted(
+        pragmas, key=lambda name: (
+            PRAGMA_ORDER.index(name) if name in PRAGMA_ORDER
+            else len(PRAGMA_ORDER)
+        )
+    )
+    return [
+        f'PRAGMA {name} = {pragmas[name]}' for name in names
+        if not (in_memory and name in FILE_ONLY_PRAGMAS)
+    ]
+
+
+def configure_connection(sender, connection, **kwargs):
+    """connection_created: применяем SQLITE_PRAGMAS к новому соединению.
+
+    Соединения из пула (core.db.sqlite3_pool) настраиваются один раз,
+    когда пул их открывает, а сигнал приходит на каждую выдачу.
+    """
+    from django.conf import settings
+    if (connection.vendor != 'sqlite'
+            or getattr(connection, 'connection_pool', None) is not None):
+        return
+    statements = pragma_statements(
+        settings.SQLITE_PRAGMAS, connection.is_in_memory_db()
+    )
+    with connection.cursor() as cursor:
+        for statement in statements:
+            cursor.execute(statement)
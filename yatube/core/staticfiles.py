@@ -0,0 +1,48 @@
+import gzip
+import os
+
+from django.contrib.staticfiles.storage import ManifestStaticFilesStorage
+
+COMPRESSIBLE = ('.css', '.js', '.svg', '.ico', '.txt', '.json', '.xml',
+                '.html', '.map')
+# Сжатая копия нужна, только если она заметно меньше оригинала.
+MIN_SAVING = 0.05
+
+
+class CompressedManifestStaticFilesStorage(ManifestStaticFilesStorage):
+    """collectstatic пишет копии с хэшем содержимого в имени и рядом
+    gzip-варианты (.gz) текстовых файлов для StaticFilesMiddleware.
+    """
+    manifest_strict = False
+
+    def stored_name(self, name):
+        # Без collectstatic (разработка, тесты) отдаем исходное имя.
+        try:
+            return super().stored_name(name)
+        except ValueError:
+            return name
+
+    def post_process(self, paths, dry_run=False, **options):
+        compress = set()
+        for name, hashed_name, processed in super().post_process(
+                paths, dry_run, **options):
+            if hashed_name and not isinstance(processed, Exception):
+                compress.update((name, hashed_name))
+            yield name, hashed_name, processed
+        if not dry_run:
+            for name in sorted(compress):
+                self.compress(name)
+
+    def compress(self, name):
+        if not name.endswith(COMPRESSIBLE):
+            return
+        with self.open(name) as source:
+            data = source.read()
+        # mtime=0: одинаковое содержимое - одинаковый .gz между сборками.
+        packed = gzip.compress(data, compresslevel=9, mtime=0)
+        path = self.path(name + '.gz')
+        if len(packed) <= len(data) * (1 - MIN_SAVING):
+            with open(path, 'wb') as target:
+                target.write(packed)
+        elif os.path.exists(path):
+            os.remove(path)
@@ -0,0 +1,41 @@
+import os
+import tempfile
+
+from django.conf import settings
+from django.test import override_settings
+from django.test.runner import DiscoverRunner
+
+FILE_CACHE = 'django.core.cache.backends.filebased.FileBasedCache'
+
+
+def temporary_caches(root):
+    """CACHES из настроек, но файловые кэши лежат в каталогах внутри root.
+
+    Тесты чистят кэши и кладут туда своих пользователей: в каталогах,
+    которые делят запущенные на этой машине воркеры, тестовый
+    пользователь с id 1 стал бы пользователем сессии настоящего.
+    """
+    return {
+        alias: (
+            {**params, 'LOCATION': os.path.join(root, alias)}
+            if params['BACKEND'] == FILE_CACHE else params
+        )
+        for alias, params in settings.CACHES.items()
+    }
+
+
+class TestRunner(DiscoverRunner):
+    """Прогон тестов с файловыми кэшами во временном каталоге"""
+
+    def setup_test_environment(self, **kwargs):
+        super().setup_test_environment(**kwargs)
+        self.cache_root = tempfile.TemporaryDirectory(prefix='yatube-test-')
+        self.caches = override_settings(
+            CACHES=temporary_caches(self.cache_root.name)
+        )
+        self.caches.enable()
+
+    def teardown_test_environment(self, **kwargs):
+        self.caches.disable()
+        self.cache_root.cleanup()
+        super().teardown_test_environment(**kwargs)
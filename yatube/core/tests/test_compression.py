@@ -0,0 +1,92 @@
+import gzip
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse, StreamingHttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+from core.middleware.compression import CompressionMiddleware
+from posts.models import Post
+
+User = get_user_model()
+
+BODY = '<div class="card">Тестовый текст поста</div>' * 100
+
+
+class CompressionMiddlewareTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def respond(self, response, **headers):
+        headers.setdefault('HTTP_ACCEPT_ENCODING', 'gzip, deflate')
+        middleware = CompressionMiddleware(lambda request: response)
+        return middleware(self.factory.get('/', **headers))
+
+    def test_html_is_compressed(self):
+        """HTML сжимается, ETag становится слабым."""
+        response = HttpResponse(BODY)
+        response['ETag'] = '"abc"'
+        response = self.respond(response)
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertEqual(response['ETag'], 'W/"abc"')
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+        self.assertEqual(int(response['Content-Length']),
+                         len(response.content))
+        self.assertEqual(gzip.decompress(response.content).decode(), BODY)
+
+    def test_streaming_is_compressed(self):
+        """Потоковый ответ сжимается по частям."""
+        response = self.respond(StreamingHttpResponse(
+            BODY[i:i + 500] for i in range(0, len(BODY), 500)
+        ))
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertFalse(response.has_header('Content-Length'))
+        content = b''.join(response.streaming_content)
+        self.assertEqual(gzip.decompress(content).decode(), BODY)
+
+    def test_skipped_responses(self):
+        """Короткие, уже сжатые и no-transform ответы не трогаем."""
+        image = HttpResponse(b'\x89PNG' * 1000, content_type='image/png')
+        no_transform = HttpResponse(BODY)
+        no_transform['Cache-Control'] = 'no-transform'
+        for response in (HttpResponse('<p>коротко</p>'), image,
+                         no_transform):
+            with self.subTest(content_type=response['Content-Type']):
+                self.assertFalse(
+                    self.respond(response).has_header('Content-Encoding')
+                )
+
+    def test_client_without_gzip(self):
+        """Без gzip в Accept-Encoding отдаем как есть, но с Vary."""
+        response = self.respond(HttpResponse(BODY), HTTP_ACCEPT_ENCODING='')
+        self.assertFalse(response.has_header('Content-Encoding'))
+        self.assertEqual(response['Vary'], 'Accept-Encoding')
+
+    @override_settings(GZIP_LEVEL=1)
+    def test_level_is_tunable(self):
+        """Уровень сжатия берется из GZIP_LEVEL."""
+        fast = self.respond(HttpResponse(BODY))
+        with self.settings(GZIP_LEVEL=9):
+            best = self.respond(HttpResponse(BODY))
+        self.assertGreaterEqual(len(fast.content), len(best.content))
+        self.assertEqual(fast.content[:2], b'\x1f\x8b')
+
+    def test_feed_reports_ratio(self):
+        """Лента сжимается, байты и время видны в Server-Timing."""
+        user = User.objects.create_user(username='LucyTestGzip')
+        Post.objects.bulk_create(
+            Post(text=BODY[:300], author=user) for _ in range(10)
+        )
+        cache.clear()
+        response = Client().get(
+            reverse('posts:index'), HTTP_ACCEPT_ENCODING='gzip'
+        )
+        self.assertEqual(response['Content-Encoding'], 'gzip')
+        self.assertIn('gzip;dur=', response['Server-Timing'])
+        self.assertIn('gzip-in;desc=', response['Server-Timing'])
+        self.assertIn(
+            'yatube_compression_ratio_count{view="posts:index"}',
+            metrics.render()
+        )
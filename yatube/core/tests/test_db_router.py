@@ -0,0 +1,100 @@
+import time
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.http import HttpResponse
+from django.test import Client, RequestFactory, TestCase, override_settings
+from django.urls import reverse
+
+from core.db_router import PIN_COOKIE, read_from_replica
+from posts.models import Post
+
+User = get_user_model()
+
+
+@read_from_replica
+def read_view(request):
+    return HttpResponse(Post.objects.all().db)
+
+
+@override_settings(DATABASE_REPLICAS=['replica_test'])
+class ReplicaRoutingTest(TestCase):
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def test_reads_go_to_replica(self):
+        """Чтения внутри view с read_from_replica идут на реплику."""
+        response = read_view(self.factory.get('/'))
+        self.assertEqual(response.content, b'replica_test')
+
+    def test_outside_views_read_primary(self):
+        """Вне помеченных views и для записей используется default."""
+        self.assertEqual(Post.objects.all().db, 'default')
+        self.assertEqual(Post.objects.db_manager().db, 'default')
+
+    def test_pinned_user_reads_primary(self):
+        """Свежая кука после записи возвращает чтения на default."""
+        request = self.factory.get('/')
+        request.COOKIES[PIN_COOKIE] = str(time.time() + 10)
+        self.assertEqual(read_view(request).content, b'default')
+        request.COOKIES[PIN_COOKIE] = str(time.time() - 1)
+        self.assertEqual(read_view(request).content, b'replica_test')
+        request.COOKIES[PIN_COOKIE] = 'garbage'
+        self.assertEqual(read_view(request).content, b'replica_test')
+
+    def test_write_sets_pin_cookie(self):
+        """Успешный POST закрепляет пользователя за основной БД."""
+        user = User.objects.create_user(username='writer')
+        client = Client()
+        client.force_login(user)
+        response = client.post(
+            reverse('posts:post_create'), data={'text': 'Новый пост'}
+        )
+        self.assertIn(PIN_COOKIE, response.cookies)
+        self.assertGreater(float(response.cookies[PIN_COOKIE].value),
+                           time.time())
+
+    @override_settings(DATABASE_REPLICAS=[])
+    def test_without_replicas(self):
+        """Без реплик маршрутизация не меняется и кука не ставится."""
+        self.assertEqual(read_view(self.factory.get('/')).content,
+                         b'default')
+        user = User.objects.create_user(username='writer')
+        client = Client()
+        client.force_login(user)
+        response = client.post(
+            reverse('posts:post_create'), data={'text': 'Новый пост'}
+        )
+        self.assertNotIn(PIN_COOKIE, response.cookies)
+
+
+# Реплика - та же база: проверяется только, что кладется в кэш.
+@override_settings(DATABASE_REPLICAS=['default'], DATABASE_REPLICA_PIN=10)
+class ReplicaCacheTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='LucyTestReplica')
+        Post.objects.create(text='Пост с реплики', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+
+    def get_twice(self):
+        self.client.get(reverse('posts:index'))
+        return self.client.get(reverse('posts:index'))
+
+    def test_fresh_tags_not_cached(self):
+        """Сразу после сброса тегов прочитанное с реплики не кэшируется."""
+        response = self.get_twice()
+        self.assertTemplateUsed(response, 'includes/group_post.html')
+        self.assertFalse(response.has_header('ETag'))
+
+    def test_settled_tags_cached(self):
+        """Когда реплика успела догнать сброс, страница кэшируется."""
+        self.client.get(reverse('posts:index'))
+        with mock.patch('posts.cache.time.time',
+                        return_value=time.time() + 11):
+            response = self.get_twice()
+        self.assertTemplateNotUsed(response, 'includes/group_post.html')
+        self.assertTrue(response.has_header('ETag'))
@@ -0,0 +1,56 @@
+import json
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from posts.models import Post
+
+User = get_user_model()
+
+
+class InstrumentationMiddlewareTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestTiming')
+        Post.objects.create(text='Тестовый текст поста', author=cls.user)
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def server_timing(self, response):
+        return {
+            entry.split(';')[0]: entry
+            for entry in response['Server-Timing'].split(', ')
+        }
+
+    def test_server_timing_header(self):
+        """Заголовок содержит БД, шаблоны, include и кэш."""
+        response = self.guest_client.get(reverse('posts:index'))
+        timing = self.server_timing(response)
+        for name in ('total', 'db', 'tpl', 'view',
+                     'tpl-posts_index.html',
+                     'tpl-includes_group_post.html',
+                     'cache-page-miss', 'cache-card-miss'):
+            with self.subTest(name=name):
+                self.assertIn(name, timing)
+        response = self.guest_client.get(reverse('posts:index'))
+        self.assertIn('cache-page-hit', self.server_timing(response))
+
+    def test_structured_log_line(self):
+        """На каждый запрос в лог пишется строка JSON."""
+        with self.assertLogs('core.instrumentation', 'INFO') as logs:
+            self.guest_client.get(reverse('posts:index'))
+        record = json.loads(logs.records[0].getMessage())
+        self.assertEqual(record['view'], 'posts:index')
+        self.assertEqual(record['status'], 200)
+        self.assertGreater(record['queries'], 0)
+
+    @override_settings(INSTRUMENTATION_SAMPLE_RATE=0)
+    def test_sampling(self):
+        """Запросы вне выборки не замеряются."""
+        response = Client().get(reverse('posts:index'))
+        self.assertFalse(response.has_header('Server-Timing'))
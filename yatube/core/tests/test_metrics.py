@@ -0,0 +1,126 @@
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import threading
+
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase, override_settings
+from django.urls import reverse
+
+from core import metrics
+
+User = get_user_model()
+
+
+# Client ходит с REMOTE_ADDR=127.0.0.1: это и есть сборщик метрик.
+@override_settings(METRICS_ALLOWED_IPS=['127.0.0.1'])
+class MetricsEndpointTest(TestCase):
+    def setUp(self):
+        self.guest_client = Client()
+
+    def sample(self, text, line_start):
+        for line in text.splitlines():
+            if line.startswith(line_start):
+                return float(line.rsplit(' ', 1)[1])
+        return 0.0
+
+    def test_request_metrics_exposed(self):
+        """Запрос к ленте попадает в гистограммы по имени view."""
+        count = 'yatube_request_duration_seconds_count{view="posts:index"}'
+        before = self.sample(
+            self.guest_client.get(reverse('metrics')).content.decode(), count
+        )
+        self.guest_client.get(reverse('posts:index'))
+        response = self.guest_client.get(reverse('metrics'))
+        text = response.content.decode()
+        self.assertTrue(response['Content-Type'].startswith('text/plain'))
+        self.assertEqual(self.sample(text, count), before + 1)
+        self.assertIn('# TYPE yatube_request_queries histogram', text)
+        self.assertIn(
+            'yatube_requests_total{view="posts:index",status="2xx"}', text
+        )
+        self.assertIn('yatube_response_size_bytes_bucket{view="posts:index"',
+                      text)
+
+    def test_multiprocess_aggregation(self):
+        """Снимки других процессов суммируются с метриками процесса."""
+        with tempfile.TemporaryDirectory() as directory:
+            with self.settings(METRICS_MULTIPROCESS_DIR=directory):
+                with open(os.path.join(directory, '1.json'), 'w') as stream:
+                    json.dump(
+                        [['yatube_request_errors', ['posts:other'], [3]]],
+                        stream
+                    )
+                self.guest_client.get(reverse('posts:index'))
+                metrics.flush(force=True)
+                self.assertTrue(os.path.exists(
+                    os.path.join(directory, f'{os.getpid()}.json')
+                ))
+                text = self.guest_client.get(reverse('metrics')).content
+        self.assertIn(
+            b'yatube_request_errors_total{view="posts:other"} 3', text
+        )
+
+    def test_dead_process_snapshot_retired(self):
+        """Снимок завершившегося воркера удаляется, а его счетчики
+        остаются в сумме и не уменьшаются.
+        """
+        process = subprocess.Popen([sys.executable, '-c', ''])
+        process.wait()
+        line = b'yatube_request_errors_total{view="posts:dead"} 5'
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, f'{process.pid}.json')
+            with open(path, 'w') as stream:
+                json.dump(
+                    [['yatube_request_errors', ['posts:dead'], [5]]], stream
+                )
+            with self.settings(METRICS_MULTIPROCESS_DIR=directory):
+                text = self.guest_client.get(reverse('metrics')).content
+                self.assertFalse(os.path.exists(path))
+                self.assertIn(line, text)
+                text = self.guest_client.get(reverse('metrics')).content
+                self.assertIn(line, text)
+
+    def test_finished_threads_are_merged(self):
+        """Значения завершившихся потоков сохраняются, их словари
+        убираются.
+        """
+        shards = len(metrics._shards)
+        before = metrics.snapshot().get(
+            ('yatube_rate_limited', ('thread-test',)), [0]
+        )[0]
+        threads = [
+            threading.Thread(
+                target=metrics.RATE_LIMITED.inc,
+                kwargs={'scope': 'thread-test'}
+            )
+            for _ in range(5)
+        ]
+        for thread in threads:
+            thread.start()
+            thread.join()
+        self.assertEqual(len(metrics._shards), shards)
+        self.assertEqual(
+            metrics.snapshot()[('yatube_rate_limited', ('thread-test',))][0],
+            before + 5
+        )
+
+    def test_access_restricted(self):
+        """Чужим адресам страницы нет, сотрудникам она доступна."""
+        url = reverse('metrics')
+        self.assertEqual(
+            self.guest_client.get(url, REMOTE_ADDR='203.0.113.5').status_code,
+            404
+        )
+        with self.settings(METRICS_ALLOWED_IPS=[]):
+            # За прокси на этом же сервере все приходят с localhost.
+            self.assertEqual(self.guest_client.get(url).status_code, 404)
+        staff = Client()
+        staff.force_login(User.objects.create_user(
+            username='LucyTestMetrics', is_staff=True
+        ))
+        self.assertEqual(
+            staff.get(url, REMOTE_ADDR='203.0.113.5').status_code, 200
+        )
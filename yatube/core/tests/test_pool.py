@@ -0,0 +1,226 @@
+import gc
+import os
+import tempfile
+import threading
+import weakref
+
+from django.db import connection
+from django.test import SimpleTestCase, TestCase
+
+from core import instrumentation
+from core.db.sqlite3_pool.base import DatabaseWrapper
+from core.pool import Pool, PoolTimeout, close_pools, pool_stats
+
+
+class FakeConnection:
+    def __init__(self, number):
+        self.number = number
+        self.closed = False
+        self.healthy = True
+
+    def close(self):
+        self.closed = True
+
+
+def make_pool(**options):
+    opened = []
+
+    def connect():
+        opened.append(FakeConnection(len(opened)))
+        return opened[-1]
+
+    def check(connection):
+        if not connection.healthy:
+            raise RuntimeError('broken')
+
+    return Pool('test', connect, check, **options), opened
+
+
+class PoolTest(SimpleTestCase):
+    def test_reuse(self):
+        """Возвращенное соединение выдается снова, новое не открывается."""
+        pool, opened = make_pool(min_size=0, max_size=2)
+        first = pool.acquire()
+        pool.release(first)
+        self.assertIs(pool.acquire(), first)
+        self.assertEqual(len(opened), 1)
+
+    def test_fill(self):
+        """fill открывает min_size соединений заранее."""
+        pool, opened = make_pool(min_size=2, max_size=4)
+        pool.fill()
+        self.assertEqual(len(opened), 2)
+        self.assertEqual(pool.stats()['idle'], 2)
+
+    def test_timeout(self):
+        """Сверх max_size соединение не выдается дольше timeout."""
+        pool, opened = make_pool(min_size=0, max_size=1, timeout=0.01)
+        pool.acquire()
+        with self.assertRaises(PoolTimeout):
+            pool.acquire()
+        stats = pool.stats()
+        self.assertEqual(stats['timeouts'], 1)
+        self.assertEqual(stats['waiting'], 0)
+        self.assertEqual(len(opened), 1)
+
+    def test_waiter_gets_released_connection(self):
+        """Ждущий поток получает соединение, как только его вернули."""
+        pool, opened = make_pool(min_size=0, max_size=1, timeout=5)
+        first = pool.acquire()
+        received = []
+        thread = threading.Thread(
+            target=lambda: received.append(pool.acquire())
+        )
+        thread.start()
+        while not pool.stats()['waiting']:
+            pass
+        pool.release(first)
+        thread.join()
+        self.assertEqual(received, [first])
+        self.assertEqual(pool.stats()['waits'], 1)
+
+    def test_unhealthy_connection_is_replaced(self):
+        """Соединение, не прошедшее проверку, закрывается и заменяется."""
+        pool, opened = make_pool(min_size=0, max_size=1)
+        first = pool.acquire()
+        first.healthy = False
+        pool.release(first)
+        with self.assertLogs('core.pool', 'WARNING'):
+            second = pool.acquire()
+        self.assertIsNot(second, first)
+        self.assertTrue(first.closed)
+        self.assertEqual(pool.stats()['closed_unhealthy'], 1)
+
+    def test_broken_connection_frees_slot(self):
+        """Сломанное соединение закрывается, место достается следующему."""
+        pool, opened = make_pool(min_size=0, max_size=1, timeout=0.01)
+        pool.release(pool.acquire(), broken=True)
+        pool.acquire()
+        self.assertEqual(len(opened), 2)
+        self.assertTrue(opened[0].closed)
+
+    def test_idle_eviction(self):
+        """Простаивающие соединения закрываются, но не меньше min_size."""
+        pool, opened = make_pool(min_size=1, max_size=3, max_idle=0)
+        connections = [pool.acquire() for _ in range(3)]
+        for pooled in connections:
+            pool.release(pooled)
+        stats = pool.stats()
+        self.assertEqual(stats['size'], 1)
+        self.assertEqual(stats['idle'], 1)
+        self.assertEqual(stats['closed_idle'], 2)
+
+    def test_instrumentation(self):
+        """Ожидание и новые соединения попадают в замеры запроса."""
+        pool, opened = make_pool(min_size=0, max_size=1)
+        metrics, token = instrumentation.start()
+        try:
+            pool.acquire()
+        finally:
+            instrumentation.stop(token)
+        self.assertEqual(metrics.counters['db-pool-connect'], 1)
+        self.assertIn('db-pool-wait', metrics.timings)
+
+
+class PooledBackendTest(TestCase):
+    def setUp(self):
+        directory = tempfile.TemporaryDirectory()
+        self.addCleanup(directory.cleanup)
+        self.settings_dict = {
+            **connection.settings_dict,
+            'NAME': os.path.join(directory.name, 'pool.sqlite3'),
+            'POOL': {'MIN_SIZE': 1, 'MAX_SIZE': 2, 'TIMEOUT': 5},
+        }
+        self.addCleanup(close_pools)
+
+    def wrapper(self):
+        return DatabaseWrapper(self.settings_dict, alias='pooled')
+
+    def test_memory_database_is_not_pooled(self):
+        """Тестовая база в памяти работает без пула."""
+        connection.ensure_connection()
+        self.assertIsNone(connection.connection_pool)
+
+    def test_connection_is_returned(self):
+        """close возвращает соединение в пул, следующее берется оттуда."""
+        first = self.wrapper()
+        first.ensure_connection()
+        raw = first.connection
+        first.close()
+        self.assertEqual(pool_stats()['pooled']['idle'], 1)
+        second = self.wrapper()
+        second.ensure_connection()
+        self.assertIs(second.connection, raw)
+        second.close()
+        self.assertEqual(pool_stats()['pooled']['created'], 1)
+
+    def test_pragmas_applied_once(self):
+        """PRAGMA выполняются при открытии соединения, а не при выдаче."""
+        first = self.wrapper()
+        first.ensure_connection()
+        raw = first.connection
+        with first.cursor() as cursor:
+            cursor.execute('PRAGMA journal_mode')
+            self.assertEqual(cursor.fetchone()[0], 'wal')
+        first.close()
+        statements = []
+        raw.set_trace_callback(statements.append)
+        second = self.wrapper()
+        with second.cursor() as cursor:
+            cursor.execute('SELECT 1')
+        second.close()
+        raw.set_trace_callback(None)
+        self.assertIs(second.connection, None)
+        self.assertFalse(
+            [sql for sql in statements if sql.startswith('PRAGMA')]
+        )
+
+    def test_pool_does_not_keep_wrapper(self):
+        """Пул не держит обертку потока, который его создал."""
+        wrapper = self.wrapper()
+        wrapper.ensure_connection()
+        wrapper.close()
+        reference = weakref.ref(wrapper)
+        del wrapper
+        gc.collect()
+        self.assertIsNone(reference())
+
+    def test_open_transaction_is_rolled_back(self):
+        """Незавершенная транзакция откатывается при возврате в пул."""
+        first = self.wrapper()
+        with first.cursor() as cursor:
+            cursor.execute('CREATE TABLE numbers (value INTEGER)')
+        first.set_autocommit(False)
+        with first.cursor() as cursor:
+            cursor.execute('INSERT INTO numbers VALUES (1)')
+        first.close()
+        second = self.wrapper()
+        with second.cursor() as cursor:
+            cursor.execute('SELECT count(*) FROM numbers')
+            self.assertEqual(cursor.fetchone()[0], 0)
+        second.close()
+
+    def test_threads(self):
+        """Потоки делят MAX_SIZE соединений без ошибок."""
+        errors = []
+
+        def work():
+            try:
+                for _ in range(20):
+                    wrapper = self.wrapper()
+                    with wrapper.cursor() as cursor:
+                        cursor.execute('SELECT 1')
+                    wrapper.close()
+            except Exception as error:
+                errors.append(error)
+
+        threads = [threading.Thread(target=work) for _ in range(6)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        self.assertEqual(errors, [])
+        stats = pool_stats()['pooled']
+        self.assertLessEqual(stats['created'], 2)
+        self.assertEqual(stats['checkouts'], 6 * 20)
+        self.assertEqual(stats['in_use'], 0)
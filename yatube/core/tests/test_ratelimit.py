@@ -0,0 +1,101 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import connection
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from core.ratelimit import (CacheStorage, LocalStorage, get_storage,
+                            parse_rate)
+from posts.models import Post
+
+User = get_user_model()
+
+
+class TokenBucketTest(SimpleTestCase):
+    def test_parse_rate(self):
+        """Политика 'count/period' с множителем периода."""
+        self.assertEqual(parse_rate('10/m'), (10, 60))
+        self.assertEqual(parse_rate('5/15m'), (5, 900))
+        self.assertEqual(parse_rate('100/d'), (100, 86400))
+
+    def test_bucket_refills(self):
+        """Корзина отдает count токенов и наполняется за period."""
+        for storage in (LocalStorage(), CacheStorage()):
+            with self.subTest(storage=type(storage).__name__):
+                cache.clear()
+                for _ in range(3):
+                    self.assertEqual(storage.consume('k', 3, 60, now=0), 0)
+                self.assertAlmostEqual(
+                    storage.consume('k', 3, 60, now=0), 20
+                )
+                self.assertEqual(storage.consume('k', 3, 60, now=20), 0)
+                self.assertGreater(storage.consume('k', 3, 60, now=20), 0)
+                self.assertEqual(storage.consume('other', 3, 60, now=20), 0)
+
+
+@override_settings(RATELIMITS={'post_create': '2/m', 'login': '2/m',
+                               'signup': '2/m', 'password_reset': '2/h'})
+class RateLimitViewsTest(TestCase):
+    def setUp(self):
+        # id пользователей повторяются между тестами, как и ключи корзин.
+        storage = get_storage('core.ratelimit.LocalStorage')
+        storage.reset()
+        self.addCleanup(storage.reset)
+        self.user = User.objects.create_user(username='LucyTestLimit')
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def post_new(self, client=None):
+        return (client or self.client).post(
+            reverse('posts:post_create'), {'text': 'Пост'}
+        )
+
+    def test_post_create_limited_per_user(self):
+        """Третий пост в минуту получает 429 без обращений к БД."""
+        self.post_new()
+        self.post_new()
+        with CaptureQueriesContext(connection) as queries:
+            response = self.post_new()
+        self.assertEqual(response.status_code, 429)
+        self.assertTrue(response.has_header('Retry-After'))
+        self.assertFalse(any(
+            query['sql'].startswith(('INSERT', 'UPDATE'))
+            for query in queries
+        ))
+        self.assertEqual(Post.objects.count(), 2)
+        other = Client()
+        other.force_login(User.objects.create_user(username='LucyOther'))
+        self.assertEqual(self.post_new(other).status_code, 302)
+
+    def test_get_not_limited(self):
+        """Открывать форму можно сколько угодно."""
+        for _ in range(5):
+            response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 200)
+
+    def test_anonymous_redirected_to_login(self):
+        """Анонимный POST по-прежнему уходит на вход."""
+        response = Client().post(reverse('posts:post_create'), {})
+        self.assertEqual(response.status_code, 302)
+
+    def test_auth_forms_limited_per_ip(self):
+        """Вход, регистрация и сброс пароля ограничены по IP."""
+        urls = (
+            reverse('users:login'), reverse('users:signup'),
+            reverse('users:password_reset_form'), '/auth/password_reset/',
+        )
+        for url in urls:
+            with self.subTest(url=url):
+                get_storage('core.ratelimit.LocalStorage').reset()
+                client = Client()
+                statuses = [client.post(url, {}).status_code
+                            for _ in range(3)]
+                self.assertNotEqual(statuses[0], 429)
+                self.assertEqual(statuses[-1], 429)
+
+    @override_settings(RATELIMIT_ENABLED=False)
+    def test_disabled(self):
+        """RATELIMIT_ENABLED=False снимает лимиты."""
+        for _ in range(3):
+            self.assertEqual(self.post_new().status_code, 302)
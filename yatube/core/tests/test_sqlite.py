@@ -0,0 +1,89 @@
+import os
+import tempfile
+from io import StringIO
+
+from django.core.management import call_command
+from django.db import connection
+from django.db.backends.sqlite3.base import DatabaseWrapper
+from django.test import SimpleTestCase, TestCase, override_settings
+
+from core.sqlite import pragma_statements
+
+PRAGMAS = {
+    'temp_store': 'MEMORY',
+    'journal_mode': 'WAL',
+    'busy_timeout': 5000,
+    'mmap_size': 1024,
+}
+
+
+def pragma(cursor, name):
+    cursor.execute(f'PRAGMA {name}')
+    return cursor.fetchone()[0]
+
+
+class PragmaStatementsTest(SimpleTestCase):
+    def test_order(self):
+        """busy_timeout идет первым, неизвестные прагмы - в конце."""
+        statements = pragma_statements({**PRAGMAS, 'foreign_keys': 1})
+        self.assertEqual(statements, [
+            'PRAGMA busy_timeout = 5000',
+            'PRAGMA journal_mode = WAL',
+            'PRAGMA mmap_size = 1024',
+            'PRAGMA temp_store = MEMORY',
+            'PRAGMA foreign_keys = 1',
+        ])
+
+    def test_in_memory(self):
+        """Для базы в памяти журнал и mmap не настраиваются."""
+        self.assertEqual(pragma_statements(PRAGMAS, in_memory=True), [
+            'PRAGMA busy_timeout = 5000',
+            'PRAGMA temp_store = MEMORY',
+        ])
+
+
+class ConnectionPragmasTest(TestCase):
+    def test_test_database(self):
+        """Тестовая база в памяти получает настройки из SQLITE_PRAGMAS."""
+        with connection.cursor() as cursor:
+            self.assertEqual(pragma(cursor, 'busy_timeout'), 5000)
+            self.assertEqual(pragma(cursor, 'synchronous'), 1)
+            self.assertEqual(pragma(cursor, 'cache_size'), -20000)
+            self.assertEqual(pragma(cursor, 'temp_store'), 2)
+            self.assertEqual(pragma(cursor, 'journal_mode'), 'memory')
+
+    @override_settings(SQLITE_PRAGMAS=PRAGMAS)
+    def test_file_database(self):
+        """Файловая база переводится в WAL при первом соединении."""
+        with tempfile.TemporaryDirectory() as directory:
+            wrapper = DatabaseWrapper(
+                {
+                    **connection.settings_dict,
+                    'NAME': os.path.join(directory, 'pragmas.sqlite3'),
+                },
+                alias='pragmas'
+            )
+            try:
+                with wrapper.cursor() as cursor:
+                    self.assertEqual(pragma(cursor, 'journal_mode'), 'wal')
+                    self.assertEqual(pragma(cursor, 'mmap_size'), 1024)
+            finally:
+                wrapper.close()
+
+
+class DbMaintenanceTest(TestCase):
+    def test_report(self):
+        """Команда обновляет статистику и сообщает о выключенном VACUUM."""
+        out = StringIO()
+        call_command('db_maintenance', stdout=out)
+        output = out.getvalue()
+        self.assertIn('ANALYZE', output)
+        self.assertIn('auto_vacuum выключен', output)
+        self.assertNotIn('wal_checkpoint', output)
+        self.assertIn('Страниц:', output)
+        with connection.cursor() as cursor:
+            cursor.execute(
+                'SELECT count(*) FROM sqlite_master WHERE name = %s',
+                ['sqlite_stat1']
+            )
+            self.assertEqual(cursor.fetchone()[0], 1)
@@ -0,0 +1,99 @@
+import gzip
+import shutil
+import tempfile
+
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.management import call_command
+from django.http import HttpResponse
+from django.template import Context, Template
+from django.test import RequestFactory, SimpleTestCase, override_settings
+
+from core.middleware.static import StaticFilesMiddleware, accepts_gzip
+
+
+class StaticPipelineTest(SimpleTestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.static_root = tempfile.mkdtemp()
+        cls.settings_override = override_settings(
+            STATIC_ROOT=cls.static_root
+        )
+        cls.settings_override.enable()
+        call_command('collectstatic', interactive=False, verbosity=0)
+        cls.middleware = StaticFilesMiddleware(
+            lambda request: HttpResponse('view')
+        )
+        cls.css = Template(
+            "{% load static %}{% static 'css/bootstrap.min.css' %}"
+        ).render(Context())
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.settings_override.disable()
+        shutil.rmtree(cls.static_root)
+        super().tearDownClass()
+
+    def setUp(self):
+        self.factory = RequestFactory()
+
+    def get(self, path, **headers):
+        return self.middleware(self.factory.get(path, **headers))
+
+    def test_hashed_url(self):
+        """{% static %} ссылается на копию с хэшем содержимого."""
+        self.assertRegex(self.css,
+                         r'^/static/css/bootstrap\.min\.[0-9a-f]{12}\.css$')
+
+    def test_gzip_negotiation(self):
+        """gzip-вариант отдается только тем, кто его принимает."""
+        plain = self.get(self.css)
+        packed = self.get(self.css, HTTP_ACCEPT_ENCODING='br, gzip')
+        body = b''.join(plain.streaming_content)
+        self.assertNotIn('Content-Encoding', plain)
+        self.assertEqual(packed['Content-Encoding'], 'gzip')
+        self.assertEqual(packed['Content-Type'], 'text/css')
+        self.assertEqual(packed['Vary'], 'Accept-Encoding')
+        self.assertEqual(
+            gzip.decompress(b''.join(packed.streaming_content)), body
+        )
+        self.assertLess(int(packed['Content-Length']), len(body))
+        self.assertNotEqual(plain['ETag'], packed['ETag'])
+
+    def test_cache_headers(self):
+        """Файлы с хэшем кэшируются навсегда, исходные имена - нет."""
+        self.assertIn('immutable', self.get(self.css)['Cache-Control'])
+        self.assertNotIn(
+            'immutable',
+            self.get('/static/css/bootstrap.min.css')['Cache-Control']
+        )
+        response = self.get('/static/img/logo.png')
+        self.assertEqual(response['Content-Type'], 'image/png')
+        self.assertNotIn('Vary', response)
+
+    def test_not_modified(self):
+        """Совпавший ETag дает 304 без тела."""
+        etag = self.get(self.css)['ETag']
+        response = self.get(self.css, HTTP_IF_NONE_MATCH=etag)
+        self.assertEqual(response.status_code, 304)
+
+    def test_other_paths_pass_through(self):
+        """Незнакомые пути и POST уходят дальше во view."""
+        self.assertEqual(self.get('/static/missing.css').content, b'view')
+        response = self.middleware(self.factory.post(self.css))
+        self.assertEqual(response.content, b'view')
+
+    def test_accepts_gzip(self):
+        """Accept-Encoding учитывает q=0 и *."""
+        self.assertTrue(accepts_gzip('gzip, deflate'))
+        self.assertTrue(accepts_gzip('*'))
+        self.assertFalse(accepts_gzip('gzip;q=0, br'))
+        self.assertFalse(accepts_gzip('identity'))
+        self.assertFalse(accepts_gzip(''))
+
+    def test_not_used_without_collectstatic(self):
+        """Без собранной статики middleware отключается."""
+        with tempfile.TemporaryDirectory() as empty_root:
+            with self.settings(STATIC_ROOT=empty_root):
+                with self.assertRaises(MiddlewareNotUsed):
+                    StaticFilesMiddleware(lambda request: None)
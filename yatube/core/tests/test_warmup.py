@@ -0,0 +1,54 @@
+import importlib
+from io import StringIO
+from unittest import mock
+
+from django.conf import settings
+from django.contrib.auth import password_validation
+from django.core.management import call_command
+from django.template import engines
+from django.test import SimpleTestCase, override_settings
+
+from core import warmup
+from yatube import wsgi
+
+
+class WarmupTest(SimpleTestCase):
+    def test_steps_are_reported(self):
+        """Прогрев проходит все шаги и считает объекты каждого шага."""
+        warmup.reset()
+        report = warmup.run()
+        self.assertEqual([name for name, _, _ in report],
+                         [name for name, _ in warmup.STEPS])
+        counts = {name: count for name, count, _ in report}
+        self.assertGreater(counts['templates'], 20)
+        self.assertGreater(counts['urls'], 1)
+        self.assertEqual(counts['validators'],
+                         len(settings.AUTH_PASSWORD_VALIDATORS))
+        self.assertEqual(
+            password_validation.get_default_password_validators
+            .cache_info().currsize, 1
+        )
+
+    def test_templates_are_cached(self):
+        """После прогрева шаблоны берутся из cached-загрузчика."""
+        warmup.reset()
+        warmup.run()
+        loader = engines['django'].engine.template_loaders[0]
+        self.assertIn('posts/index.html', loader.get_template_cache)
+        self.assertIn('includes/header.html', loader.get_template_cache)
+
+    def test_command(self):
+        """Команда warmup печатает время каждого шага."""
+        out = StringIO()
+        call_command('warmup', stdout=out)
+        for name, _ in warmup.STEPS:
+            self.assertIn(name, out.getvalue())
+
+    def test_wsgi_process_is_warmed(self):
+        """Прогрев запускает загрузка yatube.wsgi, если он включен."""
+        for enabled in (True, False):
+            with self.subTest(enabled=enabled):
+                with mock.patch.object(warmup, 'run') as run:
+                    with override_settings(WARMUP_ON_START=enabled):
+                        importlib.reload(wsgi)
+                self.assertEqual(run.called, enabled)
@@ -0,0 +1,22 @@
+from django.conf import settings
+from django.http import HttpResponse, HttpResponseNotFound
+
+from . import metrics as metrics_registry
+
+
+def metrics(request):
+    """Метрики процесса и его соседей в формате Prometheus.
+
+    Доступны сотрудникам сайта и с адресов METRICS_ALLOWED_IPS (по
+    умолчанию пуст), остальным страницы нет.
+    """
+    allowed = (
+        request.META.get('REMOTE_ADDR') in settings.METRICS_ALLOWED_IPS
+        or request.user.is_staff
+    )
+    if not settings.METRICS_ENABLED or not allowed:
+        return HttpResponseNotFound()
+    return HttpResponse(
+        metrics_registry.render(),
+        content_type='text/plain; version=0.0.4; charset=utf-8'
+    )
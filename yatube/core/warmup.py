@@ -0,0 +1,95 @@
+import logging
+import os
+import time
+
+from django.conf import settings
+from django.contrib.auth import password_validation
+from django.template import engines
+from django.template.backends.django import DjangoTemplates
+from django.urls import clear_url_caches, get_resolver
+from django.utils import formats, translation
+from django.utils.translation import trans_real
+
+logger = logging.getLogger('core.warmup')
+
+
+def templates():
+    """Компилируем все шаблоны из DIRS: с cached-загрузчиком они
+    остаются в памяти, без него прогреваются библиотеки тегов.
+    """
+    compiled = 0
+    for backend in engines.all():
+        if not isinstance(backend, DjangoTemplates):
+            continue
+        for directory in backend.engine.dirs:
+            for root, _, files in os.walk(directory):
+                for filename in files:
+                    name = os.path.relpath(
+                        os.path.join(root, filename), directory
+                    ).replace(os.sep, '/')
+                    try:
+                        backend.engine.get_template(name)
+                    except Exception:
+                        logger.warning('Шаблон %s не скомпилирован', name,
+                                       exc_info=True)
+                    else:
+                        compiled += 1
+    return compiled
+
+
+def urls():
+    """Строим таблицы reverse() корневого резолвера и всех пространств"""
+    primed = 0
+    resolvers = [get_resolver()]
+    while resolvers:
+        resolver = resolvers.pop()
+        resolver.reverse_dict
+        resolvers.extend(sub for _, sub in resolver.namespace_dict.values())
+        primed += 1
+    return primed
+
+
+def locale():
+    """Загружаем каталоги переводов и форматы языка сайта"""
+    with translation.override(settings.LANGUAGE_CODE):
+        translation.gettext('Password')
+        formats.get_format('DATE_FORMAT')
+    return 1
+
+
+def validators():
+    """CommonPasswordValidator читает список паролей при создании"""
+    return len(password_validation.get_default_password_validators())
+
+
+STEPS = (
+    ('templates', templates),
+    ('urls', urls),
+    ('locale', locale),
+    ('validators', validators),
+)
+
+
+def reset():
+    """Сбрасываем прогретое, как это делает Django при смене настроек"""
+    for backend in engines.all():
+        if isinstance(backend, DjangoTemplates):
+            for loader in backend.engine.template_loaders:
+                if hasattr(loader, 'reset'):
+                    loader.reset()
+    clear_url_caches()
+    trans_real._translations = {}
+    trans_real._default = None
+    password_validation.get_default_password_validators.cache_clear()
+
+
+def run():
+    """Прогрев процесса: [(шаг, число объектов, секунды)]"""
+    report = []
+    for name, step in STEPS:
+        started = time.perf_counter()
+        count = step()
+        elapsed = time.perf_counter() - started
+        report.append((name, count, elapsed))
+        logger.info('Прогрев %s: %d за %.1f мс', name, count, elapsed * 1000)
+    return report
@@ -0,0 +1,66 @@
+from datetime import timedelta
+
+from django.conf import settings
+from django.db import router, transaction
+from django.utils import timezone
+
+from .models import ArchivedPost, Post
+from .signals import posts_archived
+
+FIELDS = ('id', 'text', 'pub_date', 'updated', 'author_id', 'group_id')
+
+
+def archive_cutoff(days=None):
+    """Посты с pub_date раньше этого момента уходят в архив"""
+    if days is None:
+        days = settings.POSTS_ARCHIVE_AFTER_DAYS
+    return timezone.now() - timedelta(days=days)
+
+
+@transaction.atomic
+def archive_batch(before, batch_size):
+    """Переносим в архив до batch_size самых старых постов"""
+    posts = [
+        ArchivedPost(**dict(zip(FIELDS, row)))
+        for row in Post.objects.filter(pub_date__lt=before)
+        .order_by('pub_date', 'id').values_list(*FIELDS)[:batch_size]
+    ]
+    if not posts:
+        return 0
+    ArchivedPost.objects.bulk_create(posts)
+    # Пост не удаляется, а переезжает: без post_delete и его обработчиков
+    # (счетчики, поисковый индекс).
+    Post.objects.filter(id__in=[post.id for post in posts])._raw_delete(
+        router.db_for_write(Post)
+    )
+    posts_archived.send(sender=Post, posts=posts)
+    return len(posts)
+
+
+def archive_posts(before, batch_size=None, stdout=None):
+    """Переносим посты старше before пачками по транзакции на пачку:
+    запись в базу не блокируется надолго.
+    """
+    batch_size = batch_size or settings.POSTS_ARCHIVE_BATCH_SIZE
+    total = 0
+    while True:
+        moved = archive_batch(before, batch_size)
+        if not moved:
+            return total
+        total += moved
+        if stdout is not None:
+            stdout.write(f'Перенесено в архив: {total}')
+
+
+def edit_archived_post(archived, post):
+    """Правка архивного поста на месте: текст и группа из post.
+
+    Пост остается в архиве со своим pub_date: лента профиля считает, что
+    все горячие посты новее архивных, а вернувшийся в горячую таблицу
+    старый пост нарушил бы этот порядок и ушел бы в архив снова.
+    """
+    archived.text = post.text
+    archived.group_id = post.group_id
+    archived.updated = timezone.now()
+    archived.save(update_fields=['text', 'group', 'updated'])
+    return archived
@@ -0,0 +1,404 @@
+import multiprocessing
+import queue
+import random
+import threading
+import time
+import tracemalloc
+from collections import Counter
+from contextlib import contextmanager
+from datetime import timedelta
+from types import SimpleNamespace
+
+from django.conf import settings
+from django.core.cache import cache
+from django.core.paginator import Paginator
+from django.db import close_old_connections, connection, connections
+from django.db.backends.signals import connection_created
+from django.db.models import Max, Min
+from django.template.loader import render_to_string
+from django.test import Client
+from django.test.utils import CaptureQueriesContext, override_settings
+from django.urls import reverse
+from django.utils import timezone
+from faker import Faker
+from mixer.backend.django import Mixer
+
+from core.benchmark import summarize, timed
+from core.pool import close_pools, pool_stats
+from search.backends import get_backend
+
+from .counters import rebuild_counters
+from .models import AuthorCounter, Group, Post, User
+from .paginators import elided_page_range
+from .transfer import batched, bulk_create_posts
+from .views import POST_LIMIT
+
+SEED_BATCH_SIZE = 5000
+MEMORY_SAMPLES = 5
+# Потоки с тем же интерфейсом, что у multiprocessing.get_context().
+THREADS = SimpleNamespace(
+    Queue=queue.Queue, Barrier=threading.Barrier, Process=threading.Thread,
+    Value=lambda typecode, value: SimpleNamespace(value=value),
+)
+
+
+def seed(posts, users, groups, seed=0, stdout=None):
+    """Наполняем базу воспроизводимым набором данных"""
+    fake = Faker('ru_RU')
+    fake.seed_instance(seed)
+    rng = random.Random(seed)
+    mixer = Mixer(commit=True)
+    authors = mixer.cycle(users).blend(
+        User, username=mixer.sequence('bench_user_{0}')
+    )
+    group_list = mixer.cycle(groups).blend(
+        Group, slug=mixer.sequence('bench-group-{0}'), posts_count=0
+    )
+    author_ids = [author.id for author in authors]
+    group_ids = [group.id for group in group_list] + [None]
+    now = timezone.now()
+    span = timedelta(days=3 * 365).total_seconds()
+    rows = (
+        Post(
+            text=fake.text(max_nb_chars=300),
+            pub_date=now - timedelta(seconds=rng.uniform(0, span)),
+            author_id=rng.choice(author_ids),
+            group_id=rng.choice(group_ids),
+        )
+        for _ in range(posts)
+    )
+    for number, batch in enumerate(batched(rows, SEED_BATCH_SIZE)):
+        bulk_create_posts(batch)
+        if stdout is not None:
+            stdout.write(f'Создано постов: {(number + 1) * SEED_BATCH_SIZE}')
+    rebuild_counters()
+    get_backend().rebuild()
+    cache.clear()
+
+
+def sample_posts(count, rng):
+    """Случайные посты (id, автор): id берется из диапазона и ищется по
+    первичному ключу, без сортировки всей таблицы по RANDOM().
+    """
+    bounds = Post.objects.aggregate(low=Min('id'), high=Max('id'))
+    if bounds['low'] is None:
+        return []
+    return [
+        Post.objects.filter(
+            id__gte=rng.randint(bounds['low'], bounds['high'])
+        ).order_by('id').values_list('id', 'author__username').first()
+        for _ in range(count)
+    ]
+
+
+def scenarios(requests, seed=0):
+    """Запросы по каждой view: (имя, метод, URL, данные, от чьего имени).
+
+    Правку шлет автор поста, создание - автор первого поста выборки.
+    """
+    rng = random.Random(seed)
+    users = list(AuthorCounter.objects.filter(posts_count__gt=0).values_list(
+        'author__username', flat=True
+    )[:1000])
+    groups = list(Group.objects.values_list('slug', 'posts_count')[:1000])
+    total = Post.objects.count()
+    posts = sample_posts(requests, rng)
+    writer = posts[0][1]
+    last_page = max(1, total // POST_LIMIT)
+    for post_id, owner in posts:
+        # Глубокие страницы - худший случай для OFFSET-пагинации.
+        page = rng.choice((1, 2, last_page // 2, last_page))
+        slug, group_posts = rng.choice(groups)
+        group_page = rng.randint(1, max(1, group_posts // POST_LIMIT))
+        yield 'posts:index', 'get', (
+            f"{reverse('posts:index')}?page={page}"
+        ), None, None
+        yield 'posts:group_posts', 'get', (
+            f"{reverse('posts:grouppa', args=[slug])}?page={group_page}"
+        ), None, None
+        yield 'posts:profile', 'get', reverse(
+            'posts:profile', args=[rng.choice(users)]
+        ), None, None
+        yield 'posts:post_detail', 'get', reverse(
+            'posts:post_detail', args=[post_id]
+        ), None, None
+        yield 'posts:post_create', 'post', reverse(
+            'posts:post_create'
+        ), {'text': 'Пост из бенчмарка'}, writer
+        yield 'posts:post_edit', 'post', reverse(
+            'posts:post_edit', args=[post_id]
+        ), {'text': 'Правка из бенчмарка'}, owner
+
+
+# Бенчмарк шлет записи пачкой от одного пользователя: лимиты частоты
+# отвечали бы 429 вместо работы view.
+@override_settings(RATELIMIT_ENABLED=False)
+def run(requests, seed=0, cold=False):
+    """Замеряем задержки, число запросов к БД и пиковую память.
+
+    Память замеряется повторным запросом только для чтения: повтор
+    записи создавал бы и правил посты сверх сценария.
+    """
+    guest = Client()
+    samples = {}
+    clients = {}
+
+    def client_for(username):
+        if username is None:
+            return guest
+        if username not in clients:
+            clients[username] = Client()
+            clients[username].force_login(
+                User.objects.get(username=username)
+            )
+        return clients[username]
+
+    for name, method, url, data, username in scenarios(requests, seed):
+        client = client_for(username)
+        if cold:
+            cache.clear()
+        with CaptureQueriesContext(connection) as queries:
+            elapsed, response = timed(getattr(client, method), url, data)
+        result = samples.setdefault(name, {
+            'latency': [], 'queries': [], 'statuses': {}, 'memory': []
+        })
+        result['latency'].append(elapsed)
+        result['queries'].append(len(queries))
+        status = str(response.status_code)
+        result['statuses'][status] = result['statuses'].get(status, 0) + 1
+        if method == 'get' and len(result['memory']) < MEMORY_SAMPLES:
+            tracemalloc.start()
+            client.get(url, data)
+            result['memory'].append(tracemalloc.get_traced_memory()[1])
+            tracemalloc.stop()
+    return {
+        name: {
+            'latency': summarize(result['latency']),
+            'queries_mean': round(
+                sum(result['queries']) / len(result['queries']), 2
+            ),
+            'queries_max': max(result['queries']),
+            'peak_memory_kb': (
+                round(max(result['memory']) / 1024, 1)
+                if result['memory'] else None
+            ),
+            'statuses': result['statuses'],
+        }
+        for name, result in samples.items()
+    }
+
+
+def render_paginator(page_counts, repeats=100):
+    """Замеряем рендер блока пагинации при растущем числе страниц"""
+    template = 'posts/includes/paginator.html'
+    report = {}
+    for num_pages in page_counts:
+        paginator = Paginator(range(num_pages * POST_LIMIT), POST_LIMIT)
+        page = paginator.get_page(num_pages // 2 + 1)
+        page.elided_page_range = list(elided_page_range(page))
+        context = {'page_obj': page, 'page_query': ''}
+        samples = []
+        for _ in range(repeats):
+            elapsed, html = timed(render_to_string, template, context)
+            samples.append(elapsed)
+        report[str(num_pages)] = {
+            'latency': summarize(samples),
+            'links': html.count('<li'),
+            'html_bytes': len(html.encode()),
+        }
+    return report
+
+
+def sqlite_profiles():
+    """Как было (журнал отката, соединение на запрос) и как настроено"""
+    return {
+        'baseline': {
+            'engine': 'django.db.backends.sqlite3',
+            'pragmas': {'journal_mode': 'DELETE', 'synchronous': 'FULL'},
+            'conn_max_age': 0,
+        },
+        'tuned': {
+            'engine': settings.DATABASES['default']['ENGINE'],
+            'pragmas': settings.SQLITE_PRAGMAS,
+            'conn_max_age': settings.DATABASES['default'].get(
+                'CONN_MAX_AGE', 0
+            ),
+        },
+    }
+
+
+def pool_profiles(pool_size):
+    """Соединение на запрос, соединение на поток и общий пул"""
+    plain = 'django.db.backends.sqlite3'
+    return {
+        'connect': {'engine': plain, 'conn_max_age': 0},
+        'persistent': {'engine': plain, 'conn_max_age': 60},
+        'pooled': {
+            'engine': 'core.db.sqlite3_pool',
+            'conn_max_age': 0,
+            'pool': {'MIN_SIZE': 1, 'MAX_SIZE': pool_size},
+        },
+    }
+
+
+@contextmanager
+def database_profile(profile):
+    """Переключаем движок и настройки default для новых соединений.
+
+    Смена journal_mode требует монопольного доступа, поэтому файл
+    переключается здесь, до запуска воркеров.
+    """
+    settings_dict = connections.databases['default']
+    saved = {
+        key: settings_dict[key] for key in ('ENGINE', 'CONN_MAX_AGE', 'POOL')
+        if key in settings_dict
+    }
+
+    def reconnect():
+        connections.close_all()
+        close_pools()
+        # Следующее обращение создаст соединение с новым ENGINE.
+        connections['default'].close()
+        del connections['default']
+
+    settings_dict.update(
+        ENGINE=profile['engine'], CONN_MAX_AGE=profile['conn_max_age'],
+        POOL=profile.get('pool', saved.get('POOL', {}))
+    )
+    try:
+        with override_settings(
+            SQLITE_PRAGMAS=profile.get('pragmas', settings.SQLITE_PRAGMAS),
+            RATELIMIT_ENABLED=False
+        ):
+            reconnect()
+            connection.ensure_connection()
+            connections.close_all()
+            yield
+    finally:
+        settings_dict.pop('POOL', None)
+        settings_dict.update(saved)
+        reconnect()
+
+
+def _worker(role, username, deadline, start, results):
+    """Процесс-воркер: свое соединение с БД, как у воркера gunicorn"""
+    client = Client()
+    samples, statuses = [], Counter()
+    try:
+        client.force_login(User.objects.get(username=username))
+        close_old_connections()
+        start.wait()
+        while time.time() < deadline.value:
+            try:
+                if role == 'writer':
+                    elapsed, response = timed(
+                        client.post, reverse('posts:post_create'),
+                        {'text': 'Пост из нагрузочного теста'}
+                    )
+                else:
+                    elapsed, response = timed(
+                        client.get, reverse('posts:index')
+                    )
+            except Exception as error:
+                statuses[type(error).__name__] += 1
+            else:
+                samples.append(elapsed)
+                statuses[str(response.status_code)] += 1
+            # Тестовый клиент не закрывает соединения сам: ведем себя
+            # как обработчик запросов с CONN_MAX_AGE.
+            close_old_connections()
+    finally:
+        connections.close_all()
+        results.put((role, samples, dict(statuses)))
+
+
+def _run_workers(context, roles, usernames, duration):
+    """Запускаем воркеры context (процессы или потоки) и сводим замеры
+    по ролям.
+    """
+    results = context.Queue()
+    deadline = context.Value('d', 0.0)
+
+    def start_clock():
+        # Отсчет идет с момента, когда все воркеры вошли в систему.
+        deadline.value = time.time() + duration
+
+    start = context.Barrier(len(roles), action=start_clock, timeout=60)
+    workers = [
+        context.Process(
+            target=_worker, args=(role, username, deadline, start, results)
+        )
+        for role, username in zip(roles, usernames)
+    ]
+    for worker in workers:
+        worker.start()
+    collected = [results.get() for _ in workers]
+    for worker in workers:
+        worker.join()
+    report = {}
+    for role in sorted(set(roles)):
+        samples, statuses = [], Counter()
+        for result_role, role_samples, role_statuses in collected:
+            if result_role == role:
+                samples.extend(role_samples)
+                statuses.update(role_statuses)
+        report[role] = {
+            'latency': summarize(samples),
+            'throughput_rps': round(len(samples) / duration, 1),
+            'statuses': dict(statuses),
+        }
+    return report
+
+
+def _users(count):
+    return list(User.objects.order_by('id').values_list(
+        'username', flat=True
+    )[:count])
+
+
+def concurrency(readers=4, writers=2, duration=5.0):
+    """Читатели ленты и авторы постов в отдельных процессах.
+
+    Для каждого профиля sqlite_profiles(): пропускная способность,
+    задержки и ответы (в том числе ошибки "database is locked").
+    """
+    context = multiprocessing.get_context('fork')
+    usernames = _users(readers + writers)
+    roles = ['writer'] * writers + ['reader'] * readers
+    report = {}
+    for name, profile in sqlite_profiles().items():
+        with database_profile(profile):
+            report[name] = _run_workers(context, roles, usernames, duration)
+    return report
+
+
+def connection_pool(threads=8, writers=1, pool_size=4, duration=5.0):
+    """Потоки одного процесса, как у многопоточного WSGI-сервера.
+
+    Для каждого профиля pool_profiles(): замеры по ролям, сколько
+    физических соединений открыто и статистика пула.
+    """
+    usernames = _users(threads)
+    roles = ['writer'] * writers + ['reader'] * (threads - writers)
+    opened = Counter()
+
+    def count(sender, **kwargs):
+        opened['connections'] += 1
+
+    report = {}
+    connection_created.connect(count)
+    try:
+        for name, profile in pool_profiles(pool_size).items():
+            with database_profile(profile):
+                opened.clear()
+                result = _run_workers(THREADS, roles, usernames, duration)
+                stats = pool_stats().get('default')
+                # Из пула сигнал приходит на каждую выдачу соединения.
+                result['connections_opened'] = (
+                    stats['created'] if stats else opened['connections']
+                )
+                result['pool'] = stats
+            report[name] = result
+    finally:
+        connection_created.disconnect(count)
+    return report
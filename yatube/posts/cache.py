@@ -0,0 +1,196 @@
+import hashlib
+import time
+import uuid
+from datetime import datetime, timezone
+from functools import wraps
+
+from django.conf import settings
+from django.core.cache import cache
+from django.db import transaction
+from django.http import HttpResponse
+from django.template.loader import render_to_string
+from django.utils.safestring import mark_safe
+
+from core import instrumentation
+from core.db_router import reading_from_replica
+
+CARD_TEMPLATE = 'includes/group_post.html'
+CARD_TIMEOUT = 60 * 60 * 24
+PAGE_TIMEOUT = 60 * 10
+# Тег всех страниц: сбрасывается редкими правками групп и авторов.
+ALL_PAGES_TAG = 'page:all'
+
+
+def tag_key(tag):
+    return f'tag:{tag}'
+
+
+def new_tag_version():
+    """Версия тега: время ее создания и случайная часть"""
+    return f'{int(time.time())}.{uuid.uuid4().hex}'
+
+
+def get_tag_versions(tags):
+    """Текущие версии тегов; у сброшенного тега появляется новая версия"""
+    keys = [tag_key(tag) for tag in tags]
+    versions = cache.get_many(keys)
+    missing = {
+        key: new_tag_version() for key in keys if key not in versions
+    }
+    if missing:
+        cache.set_many(missing, None)
+        versions.update(missing)
+    return [versions[key] for key in keys]
+
+
+def invalidate_tags(*tags):
+    """Сбрасываем теги: все ключи со старыми версиями больше не читаются.
+
+    Внутри транзакции тег сбрасывается еще раз после ее фиксации:
+    параллельный читатель успевает создать новую версию, но читает
+    снимок БД до записи и кладет под эту версию старые данные.
+    """
+    keys = [tag_key(tag) for tag in tags]
+    cache.delete_many(keys)
+    if transaction.get_connection().in_atomic_block:
+        transaction.on_commit(lambda: cache.delete_many(keys))
+
+
+def versions_digest(versions):
+    return hashlib.md5(':'.join(versions).encode()).hexdigest()
+
+
+def _newest_stamp(versions):
+    stamps = [
+        int(stamp) for stamp, dot, _ in (
+            version.partition('.') for version in versions
+        ) if dot and stamp.isdigit()
+    ]
+    return max(stamps, default=None)
+
+
+def versions_time(versions):
+    """Время самого позднего сброса среди тегов или None.
+
+    Версия создается при первом чтении после сброса, так что это время
+    не раньше правки, которая тег сбросила.
+    """
+    stamp = _newest_stamp(versions)
+    if stamp is None:
+        return None
+    return datetime.fromtimestamp(stamp, timezone.utc)
+
+
+def versions_settled(versions):
+    """Содержимое, прочитанное сейчас, можно запомнить под этими версиями.
+
+    Тег сбрасывается записью в основную БД, а реплика может ее еще не
+    получить: прочитанное с реплики в первые DATABASE_REPLICA_PIN секунд
+    после сброса не кэшируется, иначе устаревшие данные легли бы под
+    новую версию тега и жили бы до следующего сброса.
+    """
+    if not reading_from_replica():
+        return True
+    stamp = _newest_stamp(versions)
+    return (
+        stamp is not None
+        and time.time() - stamp >= settings.DATABASE_REPLICA_PIN
+    )
+
+
+def post_card_tags(post):
+    tags = [f'post:{post.pk}', f'user:{post.author_id}']
+    if post.group_id is not None:
+        tags.append(f'group:{post.group_id}')
+    return tags
+
+
+def render_post_cards(posts, is_profile=False):
+    """Карточки постов из кэша; промахи рендерим и кладем в кэш.
+
+    На страницу уходит два обращения к кэшу независимо от ее размера.
+    """
+    posts = list(posts)
+    tags_per_post = [post_card_tags(post) for post in posts]
+    all_tags = sorted({tag for tags in tags_per_post for tag in tags})
+    versions = dict(zip(all_tags, get_tag_versions(all_tags)))
+    settled = versions_settled(list(versions.values()))
+    keys = [
+        'post_card:{}:{:d}:{}'.format(
+            post.pk,
+            is_profile,
+            versions_digest([versions[tag] for tag in tags])
+        )
+        for post, tags in zip(posts, tags_per_post)
+    ]
+    cards = cache.get_many(keys)
+    instrumentation.incr('cache-card-hit', len(cards))
+    instrumentation.incr('cache-card-miss', len(keys) - len(cards))
+    rendered = {}
+    for post, key in zip(posts, keys):
+        if key not in cards:
+            rendered[key] = render_to_string(
+                CARD_TEMPLATE, {'post': post, 'is_profile': is_profile}
+            )
+    if rendered and settled:
+        cache.set_many(rendered, CARD_TIMEOUT)
+    cards.update(rendered)
+    return [mark_safe(cards[key]) for key in keys]
+
+
+INDEX_PAGE_TAG = 'page:index'
+
+
+def group_page_tag(slug):
+    return f'page:group:{slug}'
+
+
+def profile_page_tag(username):
+    return f'page:profile:{username}'
+
+
+def index_page_tags():
+    return [ALL_PAGES_TAG, INDEX_PAGE_TAG]
+
+
+def group_page_tags(slug):
+    return [ALL_PAGES_TAG, group_page_tag(slug)]
+
+
+def profile_page_tags(username):
+    return [ALL_PAGES_TAG, profile_page_tag(username)]
+
+
+def cache_anonymous_page(page_tags, timeout=PAGE_TIMEOUT):
+    """Кэшируем страницу для анонимных GET-запросов.
+
+    Ключ строится из полного URL (вместе с ?page= и ?cursor=) и версий
+    тегов из page_tags(**kwargs): сброс тега инвалидирует только
+    страницы, помеченные им.
+    """
+    def decorator(view):
+        @wraps(view)
+        def wrapper(request, *args, **kwargs):
+            if (request.method not in ('GET', 'HEAD')
+                    or request.user.is_authenticated):
+                return view(request, *args, **kwargs)
+            versions = get_tag_versions(page_tags(*args, **kwargs))
+            key = 'page:{}:{}'.format(
+                hashlib.md5(request.get_full_path().encode()).hexdigest(),
+                versions_digest(versions)
+            )
+            cached = cache.get(key)
+            if cached is not None:
+                instrumentation.incr('cache-page-hit')
+                content, content_type = cached
+                return HttpResponse(content, content_type=content_type)
+            instrumentation.incr('cache-page-miss')
+            response = view(request, *args, **kwargs)
+            if (response.status_code == 200 and not response.streaming
+                    and not response.cookies and versions_settled(versions)):
+                cache.set(
+                    key, (response.content, response['Content-Type']), timeout
+                )
+            return response
+        return wrapper
+    return decorator
@@ -0,0 +1,29 @@
+from django.conf import settings
+from django.core.cache import DEFAULT_CACHE_ALIAS
+from django.core.checks import Error, Tags, register
+
+# Бэкенды, у которых каждый процесс держит свою копию кэша.
+PER_PROCESS_CACHES = (
+    'django.core.cache.backends.locmem.LocMemCache',
+)
+
+
+@register(Tags.caches)
+def check_shared_cache(app_configs, **kwargs):
+    """Версии тегов (posts.cache) должны быть общими для всех воркеров.
+
+    Из них строятся ключи карточек и страниц, ETag и Last-Modified: с
+    кэшем в процессе сброс после правки виден только обработавшему ее
+    воркеру, а остальные отдают старые страницы и отвечают 304 на
+    устаревший ETag.
+    """
+    backend = settings.CACHES.get(DEFAULT_CACHE_ALIAS, {}).get('BACKEND')
+    if backend in PER_PROCESS_CACHES:
+        return [Error(
+            f'Кэш {DEFAULT_CACHE_ALIAS!r} ({backend}) не общий для '
+            'процессов, а в нем лежат версии тегов кэша постов.',
+            hint='Используйте FileBasedCache с общим каталогом или '
+                 'memcached.',
+            id='posts.E001',
+        )]
+    return []
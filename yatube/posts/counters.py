@@ -0,0 +1,69 @@
+from collections import Counter
+
+from django.db import transaction
+from django.db.models import Count, F
+from django.db.models.functions import Greatest
+
+from .models import ArchivedPost, AuthorCounter, Group, Post
+
+
+def shifted(field, delta):
+    """F(field) + delta, но не меньше нуля: разошедшийся счетчик не должен
+    ломать удаление поста на CHECK положительного поля.
+    """
+    return Greatest(F(field) + delta, 0)
+
+
+def change_author_count(author_id, delta):
+    updated = AuthorCounter.objects.filter(author_id=author_id).update(
+        posts_count=shifted('posts_count', delta)
+    )
+    # При каскадном удалении автора строки счетчика уже может не быть,
+    # поэтому создаем ее только при увеличении.
+    if not updated and delta > 0:
+        AuthorCounter.objects.create(author_id=author_id, posts_count=delta)
+
+
+def change_archived_count(author_id, delta):
+    AuthorCounter.objects.filter(author_id=author_id).update(
+        archived_count=shifted('archived_count', delta)
+    )
+
+
+def change_group_count(group_id, delta):
+    if group_id is not None:
+        Group.objects.filter(id=group_id).update(
+            posts_count=shifted('posts_count', delta)
+        )
+
+
+def count_by(queryset, field):
+    return Counter(dict(
+        queryset.order_by().filter(**{f'{field}__isnull': False})
+        .values_list(field).annotate(Count('id'))
+    ))
+
+
+@transaction.atomic
+def rebuild_counters():
+    """Пересчитываем все счетчики по таблице постов и архиву.
+
+    У автора считаются все посты, у группы - только горячие: ее лента
+    архив не читает.
+    """
+    archived_counts = count_by(ArchivedPost.objects, 'author')
+    author_counts = count_by(Post.objects, 'author') + archived_counts
+    AuthorCounter.objects.all().delete()
+    AuthorCounter.objects.bulk_create(
+        AuthorCounter(
+            author_id=author_id, posts_count=count,
+            archived_count=archived_counts[author_id]
+        )
+        for author_id, count in author_counts.items()
+    )
+    group_counts = count_by(Post.objects, 'group')
+    groups = list(Group.objects.only('id', 'posts_count'))
+    for group in groups:
+        group.posts_count = group_counts[group.id]
+    Group.objects.bulk_update(groups, ['posts_count'], batch_size=500)
+    return len(author_counts), len(groups)
@@ -0,0 +1,154 @@
+import json
+
+from django.contrib.syndication.views import Feed
+from django.shortcuts import get_object_or_404
+from django.template.defaultfilters import truncatechars
+from django.urls import reverse
+from django.utils.feedgenerator import Rss201rev2Feed, SyndicationFeed
+
+from core.db_router import read_from_replica
+
+from .cache import (cache_anonymous_page, group_page_tags, index_page_tags,
+                    profile_page_tags)
+from .freshness import (conditional_page, group_freshness, index_freshness,
+                        profile_freshness)
+from .models import Group, Post, User
+
+FEED_LIMIT = 20
+
+
+class JSONFeed(SyndicationFeed):
+    """JSON Feed 1.1 (https://jsonfeed.org/version/1.1)"""
+    content_type = 'application/feed+json; charset=utf-8'
+
+    def write(self, outfile, encoding):
+        json.dump(self.document(), outfile, ensure_ascii=False)
+
+    def document(self):
+        document = {
+            'version': 'https://jsonfeed.org/version/1.1',
+            'title': self.feed['title'],
+            'home_page_url': self.feed['link'],
+            'feed_url': self.feed['feed_url'],
+            'description': self.feed['description'],
+            'language': self.feed['language'],
+            'items': [self.item(item) for item in self.items],
+        }
+        return {key: value for key, value in document.items() if value}
+
+    def item(self, item):
+        document = {
+            'id': item['unique_id'] or item['link'],
+            'url': item['link'],
+            'title': item['title'],
+            'content_text': item['description'],
+            'date_published': item['pubdate'].isoformat(),
+            'date_modified': item['updateddate'].isoformat(),
+            'authors': [{'name': item['author_name']}],
+            'tags': list(item['categories']),
+        }
+        return {key: value for key, value in document.items() if value}
+
+
+class PostsFeed(Feed):
+    """Последние FEED_LIMIT постов ленты в формате feed_type.
+
+    Документ кэшируется теми же тегами, что и HTML-страница ленты, и
+    отдается с ETag/Last-Modified: опрос без новых постов стоит пары
+    обращений к кэшу без запросов к базе.
+    """
+    page_tags = staticmethod(index_page_tags)
+    freshness = staticmethod(index_freshness)
+
+    def __init__(self, feed_type=Rss201rev2Feed):
+        super().__init__()
+        self.feed_type = feed_type
+        self.view = read_from_replica(
+            conditional_page(self.freshness)(
+                cache_anonymous_page(self.page_tags)(self.render)
+            )
+        )
+
+    def __call__(self, request, *args, **kwargs):
+        return self.view(request, *args, **kwargs)
+
+    def render(self, request, *args, **kwargs):
+        # Feed ставит Last-Modified по дате последнего поста, а condition
+        # готовый заголовок не заменяет: ответ из кэша его бы не имел.
+        # Заголовок ставит conditional_page по версиям тегов.
+        response = super().__call__(request, *args, **kwargs)
+        del response['Last-Modified']
+        return response
+
+    def title(self):
+        return 'Последние обновления на сайте'
+
+    def link(self):
+        return reverse('posts:index')
+
+    def description(self):
+        return 'Новые посты всех авторов Yatube'
+
+    def items(self):
+        return Post.objects.for_feed()[:FEED_LIMIT]
+
+    def item_title(self, post):
+        return truncatechars(post.text, 50)
+
+    def item_description(self, post):
+        return post.text
+
+    def item_link(self, post):
+        return reverse('posts:post_detail', args=[post.pk])
+
+    def item_pubdate(self, post):
+        return post.pub_date
+
+    def item_updateddate(self, post):
+        return post.updated
+
+    def item_author_name(self, post):
+        return post.author.get_full_name() or post.author.username
+
+    def item_categories(self, post):
+        return [post.group.title] if post.group_id else []
+
+
+class GroupFeed(PostsFeed):
+    page_tags = staticmethod(group_page_tags)
+    freshness = staticmethod(group_freshness)
+
+    def get_object(self, request, slug):
+        return get_object_or_404(Group, slug=slug)
+
+    def title(self, group):
+        return group.title
+
+    def link(self, group):
+        return reverse('posts:grouppa', args=[group.slug])
+
+    def description(self, group):
+        return group.description
+
+    def items(self, group):
+        return group.posts.for_feed()[:FEED_LIMIT]
+
+
+class AuthorFeed(PostsFeed):
+    page_tags = staticmethod(profile_page_tags)
+    freshness = staticmethod(profile_freshness)
+
+    def get_object(self, request, username):
+        return get_object_or_404(User, username=username)
+
+    def title(self, author):
+        return f'Посты {author.get_full_name() or author.username}'
+
+    def link(self, author):
+        return reverse('posts:profile', args=[author.username])
+
+    def description(self, author):
+        return f'Все посты пользователя {author.username}'
+
+    def items(self, author):
+        return author.posts.for_feed()[:FEED_LIMIT]
@@ -0,0 +1,72 @@
+from django.views.decorators.http import condition
+
+from .cache import (ALL_PAGES_TAG, get_tag_versions, group_page_tags,
+                    index_page_tags, post_card_tags, profile_page_tag,
+                    profile_page_tags, versions_digest, versions_settled,
+                    versions_time)
+from .models import ArchivedPost, Post
+
+
+def index_freshness(request):
+    return get_tag_versions(index_page_tags())
+
+
+def group_freshness(request, slug):
+    return get_tag_versions(group_page_tags(slug))
+
+
+def profile_freshness(request, username):
+    return get_tag_versions(profile_page_tags(username))
+
+
+def post_detail_freshness(request, post_id):
+    """Теги карточки поста и страницы автора: ее тег сбрасывается и при
+    смене числа его постов, которое выводится рядом с постом.
+    """
+    for model in (Post, ArchivedPost):
+        post = model.objects.filter(id=post_id).values_list(
+            'author_id', 'group_id', 'author__username'
+        ).first()
+        if post is not None:
+            break
+    else:
+        return None
+    author_id, group_id, username = post
+    return get_tag_versions([
+        ALL_PAGES_TAG,
+        *post_card_tags(Post(id=post_id, author_id=author_id,
+                             group_id=group_id)),
+        profile_page_tag(username)
+    ])
+
+
+def conditional_page(freshness):
+    """ETag и Last-Modified для страницы без рендера шаблона.
+
+    freshness(request, **kwargs) возвращает версии тегов кэша, которыми
+    помечено содержимое страницы, или None для несуществующей; считается
+    один раз на запрос для обоих заголовков. Теги сбрасываются при любой
+    правке, удалении и переносе в архив поста, а также при правке автора
+    или группы, поэтому Last-Modified - время последнего сброса, а не
+    правки постов. В ETag входит пользователь: шапка страницы у каждого
+    своя. Пока реплика может отставать от сброса, заголовков нет:
+    клиент не должен запомнить устаревшую страницу под новым ETag.
+    """
+    def get_freshness(request, *args, **kwargs):
+        if not hasattr(request, '_post_freshness'):
+            request._post_freshness = freshness(request, *args, **kwargs)
+        return request._post_freshness
+
+    def etag(request, *args, **kwargs):
+        versions = get_freshness(request, *args, **kwargs)
+        if versions is None or not versions_settled(versions):
+            return None
+        return versions_digest(versions + [str(request.user.pk)])
+
+    def last_modified(request, *args, **kwargs):
+        versions = get_freshness(request, *args, **kwargs)
+        if versions is None or not versions_settled(versions):
+            return None
+        return versions_time(versions)
+
+    return condition(etag_func=etag, last_modified_func=last_modified)
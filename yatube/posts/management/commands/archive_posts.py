@@ -0,0 +1,31 @@
+from django.conf import settings
+from django.core.management.base import BaseCommand, CommandError
+
+from posts.archive import archive_cutoff, archive_posts
+
+
+class Command(BaseCommand):
+    help = (
+        'Переносит посты старше --days дней в архивную таблицу пачками; '
+        'страницы постов и глубокие страницы профиля читают их оттуда.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days', type=int, default=settings.POSTS_ARCHIVE_AFTER_DAYS
+        )
+        parser.add_argument(
+            '--batch-size', type=int,
+            default=settings.POSTS_ARCHIVE_BATCH_SIZE
+        )
+
+    def handle(self, *args, **options):
+        if options['days'] < 1 or options['batch_size'] < 1:
+            raise CommandError('--days и --batch-size должны быть больше 0')
+        before = archive_cutoff(options['days'])
+        total = archive_posts(
+            before, options['batch_size'], stdout=self.stdout
+        )
+        self.stdout.write(self.style.SUCCESS(
+            f'Перенесено в архив постов старше {before:%Y-%m-%d}: {total}'
+        ))
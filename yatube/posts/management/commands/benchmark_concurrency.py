@@ -0,0 +1,63 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.benchmark import benchmark_database, environment, write_report
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Параллельные читатели ленты и авторы постов на файле SQLite: '
+        'сравнивает исходный профиль (журнал отката, соединение на '
+        'запрос) с SQLITE_PRAGMAS и CONN_MAX_AGE; пишет отчет JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--readers', type=int, default=4)
+        parser.add_argument('--writers', type=int, default=2)
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help='Секунд на каждый профиль')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark_concurrency.json')
+
+    def handle(self, *args, **options):
+        # Процессам нужна общая база в файле, а не в памяти.
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, 'benchmark.sqlite3'
+            )
+            with benchmark_database():
+                benchmark.seed(
+                    options['posts'],
+                    users=options['readers'] + options['writers'],
+                    groups=10, seed=options['seed'], stdout=self.stdout
+                )
+                profiles = benchmark.concurrency(
+                    options['readers'], options['writers'],
+                    options['duration']
+                )
+        report = {
+            'environment': environment(),
+            'parameters': {
+                key: options[key] for key in (
+                    'posts', 'readers', 'writers', 'duration', 'seed'
+                )
+            },
+            'profiles': profiles,
+        }
+        write_report(options['output'], report)
+        for name, roles in profiles.items():
+            for role, result in roles.items():
+                latency = result['latency']
+                self.stdout.write(
+                    f"{name:9} {role:7} {result['throughput_rps']:8.1f} "
+                    f"запр/с  p95 {latency.get('p95_ms', 0):8.2f} мс  "
+                    f"{result['statuses']}"
+                )
+        self.stdout.write(self.style.SUCCESS(
+            f"Отчет записан в {options['output']}"
+        ))
@@ -0,0 +1,41 @@
+from django.core.management.base import BaseCommand
+
+from core.benchmark import environment, write_report
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Замеряет рендер блока пагинации для разного числа страниц: '
+        'время, число ссылок и размер HTML; пишет отчет JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--pages', type=int, nargs='+',
+                            default=[10, 100, 1000, 10000, 50000])
+        parser.add_argument('--repeats', type=int, default=200)
+        parser.add_argument('--output', default='benchmark_paginator.json')
+
+    def handle(self, *args, **options):
+        pages = benchmark.render_paginator(
+            options['pages'], repeats=options['repeats']
+        )
+        report = {
+            'environment': environment(),
+            'parameters': {
+                key: options[key] for key in ('pages', 'repeats')
+            },
+            'pages': pages,
+        }
+        write_report(options['output'], report)
+        for num_pages, result in pages.items():
+            latency = result['latency']
+            self.stdout.write(
+                f"{num_pages:>8} стр.  p50 {latency['p50_ms']:7.3f} мс  "
+                f"p95 {latency['p95_ms']:7.3f} мс  "
+                f"ссылок {result['links']:3}  "
+                f"HTML {result['html_bytes']:6} байт"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Отчет записан в {options['output']}"
+        ))
@@ -0,0 +1,71 @@
+import os
+import tempfile
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.benchmark import benchmark_database, environment, write_report
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоки одного процесса читают ленту и пишут посты в файл SQLite: '
+        'сравнивает соединение на запрос, соединение на поток и общий пул '
+        'core.db.sqlite3_pool; пишет отчет JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=20000)
+        parser.add_argument('--threads', type=int, default=8)
+        parser.add_argument('--writers', type=int, default=1)
+        parser.add_argument('--pool-size', type=int, default=4)
+        parser.add_argument('--duration', type=float, default=10.0,
+                            help='Секунд на каждый профиль')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--output', default='benchmark_pool.json')
+
+    def handle(self, *args, **options):
+        # Потокам нужна общая база в файле, а не в памяти.
+        with tempfile.TemporaryDirectory() as directory:
+            connection.settings_dict['TEST']['NAME'] = os.path.join(
+                directory, 'benchmark.sqlite3'
+            )
+            with benchmark_database():
+                benchmark.seed(
+                    options['posts'], users=options['threads'], groups=10,
+                    seed=options['seed'], stdout=self.stdout
+                )
+                profiles = benchmark.connection_pool(
+                    options['threads'], options['writers'],
+                    options['pool_size'], options['duration']
+                )
+        report = {
+            'environment': environment(),
+            'parameters': {
+                key: options[key] for key in (
+                    'posts', 'threads', 'writers', 'pool_size', 'duration',
+                    'seed'
+                )
+            },
+            'profiles': profiles,
+        }
+        write_report(options['output'], report)
+        for name, result in profiles.items():
+            for role in ('reader', 'writer'):
+                if role not in result:
+                    continue
+                latency = result[role]['latency']
+                self.stdout.write(
+                    f"{name:10} {role:7} "
+                    f"{result[role]['throughput_rps']:8.1f} запр/с  "
+                    f"p95 {latency.get('p95_ms', 0):8.2f} мс  "
+                    f"{result[role]['statuses']}"
+                )
+            self.stdout.write(
+                f"{name:10} соединений открыто: "
+                f"{result['connections_opened']}"
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Отчет записан в {options['output']}"
+        ))
@@ -0,0 +1,70 @@
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import connection
+
+from core.benchmark import benchmark_database, environment, write_report
+from posts import benchmark
+
+
+class Command(BaseCommand):
+    help = (
+        'Наполняет отдельную БД постами и замеряет задержки, запросы к БД '
+        'и память views posts через тестовый клиент; пишет отчет JSON.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--posts', type=int, default=100000)
+        parser.add_argument('--users', type=int, default=1000)
+        parser.add_argument('--groups', type=int, default=100)
+        parser.add_argument('--requests', type=int, default=50,
+                            help='Запросов на каждую view')
+        parser.add_argument('--seed', type=int, default=0)
+        parser.add_argument('--cold', action='store_true',
+                            help='Очищать кэш перед каждым запросом')
+        parser.add_argument('--database-file',
+                            help='Файл БД вместо базы в памяти')
+        parser.add_argument('--keepdb', action='store_true',
+                            help='Не пересоздавать и не наполнять БД')
+        parser.add_argument('--output', default='benchmark_posts.json')
+
+    def handle(self, *args, **options):
+        if options['database_file']:
+            connection.settings_dict['TEST']['NAME'] = (
+                options['database_file']
+            )
+        with benchmark_database(keepdb=options['keepdb']):
+            started = time.monotonic()
+            if not options['keepdb']:
+                benchmark.seed(
+                    options['posts'], options['users'], options['groups'],
+                    seed=options['seed'], stdout=self.stdout
+                )
+            seeded = time.monotonic() - started
+            views = benchmark.run(
+                options['requests'], seed=options['seed'],
+                cold=options['cold']
+            )
+        report = {
+            'environment': environment(),
+            'parameters': {
+                key: options[key] for key in (
+                    'posts', 'users', 'groups', 'requests', 'seed', 'cold'
+                )
+            },
+            'seed_seconds': round(seeded, 2),
+            'views': views,
+        }
+        write_report(options['output'], report)
+        for name, result in sorted(views.items()):
+            latency = result['latency']
+            memory = result['peak_memory_kb']
+            self.stdout.write(
+                f"{name:20} p50 {latency['p50_ms']:8.2f} мс  "
+                f"p95 {latency['p95_ms']:8.2f} мс  "
+                f"запросов {result['queries_mean']:5.1f}"
+                + (f'  память {memory:8.1f} КБ' if memory is not None else '')
+            )
+        self.stdout.write(self.style.SUCCESS(
+            f"Отчет записан в {options['output']}"
+        ))
@@ -0,0 +1,85 @@
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connections
+from django.db.models import Q
+from django.utils import timezone
+
+from posts.models import ArchivedPost, Group, Post
+from posts.views import GROUP_LOOKUP_LIMIT, POST_LIMIT
+
+# Полный проход SQLite помечает как "SCAN <table>" без индекса (см.
+# is_full_scan), а сортировку мимо индекса - как "USE TEMP B-TREE".
+FULL_SCAN_MARKERS = ('USE TEMP B-TREE',)
+
+
+def feed_querysets():
+    """Запросы лент в том виде, в каком их выполняют views"""
+    # Значения фильтров не важны для плана, важна форма запроса.
+    now = timezone.now()
+    before_cursor = Q(pub_date__lte=now) & (
+        Q(pub_date__lt=now) | Q(id__lt=1)
+    )
+    index = Post.objects.for_feed()
+    author = index.filter(author_id=1)
+    group = index.filter(group_id=1)
+    archived = ArchivedPost.objects.for_feed().filter(author_id=1)
+    return {
+        'posts:index': index[:POST_LIMIT],
+        'posts:index (offset)': index[POST_LIMIT:POST_LIMIT * 2],
+        'posts:index (cursor)': index.filter(before_cursor)[:POST_LIMIT],
+        'posts:profile': author[:POST_LIMIT],
+        'posts:profile (cursor)': author.filter(before_cursor)[:POST_LIMIT],
+        'posts:grouppa': group[:POST_LIMIT],
+        'posts:grouppa (cursor)': group.filter(before_cursor)[:POST_LIMIT],
+        'posts:group_lookup': Group.objects.title_prefix('Ко').only(
+            'id', 'slug', 'title'
+        )[:GROUP_LOOKUP_LIMIT],
+        # Глубокие страницы профиля и страница поста из архива.
+        'posts:profile (archive)': archived[:POST_LIMIT],
+        'posts:profile (archive, cursor)': archived.filter(
+            before_cursor
+        )[:POST_LIMIT],
+        'posts:post_detail (archive)': ArchivedPost.objects.for_detail(
+        ).filter(id=1),
+        # Пачка archive_posts: самые старые горячие посты.
+        'archive_posts': Post.objects.filter(pub_date__lt=now).order_by(
+            'pub_date', 'id'
+        ).values_list('id')[:POST_LIMIT],
+    }
+
+
+def is_full_scan(detail):
+    if any(marker in detail for marker in FULL_SCAN_MARKERS):
+        return True
+    return detail.startswith('SCAN') and 'USING' not in detail
+
+
+class Command(BaseCommand):
+    help = (
+        'Выполняет EXPLAIN QUERY PLAN для запросов лент и падает, '
+        'если какой-то из них идет полным проходом по таблице.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('--database', default='default')
+
+    def handle(self, *args, **options):
+        connection = connections[options['database']]
+        if connection.vendor != 'sqlite':
+            raise CommandError('Команда поддерживает только SQLite.')
+        failed = []
+        with connection.cursor() as cursor:
+            for name, queryset in feed_querysets().items():
+                sql, params = queryset.query.sql_with_params()
+                cursor.execute(f'EXPLAIN QUERY PLAN {sql}', params)
+                details = [row[-1] for row in cursor.fetchall()]
+                bad = [detail for detail in details if is_full_scan(detail)]
+                style = self.style.ERROR if bad else self.style.SUCCESS
+                self.stdout.write(style(name))
+                for detail in details:
+                    self.stdout.write(f'    {detail}')
+                if bad:
+                    failed.append(name)
+        if failed:
+            raise CommandError(
+                'Полный проход по таблице: ' + ', '.join(failed)
+            )
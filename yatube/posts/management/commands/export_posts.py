@@ -0,0 +1,32 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+
+from posts.transfer import (FIELDS, FORMATS, export_rows, guess_format,
+                            write_rows)
+
+
+class Command(BaseCommand):
+    help = 'Потоково выгружает посты или группы в JSON Lines или CSV.'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или "-" для stdout')
+        parser.add_argument('--model', choices=FIELDS, default='post')
+        parser.add_argument('--format', choices=FORMATS, dest='fmt')
+        parser.add_argument('--batch-size', type=int, default=2000)
+
+    def handle(self, *args, path, model, fmt, batch_size, **options):
+        fmt = guess_format(path, fmt)
+        rows = export_rows(model, batch_size)
+        started = time.monotonic()
+        if path == '-':
+            count = write_rows(sys.stdout, rows, fmt, model)
+        else:
+            with open(path, 'w', encoding='utf-8', newline='') as stream:
+                count = write_rows(stream, rows, fmt, model)
+        elapsed = time.monotonic() - started
+        self.stderr.write(
+            f'Выгружено строк: {count} за {elapsed:.2f} с '
+            f'({count / max(elapsed, 1e-9):.0f} строк/с)'
+        )
@@ -0,0 +1,131 @@
+import sys
+import time
+
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+from posts.archive import archive_cutoff, archive_posts
+from posts.models import Group, Post, User
+from posts.signals import posts_bulk_created
+from posts.transfer import (FIELDS, FORMATS, batched, bulk_create_posts,
+                            guess_format, read_rows)
+
+
+class Command(BaseCommand):
+    help = (
+        'Потоково загружает посты или группы из JSON Lines или CSV '
+        'через bulk_create, по транзакции на пачку.'
+    )
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Файл или "-" для stdin')
+        parser.add_argument('--model', choices=FIELDS, default='post')
+        parser.add_argument('--format', choices=FORMATS, dest='fmt')
+        parser.add_argument('--batch-size', type=int, default=1000)
+
+    def handle(self, *args, path, model, fmt, batch_size, **options):
+        fmt = guess_format(path, fmt)
+        load = self.load_groups if model == 'group' else self.load_posts
+        started = time.monotonic()
+        if path == '-':
+            created, skipped = load(read_rows(sys.stdin, fmt), batch_size)
+        else:
+            with open(path, encoding='utf-8', newline='') as stream:
+                created, skipped = load(read_rows(stream, fmt), batch_size)
+        elapsed = time.monotonic() - started
+        self.stdout.write(self.style.SUCCESS(
+            f'Загружено строк: {created}, пропущено: {skipped} '
+            f'за {elapsed:.2f} с ({created / max(elapsed, 1e-9):.0f} строк/с)'
+        ))
+
+    def skip(self, number, reason):
+        """Плохая строка файла не прерывает загрузку пачки"""
+        self.stderr.write(f'Строка {number}: {reason}, пропущена')
+
+    def load_groups(self, rows, batch_size):
+        created = skipped = 0
+        for batch in batched(enumerate(rows, 1), batch_size):
+            groups = []
+            for number, row in batch:
+                if not isinstance(row, dict):
+                    self.skip(number, 'не разобрана')
+                elif not row.get('title') or not row.get('slug'):
+                    self.skip(number, 'нет title или slug')
+                else:
+                    groups.append(Group(
+                        title=row['title'],
+                        slug=row['slug'],
+                        description=row.get('description') or ''
+                    ))
+                    continue
+                skipped += 1
+            with transaction.atomic():
+                before = Group.objects.count()
+                Group.objects.bulk_create(groups, ignore_conflicts=True)
+                added = Group.objects.count() - before
+            created += added
+            skipped += len(groups) - added
+        return created, skipped
+
+    def post_from_row(self, row, authors, groups):
+        """Пост из строки файла или причина, по которой она пропущена"""
+        if not isinstance(row, dict):
+            return None, 'не разобрана'
+        if not row.get('text'):
+            return None, 'нет текста'
+        author_id = authors.get(row.get('author'))
+        if author_id is None:
+            return None, f'неизвестный автор {row.get("author")!r}'
+        group_id = groups.get(row.get('group'))
+        if row.get('group') and group_id is None:
+            return None, f'неизвестная группа {row["group"]!r}'
+        pub_date = self.parse_pub_date(row.get('pub_date'))
+        if pub_date is None:
+            return None, f'неверная дата {row["pub_date"]!r}'
+        return Post(
+            text=row['text'], pub_date=pub_date,
+            author_id=author_id, group_id=group_id
+        ), None
+
+    def load_posts(self, rows, batch_size):
+        # Словари вместо запроса на каждую строку файла.
+        authors = dict(User.objects.values_list('username', 'id'))
+        groups = dict(Group.objects.values_list('slug', 'id'))
+        created = skipped = 0
+        batches = batched(enumerate(rows, 1), batch_size)
+        for batch_number, batch in enumerate(batches, 1):
+            posts = []
+            for number, row in batch:
+                post, reason = self.post_from_row(row, authors, groups)
+                if post is None:
+                    self.skip(number, reason)
+                    skipped += 1
+                else:
+                    posts.append(post)
+            with transaction.atomic():
+                posts = bulk_create_posts(posts)
+                posts_bulk_created.send(sender=Post, posts=posts)
+            created += len(posts)
+            self.stderr.write(
+                f'Пачка {batch_number}: всего загружено {created}'
+            )
+        # Выгрузка содержит и архив: старые посты возвращаются туда же,
+        # иначе лента профиля увидит их среди горячих. Без старых постов
+        # это один запрос по post_pub_date_idx.
+        archive_posts(archive_cutoff(), stdout=self.stderr)
+        return created, skipped
+
+    @staticmethod
+    def parse_pub_date(value):
+        """Дата из файла, None - если она не разбирается"""
+        if not value:
+            return timezone.now()
+        try:
+            pub_date = parse_datetime(value)
+        except (TypeError, ValueError):
+            return None
+        if pub_date is not None and timezone.is_naive(pub_date):
+            pub_date = timezone.make_aware(pub_date)
+        return pub_date
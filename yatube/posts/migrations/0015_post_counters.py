@@ -0,0 +1,49 @@
+# Generated by Django 2.2.28 on 2026-10-18 19:08
+
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import Count
+import django.db.models.deletion
+
+
+def fill_counters(apps, schema_editor):
+    Post = apps.get_model('posts', 'Post')
+    Group = apps.get_model('posts', 'Group')
+    AuthorCounter = apps.get_model('posts', 'AuthorCounter')
+    author_counts = (
+        Post.objects.order_by().values_list('author').annotate(Count('id'))
+    )
+    AuthorCounter.objects.bulk_create(
+        AuthorCounter(author_id=author_id, posts_count=count)
+        for author_id, count in author_counts
+    )
+    group_counts = (
+        Post.objects.order_by().filter(group__isnull=False)
+        .values_list('group').annotate(Count('id'))
+    )
+    for group_id, count in group_counts:
+        Group.objects.filter(id=group_id).update(posts_count=count)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('auth', '0011_update_proxy_permissions'),
+        ('posts', '0014_post_feed_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuthorCounter',
+            fields=[
+                ('author', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, primary_key=True, related_name='post_counter', serialize=False, to=settings.AUTH_USER_MODEL)),
+                ('posts_count', models.PositiveIntegerField(default=0)),
+            ],
+        ),
+        migrations.AddField(
+            model_name='group',
+            name='posts_count',
+            field=models.PositiveIntegerField(default=0, editable=False),
+        ),
+        migrations.RunPython(fill_counters, migrations.RunPython.noop),
+    ]
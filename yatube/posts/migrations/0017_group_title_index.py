@@ -0,0 +1,17 @@
+# Generated by Django 2.2.28 on 2026-10-18 19:32
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('posts', '0016_post_updated'),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='group',
+            index=models.Index(fields=['title'], name='group_title_idx'),
+        ),
+    ]
@@ -1,21 +1,71 @@
 from django.contrib.auth import get_user_model
-from django.db import models
+from django.db import models, transaction
 
 User = get_user_model()
 
 
+# Символ больше любого другого: title < prefix + MAX_CHAR для всех
+# строк, начинающихся с prefix.
+MAX_CHAR = chr(0x10FFFF)
+
+
+class GroupQuerySet(models.QuerySet):
+    def title_prefix(self, prefix):
+        """Группы с названием на prefix: диапазон по индексу title"""
+        return self.filter(
+            title__gte=prefix, title__lt=prefix + MAX_CHAR
+        ).order_by('title')
+
+
 class Group(models.Model):
     title = models.CharField(max_length=200)
     slug = models.SlugField(max_length=200, unique=True)
     description = models.TextField()
+    posts_count = models.PositiveIntegerField(default=0, editable=False)
+
+    objects = GroupQuerySet.as_manager()
+
+    class Meta:
+        indexes = [
+            models.Index(fields=['title'], name='group_title_idx'),
+        ]
 
     def __str__(self):
         return self.title
 
 
+class AuthorCounter(models.Model):
+    """Число постов автора, обновляется сигналами posts.signals.
+
+    posts_count считает и архивные посты, archived_count - только их.
+    """
+    author = models.OneToOneField(
+        User,
+        on_delete=models.CASCADE,
+        primary_key=True,
+        related_name='post_counter'
+    )
+    posts_count = models.PositiveIntegerField(default=0)
+    archived_count = models.PositiveIntegerField(default=0)
+
+    def __str__(self):
+        return f'{self.author_id}: {self.posts_count}'
+
+
+class PostQuerySet(models.QuerySet):
+    def for_feed(self):
+        """Связи, которые читает карточка includes/group_post.html"""
+        return self.select_related('author', 'group')
+
+    def for_detail(self):
+        """Связи, которые читает includes/group_one_post.html"""
+        return self.select_related('author__post_counter', 'group')
+
+
 class Post(models.Model):
     text = models.TextField(help_text="Введите текст для публикации")
     pub_date = models.DateTimeField(auto_now_add=True)
+    updated = models.DateTimeField(auto_now=True, db_index=True)
     author = models.ForeignKey(
         User,
         on_delete=models.CASCADE,
@@ -30,8 +80,90 @@ class Post(models.Model):
         help_text="Группа, к которой будет относиться пост"
     )
 
+    objects = PostQuerySet.as_manager()
+
     def __str__(self):
         return self.text[:15]
 
+    def save(self, *args, **kwargs):
+        """Счетчики постов обновляются в одной транзакции с постом"""
+        with transaction.atomic():
+            super().save(*args, **kwargs)
+
     class Meta:
-        ordering = ['-pub_date']
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['-pub_date', '-id'],
+                name='post_pub_date_idx'
+            ),
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='post_author_pub_date_idx'
+            ),
+            models.Index(
+                fields=['group', '-pub_date', '-id'],
+                name='post_group_pub_date_idx'
+            ),
+        ]
+
+
+class ArchivedPost(models.Model):
+    """Пост старше POSTS_ARCHIVE_AFTER_DAYS, перенесенный из posts_post
+    (posts.archive). id сохраняется: ссылки на пост продолжают работать.
+    """
+    id = models.IntegerField(primary_key=True)
+    text = models.TextField()
+    pub_date = models.DateTimeField()
+    updated = models.DateTimeField()
+    author = models.ForeignKey(
+        User,
+        on_delete=models.CASCADE,
+        related_name='archived_posts'
+    )
+    group = models.ForeignKey(
+        Group,
+        blank=True,
+        null=True,
+        on_delete=models.SET_NULL,
+        related_name='archived_posts'
+    )
+    archived = models.DateTimeField(auto_now_add=True)
+
+    objects = PostQuerySet.as_manager()
+
+    def __str__(self):
+        return self.text[:15]
+
+    def as_post(self):
+        """Пост для горячей таблицы с теми же id и связями"""
+        return Post(
+            id=self.id, text=self.text, pub_date=self.pub_date,
+            updated=self.updated, author_id=self.author_id,
+            group_id=self.group_id
+        )
+
+    class Meta:
+        ordering = ['-pub_date', '-id']
+        indexes = [
+            models.Index(
+                fields=['author', '-pub_date', '-id'],
+                name='archived_author_pub_date_idx'
+            ),
+        ]
+
+
+def author_posts_count(author):
+    """Число постов автора из счетчика, без COUNT(*)"""
+    try:
+        return author.post_counter.posts_count
+    except AuthorCounter.DoesNotExist:
+        return 0
+
+
+def author_archived_count(author):
+    """Сколько постов автора в архиве, тоже из счетчика"""
+    try:
+        return author.post_counter.archived_count
+    except AuthorCounter.DoesNotExist:
+        return 0
@@ -0,0 +1,194 @@
+import base64
+import binascii
+
+from django.db.models import Q
+from django.utils.dateparse import parse_datetime
+from django.utils.functional import cached_property
+
+CURSOR_NEXT = 'n'
+CURSOR_PREVIOUS = 'p'
+ELLIPSIS = '…'
+PAGES_ON_EACH_SIDE = 3
+PAGES_ON_ENDS = 2
+
+
+def elided_page_range(page, on_each_side=PAGES_ON_EACH_SIDE,
+                      on_ends=PAGES_ON_ENDS):
+    """Номера страниц вокруг текущей и по краям, пропуски - ELLIPSIS.
+
+    Число ссылок не зависит от общего числа страниц.
+    """
+    number, num_pages = page.number, page.paginator.num_pages
+    if num_pages <= (on_each_side + on_ends) * 2 + 1:
+        yield from range(1, num_pages + 1)
+        return
+    if number > 1 + on_each_side + on_ends + 1:
+        yield from range(1, on_ends + 1)
+        yield ELLIPSIS
+        yield from range(number - on_each_side, number + 1)
+    else:
+        yield from range(1, number + 1)
+    if number < num_pages - on_each_side - on_ends - 1:
+        yield from range(number + 1, number + on_each_side + 1)
+        yield ELLIPSIS
+        yield from range(num_pages - on_ends + 1, num_pages + 1)
+    else:
+        yield from range(number + 1, num_pages + 1)
+
+
+def encode_cursor(direction, post):
+    """Упаковываем позицию (pub_date, id) в непрозрачный токен"""
+    raw = f'{direction}|{post.pub_date.isoformat()}|{post.pk}'
+    return base64.urlsafe_b64encode(raw.encode()).decode().rstrip('=')
+
+
+def decode_cursor(token):
+    """Распаковываем токен, для битого токена возвращаем первую страницу"""
+    if not token:
+        return CURSOR_NEXT, None
+    try:
+        padding = '=' * (-len(token) % 4)
+        raw = base64.urlsafe_b64decode(token + padding).decode()
+        direction, pub_date, pk = raw.split('|')
+        pub_date = parse_datetime(pub_date)
+        pk = int(pk)
+    except (binascii.Error, UnicodeDecodeError, ValueError):
+        return CURSOR_NEXT, None
+    if direction not in (CURSOR_NEXT, CURSOR_PREVIOUS) or pub_date is None:
+        return CURSOR_NEXT, None
+    return direction, (pub_date, pk)
+
+
+class CursorPage:
+    """Страница ленты без общего числа страниц и без OFFSET"""
+    is_cursor = True
+
+    def __init__(self, object_list, next_cursor=None, previous_cursor=None):
+        self.object_list = object_list
+        self.next_cursor = next_cursor
+        self.previous_cursor = previous_cursor
+
+    def __repr__(self):
+        return f'<CursorPage of {len(self.object_list)} objects>'
+
+    def __len__(self):
+        return len(self.object_list)
+
+    def __iter__(self):
+        return iter(self.object_list)
+
+    def __getitem__(self, index):
+        return self.object_list[index]
+
+    def has_next(self):
+        return self.next_cursor is not None
+
+    def has_previous(self):
+        return self.previous_cursor is not None
+
+    def has_other_pages(self):
+        return self.has_next() or self.has_previous()
+
+
+class FeedWithArchive:
+    """Лента из горячей таблицы и архива для пагинаторов.
+
+    Срез по номерам страниц считает, что архив старше горячих постов:
+    страницы в пределах hot_count архив не читают. CursorPaginator
+    сливает обе выборки по (pub_date, id).
+    """
+
+    def __init__(self, hot, archive, hot_count=None):
+        self.hot = hot
+        self.archive = archive
+        if hot_count is not None:
+            self.hot_count = hot_count
+
+    @cached_property
+    def hot_count(self):
+        # Нужен только срезам по номерам страниц, CursorPaginator
+        # обходится без COUNT(*).
+        return self.hot.count()
+
+    def count(self):
+        return self.hot_count + self.archive.count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        start = key.start or 0
+        stop = len(self) if key.stop is None else key.stop
+        posts = []
+        if start < self.hot_count:
+            posts.extend(self.hot[start:min(stop, self.hot_count)])
+        if stop > self.hot_count:
+            posts.extend(self.archive[
+                max(start - self.hot_count, 0):stop - self.hot_count
+            ])
+        return posts
+
+
+class CursorPaginator:
+    """Keyset-пагинация по (pub_date, id): цена страницы не зависит от
+    глубины, COUNT(*) не выполняется.
+    """
+
+    def __init__(self, queryset, per_page):
+        if isinstance(queryset, FeedWithArchive):
+            self.querysets = (queryset.hot, queryset.archive)
+        else:
+            self.querysets = (queryset,)
+        self.per_page = int(per_page)
+
+    def _fetch(self, ordering, *conditions):
+        posts = []
+        for queryset in self.querysets:
+            posts.extend(
+                queryset.filter(*conditions)
+                .order_by(*ordering)[:self.per_page + 1]
+            )
+        if len(self.querysets) > 1:
+            posts.sort(
+                key=lambda post: (post.pub_date, post.pk),
+                reverse=ordering[0].startswith('-')
+            )
+        return posts[:self.per_page + 1]
+
+    def get_page(self, token):
+        direction, position = decode_cursor(token)
+        if position is None:
+            posts = self._fetch(('-pub_date', '-id'))
+            has_next, has_previous = len(posts) > self.per_page, False
+        elif direction == CURSOR_NEXT:
+            pub_date, pk = position
+            posts = self._fetch(
+                ('-pub_date', '-id'),
+                Q(pub_date__lte=pub_date),
+                Q(pub_date__lt=pub_date) | Q(id__lt=pk)
+            )
+            has_next, has_previous = len(posts) > self.per_page, True
+        else:
+            pub_date, pk = position
+            posts = self._fetch(
+                ('pub_date', 'id'),
+                Q(pub_date__gte=pub_date),
+                Q(pub_date__gt=pub_date) | Q(id__gt=pk)
+            )
+            has_next, has_previous = True, len(posts) > self.per_page
+            posts = posts[:self.per_page][::-1]
+        posts = posts[:self.per_page]
+        if not posts:
+            return CursorPage(posts)
+        return CursorPage(
+            posts,
+            next_cursor=(
+                encode_cursor(CURSOR_NEXT, posts[-1]) if has_next else None
+            ),
+            previous_cursor=(
+                encode_cursor(CURSOR_PREVIOUS, posts[0])
+                if has_previous else None
+            ),
+        )
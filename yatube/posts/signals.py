@@ -0,0 +1,133 @@
+from collections import Counter
+
+from django.db.models.signals import post_delete, post_init, post_save
+from django.dispatch import Signal, receiver
+
+from .cache import (ALL_PAGES_TAG, INDEX_PAGE_TAG, group_page_tag,
+                    invalidate_tags, profile_page_tag)
+from .counters import (change_archived_count, change_author_count,
+                       change_group_count)
+from .models import ArchivedPost, Group, Post, User
+
+# Отправляется после bulk_create постов (post_save для них не приходит):
+# posts - список созданных постов с id.
+posts_bulk_created = Signal()
+# Отправляется после переноса постов в архив (posts.archive): posts -
+# перенесенные посты, пост при этом не создается и не удаляется.
+posts_archived = Signal()
+
+
+@receiver(post_init, sender=Post)
+def remember_post_relations(sender, instance, **kwargs):
+    """Запоминаем автора и группу, чтобы заметить их смену при сохранении"""
+    instance._saved_relations = (instance.author_id, instance.group_id)
+
+
+@receiver(post_save, sender=Post)
+def count_saved_post(sender, instance, created, **kwargs):
+    author_id, group_id = instance.author_id, instance.group_id
+    if created:
+        change_author_count(author_id, 1)
+        change_group_count(group_id, 1)
+        return
+    old_author_id, old_group_id = instance._saved_relations
+    if old_author_id != author_id:
+        change_author_count(old_author_id, -1)
+        change_author_count(author_id, 1)
+    if old_group_id != group_id:
+        change_group_count(old_group_id, -1)
+        change_group_count(group_id, 1)
+
+
+@receiver(posts_bulk_created, sender=Post)
+def count_bulk_created_posts(sender, posts, **kwargs):
+    authors = Counter(post.author_id for post in posts)
+    groups = Counter(post.group_id for post in posts)
+    for author_id, count in authors.items():
+        change_author_count(author_id, count)
+    for group_id, count in groups.items():
+        change_group_count(group_id, count)
+
+
+@receiver(post_delete, sender=Post)
+def count_deleted_post(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    change_group_count(instance.group_id, -1)
+
+
+@receiver(posts_archived, sender=Post)
+def count_archived_posts(sender, posts, **kwargs):
+    # Автор считает и архив, группа - только горячие посты.
+    for author_id, count in Counter(post.author_id for post in posts).items():
+        change_archived_count(author_id, count)
+    for group_id, count in Counter(post.group_id for post in posts).items():
+        change_group_count(group_id, -count)
+
+
+@receiver(post_delete, sender=ArchivedPost)
+def count_deleted_archived_post(sender, instance, **kwargs):
+    change_author_count(instance.author_id, -1)
+    change_archived_count(instance.author_id, -1)
+
+
+def invalidate_pages(author_ids, group_ids, *tags):
+    """Сбрасываем ленту и страницы только этих авторов и групп"""
+    usernames = User.objects.filter(id__in=author_ids).values_list(
+        'username', flat=True
+    )
+    slugs = Group.objects.filter(id__in=group_ids).values_list(
+        'slug', flat=True
+    )
+    invalidate_tags(
+        *tags,
+        INDEX_PAGE_TAG,
+        *(profile_page_tag(username) for username in usernames),
+        *(group_page_tag(slug) for slug in slugs),
+    )
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_delete, sender=Post)
+def invalidate_post_cache(sender, instance, **kwargs):
+    """Сбрасываем карточку поста и только те страницы, где он виден"""
+    invalidate_pages(
+        {instance.author_id, instance._saved_relations[0]},
+        {instance.group_id, instance._saved_relations[1]} - {None},
+        f'post:{instance.pk}'
+    )
+
+
+@receiver(posts_bulk_created, sender=Post)
+@receiver(posts_archived, sender=Post)
+def invalidate_bulk_cache(sender, posts, **kwargs):
+    invalidate_pages(
+        {post.author_id for post in posts},
+        {post.group_id for post in posts} - {None},
+    )
+
+
+@receiver(post_save, sender=ArchivedPost)
+@receiver(post_delete, sender=ArchivedPost)
+def invalidate_archived_post_cache(sender, instance, **kwargs):
+    invalidate_pages({instance.author_id}, set(), f'post:{instance.pk}')
+
+
+@receiver(post_save, sender=Group)
+@receiver(post_delete, sender=Group)
+def invalidate_group_cache(sender, instance, **kwargs):
+    invalidate_tags(f'group:{instance.pk}', ALL_PAGES_TAG)
+
+
+@receiver(post_save, sender=User)
+@receiver(post_delete, sender=User)
+def invalidate_author_cache(sender, instance, update_fields=None, **kwargs):
+    # Вход на сайт сохраняет только last_login, его в карточках нет.
+    if update_fields is not None and set(update_fields) == {'last_login'}:
+        return
+    invalidate_tags(f'user:{instance.pk}', ALL_PAGES_TAG)
+
+
+@receiver(post_save, sender=Post)
+def reset_post_relations(sender, instance, **kwargs):
+    """Подключен последним: остальные обработчики видят прежние связи"""
+    instance._saved_relations = (instance.author_id, instance.group_id)
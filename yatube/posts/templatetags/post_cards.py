@@ -0,0 +1,11 @@
+from django import template
+
+from posts.cache import render_post_cards
+
+register = template.Library()
+
+
+@register.simple_tag(takes_context=True)
+def post_cards(context, posts):
+    """Готовый HTML карточек includes/group_post.html для страницы ленты"""
+    return render_post_cards(posts, bool(context.get('is_profile')))
@@ -0,0 +1,210 @@
+import json
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.management import call_command
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.archive import archive_posts
+from posts.models import (ArchivedPost, AuthorCounter, Group, Post,
+                          author_archived_count, author_posts_count)
+from posts.paginators import FeedWithArchive
+from posts.views import POST_LIMIT
+from search.backends import get_backend
+
+User = get_user_model()
+
+POSTS = POST_LIMIT + 5
+OLD_POSTS = 8
+
+
+class PostArchiveTest(TestCase):
+    @classmethod
+    def setUpTestData(cls):
+        cls.user = User.objects.create_user(username='LucyTestArchive')
+        cls.group = Group.objects.create(
+            title='LucyTestGroupArchive',
+            slug='TestovayaGroupArchive',
+            description='Эта группа создана для тестирования архива'
+        )
+        now = timezone.now()
+        cls.posts = []
+        for number in range(POSTS):
+            post = Post.objects.create(
+                text=f'Архивный тест {number}', author=cls.user,
+                group=cls.group
+            )
+            # Первые посты самые старые: им больше года.
+            pub_date = now - timedelta(days=POSTS - number + (
+                400 if number < OLD_POSTS else 0
+            ))
+            Post.objects.filter(id=post.id).update(pub_date=pub_date)
+            cls.posts.append(post)
+        cls.old_ids = [post.id for post in cls.posts[:OLD_POSTS]]
+
+    def setUp(self):
+        cache.clear()
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def archive(self, batch_size=3):
+        return archive_posts(
+            timezone.now() - timedelta(days=365), batch_size=batch_size
+        )
+
+    def author(self):
+        return User.objects.select_related('post_counter').get(
+            id=self.user.id
+        )
+
+    def test_archive_moves_old_posts(self):
+        """Старые посты переезжают пачками, id и счетчик автора прежние."""
+        self.assertEqual(self.archive(), OLD_POSTS)
+        self.assertEqual(
+            sorted(ArchivedPost.objects.values_list('id', flat=True)),
+            self.old_ids
+        )
+        self.assertFalse(Post.objects.filter(id__in=self.old_ids).exists())
+        author = self.author()
+        self.assertEqual(author_posts_count(author), POSTS)
+        self.assertEqual(author_archived_count(author), OLD_POSTS)
+        self.group.refresh_from_db()
+        self.assertEqual(self.group.posts_count, POSTS - OLD_POSTS)
+        self.assertEqual(self.archive(), 0)
+
+    def test_post_detail_reads_archive(self):
+        """Страница архивного поста открывается по прежнему адресу."""
+        self.archive()
+        post = self.posts[0]
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.id])
+        )
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(response.context['post_selected'].text, post.text)
+        self.assertEqual(response.context['count_posts'], POSTS)
+        self.assertTrue(response.has_header('ETag'))
+        response = self.client.get(reverse('posts:post_detail', args=[10**6]))
+        self.assertEqual(response.status_code, 404)
+
+    def test_profile_pages_continue_into_archive(self):
+        """Глубокие страницы профиля дочитываются из архива."""
+        self.archive()
+        url = reverse('posts:profile', args=[self.user.username])
+        expected = [post.id for post in reversed(self.posts)]
+        shown = []
+        for page in (1, 2):
+            response = self.client.get(url, {'page': page})
+            shown += [post.id for post in response.context['page_obj']]
+        self.assertEqual(shown, expected)
+        self.assertEqual(
+            response.context['page_obj'].paginator.num_pages, 2
+        )
+        shown, params = [], {'cursor': ''}
+        while True:
+            page_obj = self.client.get(url, params).context['page_obj']
+            shown += [post.id for post in page_obj]
+            if not page_obj.has_next():
+                break
+            params = {'cursor': page_obj.next_cursor}
+        self.assertEqual(shown, expected)
+
+    def test_feed_slices(self):
+        """Срезы ленты с архивом, в том числе открытые."""
+        self.archive()
+        feed = FeedWithArchive(
+            self.user.posts.all(), self.user.archived_posts.all()
+        )
+        expected = [post.id for post in reversed(self.posts)]
+        self.assertEqual(len(feed), POSTS)
+        self.assertEqual([post.id for post in feed[3:]], expected[3:])
+        self.assertEqual([post.id for post in feed[:5]], expected[:5])
+        self.assertEqual(feed[POSTS - 1].id, expected[-1])
+
+    def test_feeds_show_hot_posts(self):
+        """Лента группы и главная читают только горячую таблицу."""
+        self.archive()
+        response = self.client.get(
+            reverse('posts:grouppa', args=[self.group.slug])
+        )
+        self.assertEqual(
+            len(response.context['page_obj']), POSTS - OLD_POSTS
+        )
+
+    def test_edit_archived_in_place(self):
+        """Правка архивного поста остается в архиве, порядок профиля
+        прежний.
+        """
+        self.archive()
+        post = self.posts[0]
+        url = reverse('posts:post_edit', args=[post.id])
+        self.assertEqual(self.authorized_client.get(url).status_code, 200)
+        self.client.get(reverse('posts:post_detail', args=[post.id]))
+        self.authorized_client.post(url, {'text': 'Правка из архива'})
+        archived = ArchivedPost.objects.get(id=post.id)
+        self.assertEqual(archived.text, 'Правка из архива')
+        self.assertFalse(Post.objects.filter(id=post.id).exists())
+        author = self.author()
+        self.assertEqual(author_posts_count(author), POSTS)
+        self.assertEqual(author_archived_count(author), OLD_POSTS)
+        response = self.client.get(
+            reverse('posts:post_detail', args=[post.id])
+        )
+        self.assertEqual(
+            response.context['post_selected'].text, 'Правка из архива'
+        )
+        profile = reverse('posts:profile', args=[self.user.username])
+        response = self.client.get(profile, {'page': 2})
+        self.assertEqual(
+            [shown.id for shown in response.context['page_obj']],
+            [post.id for post in reversed(self.posts)][POST_LIMIT:]
+        )
+        self.assertEqual(self.archive(), 0)
+
+    def test_delete_archived_post(self):
+        """Удаление архивного поста уменьшает счетчики автора."""
+        self.archive()
+        ArchivedPost.objects.get(id=self.old_ids[0]).delete()
+        author = self.author()
+        self.assertEqual(author_posts_count(author), POSTS - 1)
+        self.assertEqual(author_archived_count(author), OLD_POSTS - 1)
+
+    def test_rebuild_counters(self):
+        """Пересчет счетчиков учитывает архив."""
+        self.archive()
+        AuthorCounter.objects.all().delete()
+        call_command('rebuild_post_counters', stdout=StringIO())
+        author = self.author()
+        self.assertEqual(author_posts_count(author), POSTS)
+        self.assertEqual(author_archived_count(author), OLD_POSTS)
+
+    def test_search_finds_archived_posts(self):
+        """Поиск находит архивные посты и после перестроения индекса."""
+        self.archive()
+        get_backend().rebuild()
+        results = get_backend().search('Архивный')
+        self.assertEqual(len(results[0:POSTS]), POSTS)
+
+    def test_api(self):
+        """API отдает архивный пост и ленту автора вместе с архивом."""
+        self.archive()
+        response = self.client.get(
+            reverse('api:post_detail', args=[self.old_ids[0]])
+        )
+        self.assertEqual(response.status_code, 200)
+        response = self.client.get(
+            reverse('api:author_posts', args=[self.user.username]),
+            {'limit': 100, 'fields': 'id'}
+        )
+        document = json.loads(b''.join(response.streaming_content))
+        ids = [post['id'] for post in document['results']]
+        self.assertEqual(ids, [post.id for post in reversed(self.posts)])
+
+    def test_command(self):
+        """Команда archive_posts сообщает, сколько постов перенесла."""
+        out = StringIO()
+        call_command('archive_posts', days=365, batch_size=5, stdout=out)
+        self.assertIn(f': {OLD_POSTS}', out.getvalue())
@@ -0,0 +1,28 @@
+from django.test import TestCase
+
+from posts import benchmark
+from posts.models import Post
+
+
+class BenchmarkTest(TestCase):
+    def test_seed_and_run(self):
+        """Бенчмарк наполняет базу и замеряет все views."""
+        benchmark.seed(posts=30, users=3, groups=2, seed=1)
+        self.assertEqual(Post.objects.count(), 30)
+        report = benchmark.run(requests=2, seed=1)
+        self.assertEqual(set(report), {
+            'posts:index', 'posts:group_posts', 'posts:profile',
+            'posts:post_detail', 'posts:post_create', 'posts:post_edit',
+        })
+        for name, result in report.items():
+            with self.subTest(view=name):
+                self.assertEqual(result['latency']['count'], 2)
+                self.assertNotIn('500', result['statuses'])
+        # Замер памяти не повторяет записи: постов создано по сценарию.
+        self.assertEqual(Post.objects.count(), 32)
+        self.assertIsNone(report['posts:post_create']['peak_memory_kb'])
+
+    def test_paginator_render_is_flat(self):
+        """Число ссылок пагинации не растет вместе с числом страниц."""
+        report = benchmark.render_paginator([100, 50000], repeats=2)
+        self.assertEqual(report['100']['links'], report['50000']['links'])
@@ -0,0 +1,191 @@
+import os
+import subprocess
+import sys
+import tempfile
+
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.db import transaction
+from django.test import Client, TestCase, TransactionTestCase
+from django.urls import reverse
+
+from posts.cache import (INDEX_PAGE_TAG, get_tag_versions,
+                         profile_page_tag)
+from posts.models import Group, Post
+
+User = get_user_model()
+
+# Другой воркер сбрасывает теги так же, как обработчики записи постов.
+OTHER_WORKER = '''
+import sys
+import django
+django.setup()
+from posts.cache import invalidate_tags
+invalidate_tags(*sys.argv[1:])
+'''
+
+
+class PostCardCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestCache')
+        cls.group = Group.objects.create(
+            title='LucyTestGroupCache',
+            slug='TestovayaGroupCache',
+            description='Эта группа создана для тестирования кэша'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст поста',
+            group=cls.group,
+            author=cls.user
+        )
+
+    def setUp(self):
+        cache.clear()
+        # авторизованному клиенту страница целиком не кэшируется
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def test_cards_rendered_once(self):
+        """Повторная страница собирается из кэша без рендера карточки."""
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertTemplateUsed(response, 'includes/group_post.html')
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertTemplateNotUsed(response, 'includes/group_post.html')
+        self.assertContains(response, self.post.text)
+
+    def test_cards_invalidated_by_signals(self):
+        """Правка поста, группы и автора сбрасывает карточку."""
+        self.authorized_client.get(reverse('posts:index'))
+        post = Post.objects.get(id=self.post.id)
+        post.text = 'Исправленный текст поста'
+        post.save()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Исправленный текст поста')
+        group = Group.objects.get(id=self.group.id)
+        group.slug = 'NovyiSlug'
+        group.save()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(
+            response, reverse('posts:grouppa', args=['NovyiSlug'])
+        )
+        user = User.objects.get(id=self.user.id)
+        user.first_name = 'Люся'
+        user.save()
+        response = self.authorized_client.get(reverse('posts:index'))
+        self.assertContains(response, 'Люся')
+
+
+class AnonymousPageCacheTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestPageCache')
+        cls.user_other = User.objects.create_user(username='MikePageCache')
+        cls.group = Group.objects.create(
+            title='LucyTestGroupPageCache',
+            slug='TestovayaGroupPageCache',
+            description='Эта группа создана для тестирования кэша страниц'
+        )
+        cls.group_other = Group.objects.create(
+            title='MikeTestGroupPageCache',
+            slug='MikeTestovayaGroupPageCache',
+            description='Эта группа Mike создана для тестирования кэша'
+        )
+        Post.objects.create(text='Старый пост', author=cls.user_other)
+        cls.index = reverse('posts:index')
+        cls.group_page = reverse('posts:grouppa', args=[cls.group.slug])
+        cls.group_other_page = reverse(
+            'posts:grouppa', args=[cls.group_other.slug]
+        )
+        cls.profile_page = reverse('posts:profile', args=[cls.user.username])
+        cls.profile_other_page = reverse(
+            'posts:profile', args=[cls.user_other.username]
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def check_served_from_cache(self, urls, cached):
+        for url in urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertEqual(response.context is None, cached)
+
+    def test_new_post_purges_only_its_pages(self):
+        """Новый пост сбрасывает ленту, профиль автора и страницу группы."""
+        urls = (
+            self.index, self.group_page, self.group_other_page,
+            self.profile_page, self.profile_other_page
+        )
+        self.check_served_from_cache(urls, cached=False)
+        self.check_served_from_cache(urls, cached=True)
+        Post.objects.create(
+            text='Новый пост', author=self.user, group=self.group
+        )
+        self.check_served_from_cache(
+            (self.index, self.group_page, self.profile_page), cached=False
+        )
+        self.check_served_from_cache(
+            (self.group_other_page, self.profile_other_page), cached=True
+        )
+
+    def test_purge_from_other_worker(self):
+        """Сброс тегов в другом процессе виден и в этом."""
+        urls = (self.index, self.profile_page, self.profile_other_page)
+        self.check_served_from_cache(urls, cached=False)
+        self.check_served_from_cache(urls, cached=True)
+        subprocess.run(
+            [sys.executable, '-c', OTHER_WORKER, INDEX_PAGE_TAG,
+             profile_page_tag(self.user.username)],
+            cwd=settings.BASE_DIR, check=True, capture_output=True,
+            env={
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': 'yatube.settings',
+                # Тот же временный каталог, что у тестов (core.testing).
+                'CACHE_DIR': settings.CACHES['default']['LOCATION'],
+            }
+        )
+        self.check_served_from_cache(
+            (self.index, self.profile_page), cached=False
+        )
+        self.check_served_from_cache([self.profile_other_page], cached=True)
+
+    def test_authorized_user_not_cached(self):
+        """Страницы авторизованного пользователя не кэшируются."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(self.index)
+        response = client.get(self.index)
+        self.assertIsNotNone(response.context)
+
+    def test_file_based_backend(self):
+        """Кэш страниц работает на файловом бэкенде."""
+        with tempfile.TemporaryDirectory() as location:
+            caches = {**settings.CACHES, 'default': {
+                'BACKEND': 'django.core.cache.backends.filebased.'
+                           'FileBasedCache',
+                'LOCATION': location,
+            }}
+            with self.settings(CACHES=caches):
+                self.check_served_from_cache([self.index], cached=False)
+                self.check_served_from_cache([self.index], cached=True)
+
+
+class InvalidateOnCommitTest(TransactionTestCase):
+    def test_tags_purged_after_commit(self):
+        """Версия, созданная читателем до фиксации записи, сбрасывается."""
+        cache.clear()
+        user = User.objects.create_user(username='LucyTestOnCommit')
+        post = Post.objects.create(text='Старый текст', author=user)
+        tags = [f'post:{post.pk}']
+        with transaction.atomic():
+            post.text = 'Новый текст'
+            post.save()
+            # Параллельный читатель видит снимок до записи.
+            stale = get_tag_versions(tags)
+            self.assertEqual(get_tag_versions(tags), stale)
+        self.assertNotEqual(get_tag_versions(tags), stale)
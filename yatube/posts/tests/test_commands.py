@@ -0,0 +1,144 @@
+import os
+import tempfile
+from datetime import timedelta
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+from django.utils import timezone
+
+from posts.archive import archive_cutoff, archive_posts
+from posts.models import (ArchivedPost, Group, Post, author_archived_count,
+                          author_posts_count)
+
+User = get_user_model()
+
+
+class FeedPlansCommandTest(TestCase):
+    def test_feed_queries_use_indexes(self):
+        """Запросы лент не уходят в полный проход по таблице."""
+        out = StringIO()
+        call_command('check_feed_plans', stdout=out)
+        self.assertIn('post_author_pub_date_idx', out.getvalue())
+        self.assertIn('post_group_pub_date_idx', out.getvalue())
+        self.assertIn('archived_author_pub_date_idx', out.getvalue())
+
+
+class ImportExportCommandsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestImport')
+        cls.group = Group.objects.create(
+            title='LucyTestGroupImport',
+            slug='TestovayaGroupImport',
+            description='Эта группа создана для тестирования импорта'
+        )
+        for i in range(5):
+            Post.objects.create(
+                text=f'Тестовый текст, "поста"\n{i}',
+                group=cls.group if i % 2 else None,
+                author=cls.user
+            )
+
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def roundtrip(self, filename):
+        path = os.path.join(self.tmp_dir.name, filename)
+        call_command('export_posts', '--model', 'group', path + '.groups',
+                     '--format', filename.rsplit('.')[-1], stderr=StringIO())
+        call_command('export_posts', path, stderr=StringIO())
+        exported = list(Post.objects.order_by('id').values_list(
+            'text', 'pub_date', 'author__username', 'group__slug'
+        ))
+        Post.objects.all().delete()
+        Group.objects.all().delete()
+        call_command('import_posts', '--model', 'group', path + '.groups',
+                     '--format', filename.rsplit('.')[-1], stdout=StringIO())
+        call_command('import_posts', path, '--batch-size', '2',
+                     stdout=StringIO(), stderr=StringIO())
+        imported = list(Post.objects.order_by('id').values_list(
+            'text', 'pub_date', 'author__username', 'group__slug'
+        ))
+        self.assertEqual(imported, exported)
+        user = User.objects.get(id=self.user.id)
+        self.assertEqual(author_posts_count(user), 5)
+        self.assertEqual(Group.objects.get().posts_count, 2)
+
+    def test_jsonl_roundtrip(self):
+        """Выгрузка и загрузка JSON Lines сохраняют посты и счетчики."""
+        self.roundtrip('posts.jsonl')
+
+    def test_csv_roundtrip(self):
+        """Выгрузка и загрузка CSV сохраняют посты и счетчики."""
+        self.roundtrip('posts.csv')
+
+    def test_archived_posts_roundtrip(self):
+        """Архивные посты выгружаются и после загрузки снова в архиве."""
+        old_ids = list(Post.objects.order_by('id').values_list(
+            'id', flat=True
+        )[:2])
+        Post.objects.filter(id__in=old_ids).update(
+            pub_date=archive_cutoff() - timedelta(days=1)
+        )
+        archive_posts(timezone.now() - timedelta(days=1))
+        fields = ('text', 'pub_date', 'author__username', 'group__slug')
+        hot = list(Post.objects.order_by('id').values_list(*fields))
+        archived = list(
+            ArchivedPost.objects.order_by('id').values_list(*fields)
+        )
+        self.assertEqual((len(hot), len(archived)), (3, 2))
+        path = os.path.join(self.tmp_dir.name, 'posts.jsonl')
+        call_command('export_posts', path, stderr=StringIO())
+        ArchivedPost.objects.all().delete()
+        Post.objects.all().delete()
+        call_command('import_posts', path, stdout=StringIO(),
+                     stderr=StringIO())
+        self.assertEqual(
+            list(Post.objects.order_by('id').values_list(*fields)), hot
+        )
+        self.assertEqual(list(
+            ArchivedPost.objects.order_by('id').values_list(*fields)
+        ), archived)
+        user = User.objects.get(id=self.user.id)
+        self.assertEqual(author_posts_count(user), 5)
+        self.assertEqual(author_archived_count(user), 2)
+
+    def test_unknown_author_skipped(self):
+        """Строки с неизвестным автором пропускаются."""
+        path = os.path.join(self.tmp_dir.name, 'posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write('{"text": "Текст", "author": "nobody"}\n')
+        out = StringIO()
+        call_command('import_posts', path, stdout=out, stderr=StringIO())
+        self.assertIn('пропущено: 1', out.getvalue())
+
+    def test_bad_rows_skipped(self):
+        """Плохие строки пропускаются и попадают в отчет, пачка грузится."""
+        path = os.path.join(self.tmp_dir.name, 'posts.jsonl')
+        with open(path, 'w', encoding='utf-8') as stream:
+            stream.write(
+                '{"text": "Первый", "author": "LucyTestImport"}\n'
+                '{"text": "Дата", "author": "LucyTestImport", '
+                '"pub_date": "вчера"}\n'
+                '{"author": "LucyTestImport"}\n'
+                '{"text": "", "author": "LucyTestImport"}\n'
+                '{"text": "Группа", "author": "LucyTestImport", '
+                '"group": "missing"}\n'
+                '{не json\n'
+                '{"text": "Последний", "author": "LucyTestImport", '
+                '"pub_date": "2020-01-02T03:04:05+00:00"}\n'
+            )
+        out, err = StringIO(), StringIO()
+        call_command('import_posts', path, stdout=out, stderr=err)
+        self.assertIn('Загружено строк: 2, пропущено: 5', out.getvalue())
+        for number in range(2, 7):
+            self.assertIn(f'Строка {number}:', err.getvalue())
+        # Пост старше срока архива загрузка сразу переносит в архив.
+        post = ArchivedPost.objects.get(text='Последний')
+        self.assertEqual(post.pub_date.year, 2020)
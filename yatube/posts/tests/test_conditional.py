@@ -0,0 +1,110 @@
+from http import HTTPStatus
+from unittest import mock
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, SimpleTestCase, TestCase, override_settings
+from django.urls import reverse
+from django.utils.http import http_date
+
+from posts.checks import check_shared_cache
+from posts.models import Group, Post
+
+User = get_user_model()
+
+
+class ConditionalGetTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestConditional')
+        cls.group = Group.objects.create(
+            title='LucyTestGroupConditional',
+            slug='TestovayaGroupConditional',
+            description='Эта группа создана для тестирования 304'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст поста',
+            group=cls.group,
+            author=cls.user
+        )
+        cls.urls = (
+            reverse('posts:index'),
+            reverse('posts:grouppa', args=[cls.group.slug]),
+            reverse('posts:profile', args=[cls.user.username]),
+            reverse('posts:post_detail', args=[cls.post.id]),
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_revalidation_returns_not_modified(self):
+        """Повторный запрос с ETag получает 304 без рендера шаблона."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                response = self.guest_client.get(url)
+                self.assertTrue(response.has_header('Last-Modified'))
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=response['ETag']
+                )
+                self.assertEqual(
+                    response.status_code, HTTPStatus.NOT_MODIFIED
+                )
+                self.assertIsNone(response.context)
+
+    def test_edit_changes_etag(self):
+        """Правка поста меняет ETag и Last-Modified."""
+        for url in self.urls:
+            with self.subTest(url=url):
+                before = self.guest_client.get(url)
+                post = Post.objects.get(id=self.post.id)
+                post.text = f'Новый текст для {url}'
+                post.save()
+                response = self.guest_client.get(
+                    url, HTTP_IF_NONE_MATCH=before['ETag']
+                )
+                self.assertEqual(response.status_code, HTTPStatus.OK)
+                self.assertNotEqual(response['ETag'], before['ETag'])
+
+    def test_etag_differs_per_user(self):
+        """У авторизованного пользователя свой ETag."""
+        url = reverse('posts:index')
+        anonymous = self.guest_client.get(url)
+        client = Client()
+        client.force_login(self.user)
+        response = client.get(url, HTTP_IF_NONE_MATCH=anonymous['ETag'])
+        self.assertEqual(response.status_code, HTTPStatus.OK)
+
+    def test_delete_changes_last_modified(self):
+        """Удаление поста сдвигает Last-Modified для If-Modified-Since."""
+        urls = self.urls[:3]
+        before = {url: self.guest_client.get(url) for url in urls}
+        Post.objects.create(
+            text='Пост на удаление', group=self.group, author=self.user
+        ).delete()
+        with mock.patch('posts.cache.time.time', return_value=10**10):
+            for url in urls:
+                with self.subTest(url=url):
+                    response = self.guest_client.get(
+                        url,
+                        HTTP_IF_MODIFIED_SINCE=before[url]['Last-Modified']
+                    )
+                    self.assertEqual(response.status_code, HTTPStatus.OK)
+                    self.assertEqual(
+                        response['Last-Modified'], http_date(10**10)
+                    )
+
+
+class SharedCacheCheckTest(SimpleTestCase):
+    def test_shared_cache_passes(self):
+        """Файловый кэш общий для воркеров: ошибок нет."""
+        self.assertEqual(check_shared_cache(None), [])
+
+    @override_settings(CACHES={'default': {
+        'BACKEND': 'django.core.cache.backends.locmem.LocMemCache',
+    }})
+    def test_per_process_cache_rejected(self):
+        """Кэш в памяти процесса не годится для версий тегов."""
+        errors = check_shared_cache(None)
+        self.assertEqual([error.id for error in errors], ['posts.E001'])
@@ -0,0 +1,68 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.test import TestCase
+
+from posts.models import AuthorCounter, Group, Post, author_posts_count
+
+User = get_user_model()
+
+
+class PostCountersTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestCounters')
+        cls.group = Group.objects.create(
+            title='LucyTestGroupCounters',
+            slug='TestovayaGroupCounters',
+            description='Эта группа создана для тестирования счетчиков'
+        )
+        cls.group_other = Group.objects.create(
+            title='MikeTestGroupCounters',
+            slug='MikeTestovayaGroupCounters',
+            description='Эта группа Mike создана для тестирования счетчиков'
+        )
+
+    def check_counts(self, author_count, group_count, group_other_count):
+        author = User.objects.get(id=self.user.id)
+        self.assertEqual(author_posts_count(author), author_count)
+        self.group.refresh_from_db()
+        self.group_other.refresh_from_db()
+        self.assertEqual(self.group.posts_count, group_count)
+        self.assertEqual(self.group_other.posts_count, group_other_count)
+
+    def test_counters_follow_post_changes(self):
+        """Счетчики меняются при создании, смене группы и удалении."""
+        post = Post.objects.create(
+            text='Тестовый текст', author=self.user, group=self.group
+        )
+        Post.objects.create(text='Без группы', author=self.user)
+        self.check_counts(2, 1, 0)
+        post = Post.objects.get(id=post.id)
+        post.group = self.group_other
+        post.save()
+        self.check_counts(2, 0, 1)
+        post.delete()
+        self.check_counts(1, 0, 0)
+
+    def test_drifted_counter_is_not_negative(self):
+        """Удаление поста при обнуленном счетчике не падает."""
+        post = Post.objects.create(
+            text='Тестовый текст', author=self.user, group=self.group
+        )
+        AuthorCounter.objects.update(posts_count=0)
+        Group.objects.update(posts_count=0)
+        post.delete()
+        self.check_counts(0, 0, 0)
+
+    def test_rebuild_command(self):
+        """Команда rebuild_post_counters восстанавливает счетчики."""
+        Post.objects.create(
+            text='Тестовый текст', author=self.user, group=self.group
+        )
+        AuthorCounter.objects.all().delete()
+        Group.objects.update(posts_count=7)
+        call_command('rebuild_post_counters', stdout=StringIO())
+        self.check_counts(1, 1, 0)
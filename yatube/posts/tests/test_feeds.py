@@ -0,0 +1,113 @@
+import json
+from datetime import timedelta
+from xml.etree import ElementTree
+
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+from django.utils import timezone
+
+from posts.feeds import FEED_LIMIT
+from posts.models import Group, Post
+
+User = get_user_model()
+
+ATOM = '{http://www.w3.org/2005/Atom}'
+
+
+class PostFeedsTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestFeed')
+        cls.group = Group.objects.create(
+            title='LucyTestGroup',
+            slug='Testovaya',
+            description='Эта группа создана для тестирования'
+        )
+        Post.objects.bulk_create(
+            Post(text=f'Тестовый текст поста_{i}', author=cls.user,
+                 group=cls.group if i % 2 else None)
+            for i in range(FEED_LIMIT + 5)
+        )
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def test_formats(self):
+        """Ленты всех источников отдаются в RSS, Atom и JSON Feed."""
+        sources = {
+            'index': ([], FEED_LIMIT),
+            'group': ([self.group.slug], (FEED_LIMIT + 5) // 2),
+            'profile': ([self.user.username], FEED_LIMIT),
+        }
+        for source, (args, count) in sources.items():
+            with self.subTest(source=source):
+                rss = self.guest_client.get(
+                    reverse(f'posts:{source}_rss', args=args)
+                )
+                self.assertEqual(
+                    len(ElementTree.fromstring(rss.content)
+                        .findall('channel/item')),
+                    count
+                )
+                atom = self.guest_client.get(
+                    reverse(f'posts:{source}_atom', args=args)
+                )
+                self.assertEqual(
+                    len(ElementTree.fromstring(atom.content)
+                        .findall(f'{ATOM}entry')),
+                    count
+                )
+                document = json.loads(self.guest_client.get(
+                    reverse(f'posts:{source}_json', args=args)
+                ).content)
+                self.assertEqual(len(document['items']), count)
+
+    def test_unknown_source(self):
+        """Несуществующая группа отдает 404."""
+        response = self.guest_client.get(
+            reverse('posts:group_rss', args=['missing'])
+        )
+        self.assertEqual(response.status_code, 404)
+
+    def test_conditional_get(self):
+        """Повторный опрос с ETag получает 304."""
+        url = reverse('posts:index_atom')
+        response = self.guest_client.get(url)
+        self.assertTrue(response.has_header('Last-Modified'))
+        response = self.guest_client.get(
+            url, HTTP_IF_NONE_MATCH=response['ETag']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_last_modified_matches_cache(self):
+        """Last-Modified один и тот же при промахе и попадании в кэш, а
+        If-Modified-Since с ним получает 304.
+        """
+        # Дата последнего поста раньше версий тегов кэша.
+        day_ago = timezone.now() - timedelta(days=1)
+        Post.objects.update(pub_date=day_ago, updated=day_ago)
+        url = reverse('posts:index_rss')
+        missed = self.guest_client.get(url)
+        with self.assertNumQueries(0):
+            cached = self.guest_client.get(url)
+        self.assertEqual(missed['Last-Modified'], cached['Last-Modified'])
+        response = self.guest_client.get(
+            url, HTTP_IF_MODIFIED_SINCE=missed['Last-Modified']
+        )
+        self.assertEqual(response.status_code, 304)
+
+    def test_cached_until_post_changes(self):
+        """Документ берется из кэша, пока в ленте не появится пост."""
+        url = reverse('posts:group_json', args=[self.group.slug])
+        self.guest_client.get(url)
+        # свежесть проверяется по версиям тегов в кэше, без базы
+        with self.assertNumQueries(0):
+            self.guest_client.get(url)
+        Post.objects.create(text='Свежий пост', author=self.user,
+                            group=self.group)
+        document = json.loads(self.guest_client.get(url).content)
+        self.assertEqual(document['items'][0]['content_text'], 'Свежий пост')
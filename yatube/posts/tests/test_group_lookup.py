@@ -0,0 +1,87 @@
+from django.contrib.auth import get_user_model
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.views import GROUP_LOOKUP_LIMIT
+
+User = get_user_model()
+
+
+class GroupPickerTest(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestPicker')
+        Group.objects.bulk_create(
+            Group(title=f'Котики {i:03d}', slug=f'kotiki-{i}',
+                  description='Группа для тестирования')
+            for i in range(GROUP_LOOKUP_LIMIT + 10)
+        )
+        cls.group = Group.objects.create(
+            title='Собаки', slug='sobaki', description='Про собак'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст', author=cls.user, group=cls.group
+        )
+
+    def setUp(self):
+        self.authorized_client = Client()
+        self.authorized_client.force_login(self.user)
+
+    def options(self, url):
+        response = self.authorized_client.get(url)
+        return response.content.decode().count('<option')
+
+    def test_form_renders_only_selected_group(self):
+        """Форма не выводит все группы: пустой вариант и выбранная."""
+        self.assertEqual(self.options(reverse('posts:post_create')), 1)
+        self.assertEqual(
+            self.options(reverse('posts:post_edit', args=[self.post.id])), 2
+        )
+
+    def test_group_still_validated(self):
+        """Любую существующую группу можно выбрать по id."""
+        group = Group.objects.get(slug='kotiki-5')
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            {'text': 'Новый пост', 'group': group.id}
+        )
+        self.assertEqual(response.status_code, 302)
+        self.assertTrue(Post.objects.filter(group=group).exists())
+        response = self.authorized_client.post(
+            reverse('posts:post_create'),
+            {'text': 'Новый пост', 'group': 10 ** 6}
+        )
+        self.assertFormError(response, 'form', 'group', [
+            'Выберите корректный вариант. Вашего варианта нет среди '
+            'допустимых значений.'
+        ])
+
+    def test_lookup_is_bounded_prefix_match(self):
+        """Подсказки - группы на введенное начало, не больше лимита."""
+        url = reverse('posts:group_lookup')
+        self.authorized_client.get(url)
+        # по диапазону на "кот" и на "Кот"
+        with self.assertNumQueries(2):
+            results = self.authorized_client.get(
+                url, {'q': 'кот'}
+            ).json()['results']
+        self.assertEqual(len(results), GROUP_LOOKUP_LIMIT)
+        self.assertTrue(all(
+            group['title'].startswith('Котики') for group in results
+        ))
+        self.assertEqual(
+            [group['slug'] for group in self.authorized_client.get(
+                url, {'q': 'Соб'}
+            ).json()['results']],
+            ['sobaki']
+        )
+        self.assertEqual(
+            self.authorized_client.get(url).json()['results'], []
+        )
+
+    def test_lookup_requires_login(self):
+        """Анонимного пользователя отправляем на вход."""
+        response = Client().get(reverse('posts:group_lookup'), {'q': 'К'})
+        self.assertEqual(response.status_code, 302)
@@ -1,8 +1,11 @@
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.core.paginator import Paginator
 from django.test import Client, TestCase
 from django.urls import reverse
 
 from posts.models import Group, Post, User
+from posts.paginators import ELLIPSIS, elided_page_range
 
 User = get_user_model()
 
@@ -35,6 +38,7 @@ class PaginatorViewsTest(TestCase):
     def setUp(cls):
         """Здесь создаются фикстуры: клиент и 15 тестовых записей."""
         cls.authorized_client = Client()
+        cache.clear()
 
     def test_first_page_contains_ten_records(self):
         """Проверка: количество постов на первой странице равно 10."""
@@ -47,3 +51,56 @@ class PaginatorViewsTest(TestCase):
             f"{reverse(self.index)}?page={self.page_num}"
         )
         self.assertEqual(len(response.context['page_obj']), self.limit_2_page)
+
+    def test_cursor_pages_walk_forward_and_back(self):
+        """Проверка: keyset-режим отдает 10 + 5 постов и ведет назад."""
+        response = self.client.get(f"{reverse(self.index)}?cursor=")
+        first_page = response.context['page_obj']
+        self.assertEqual(len(first_page), self.limit_1_page)
+        self.assertFalse(first_page.has_previous())
+        response = self.client.get(
+            f"{reverse(self.index)}?cursor={first_page.next_cursor}"
+        )
+        second_page = response.context['page_obj']
+        self.assertEqual(len(second_page), self.limit_2_page)
+        self.assertFalse(second_page.has_next())
+        self.assertFalse(
+            set(first_page.object_list) & set(second_page.object_list)
+        )
+        response = self.client.get(
+            f"{reverse(self.index)}?cursor={second_page.previous_cursor}"
+        )
+        self.assertEqual(
+            response.context['page_obj'].object_list,
+            first_page.object_list
+        )
+
+    def test_broken_cursor_returns_first_page(self):
+        """Проверка: битый курсор отдает первую страницу."""
+        response = self.client.get(f"{reverse(self.index)}?cursor=%%%")
+        self.assertEqual(len(response.context['page_obj']), self.limit_1_page)
+
+    def test_page_range_is_elided(self):
+        """Проверка: номера страниц - окно вокруг текущей и края."""
+        paginator = Paginator(range(50000 * self.limit_1_page),
+                              self.limit_1_page)
+        self.assertEqual(
+            list(elided_page_range(paginator.page(25000))),
+            [1, 2, ELLIPSIS, 24997, 24998, 24999, 25000, 25001, 25002,
+             25003, ELLIPSIS, 49999, 50000]
+        )
+        self.assertEqual(
+            list(elided_page_range(paginator.page(1))),
+            [1, 2, 3, 4, ELLIPSIS, 49999, 50000]
+        )
+        self.assertEqual(
+            list(elided_page_range(Paginator(range(30), 10).page(2))),
+            [1, 2, 3]
+        )
+
+    def test_paginator_context_has_elided_range(self):
+        """Проверка: paginator() отдает окно номеров в page_obj."""
+        response = self.client.get(reverse(self.index))
+        self.assertEqual(
+            response.context['page_obj'].elided_page_range, [1, 2]
+        )
@@ -0,0 +1,77 @@
+from django.contrib.auth import get_user_model
+from django.core.cache import cache
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Group, Post
+from posts.views import POST_LIMIT
+
+User = get_user_model()
+
+
+class PostQueriesTest(TestCase):
+    """Число запросов к БД не зависит от размера страницы"""
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestQueries')
+        cls.group = Group.objects.create(
+            title='LucyTestGroupQueries',
+            slug='TestovayaGroupQueries',
+            description='Эта группа создана для тестирования запросов'
+        )
+        cls.post = Post.objects.create(
+            text='Тестовый текст поста',
+            group=cls.group,
+            author=cls.user
+        )
+        # (обычный режим, keyset-режим ?cursor= без COUNT(*));
+        # группа и профиль берут число постов из счетчиков, ETag и
+        # Last-Modified строятся по версиям тегов в кэше
+        cls.feeds = {
+            reverse('posts:index'): (2, 1),
+            reverse('posts:grouppa', args=[cls.group.slug]): (2, 2),
+            reverse('posts:profile', args=[cls.user.username]): (2, 2),
+        }
+        cls.detail = reverse('posts:post_detail', args=[cls.post.id])
+
+    def setUp(self):
+        cache.clear()
+        self.guest_client = Client()
+
+    def check_queries(self):
+        for url, (queries, cursor_queries) in self.feeds.items():
+            with self.subTest(url=url):
+                with self.assertNumQueries(queries):
+                    self.guest_client.get(url)
+                with self.assertNumQueries(cursor_queries):
+                    self.guest_client.get(f'{url}?cursor=')
+        with self.assertNumQueries(2):
+            self.guest_client.get(self.detail)
+
+    def test_one_post_on_page(self):
+        """Страница с одним постом."""
+        self.check_queries()
+
+    def test_full_page(self):
+        """Полная страница постов из разных групп."""
+        groups = [
+            Group.objects.create(title=f'group {i}', slug=f'group-{i}')
+            for i in range(POST_LIMIT)
+        ]
+        for group in groups:
+            Post.objects.create(text='Текст', group=group, author=self.user)
+        Post.objects.bulk_create(
+            Post(text='Текст', group=self.group, author=self.user)
+            for _ in range(POST_LIMIT)
+        )
+        self.check_queries()
+
+    def test_edit_page(self):
+        """Форма редактирования читает пост без лишних связей."""
+        client = Client()
+        client.force_login(self.user)
+        client.get(reverse('posts:post_edit', args=[self.post.id]))
+        # сессия и пользователь уже в кэше: пост, список групп формы
+        with self.assertNumQueries(2):
+            client.get(reverse('posts:post_edit', args=[self.post.id]))
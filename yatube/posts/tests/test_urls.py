@@ -1,5 +1,6 @@
 from http import HTTPStatus
 from django.contrib.auth import get_user_model
+from django.core.cache import cache
 from django.test import Client, TestCase
 from django.urls import reverse
 
@@ -70,6 +71,7 @@ class PostURLTests(TestCase):
 
     def setUp(cls):
         """Создаем неавторизованный клиент, создаем пользователей"""
+        cache.clear()
         cls.guest_client = Client()
         cls.authorized_client = Client()
         cls.authorized_client.force_login(cls.user)
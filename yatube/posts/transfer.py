@@ -0,0 +1,115 @@
+import csv
+import json
+from itertools import chain
+
+from django.db import transaction
+from django.db.models import Max
+
+from .models import ArchivedPost, Group, Post
+
+FORMATS = ('jsonl', 'csv')
+FIELDS = {
+    'post': ('text', 'pub_date', 'author', 'group'),
+    'group': ('title', 'slug', 'description'),
+}
+
+
+def guess_format(path, fmt=None):
+    if fmt:
+        return fmt
+    return 'csv' if str(path).endswith('.csv') else 'jsonl'
+
+
+def export_rows(model, batch_size):
+    """Строки модели потоком, по batch_size за запрос.
+
+    Посты выгружаются из архива и из горячей таблицы в одном формате:
+    загрузка вернет старые посты в архив (см. import_posts).
+    """
+    if model == 'group':
+        rows = Group.objects.order_by('id').values_list(
+            *FIELDS['group']
+        ).iterator(chunk_size=batch_size)
+    else:
+        rows = chain.from_iterable(
+            queryset.order_by('id').values_list(
+                'text', 'pub_date', 'author__username', 'group__slug'
+            ).iterator(chunk_size=batch_size)
+            for queryset in (ArchivedPost.objects, Post.objects)
+        )
+    for row in rows:
+        row = dict(zip(FIELDS[model], row))
+        if 'pub_date' in row:
+            # DjangoJSONEncoder отрезает микросекунды
+            row['pub_date'] = row['pub_date'].isoformat()
+        yield row
+
+
+def write_rows(stream, rows, fmt, model):
+    count = 0
+    if fmt == 'csv':
+        writer = csv.DictWriter(stream, fieldnames=FIELDS[model])
+        writer.writeheader()
+        for row in rows:
+            writer.writerow(row)
+            count += 1
+        return count
+    encoder = json.JSONEncoder(ensure_ascii=False)
+    for row in rows:
+        stream.write(encoder.encode(row))
+        stream.write('\n')
+        count += 1
+    return count
+
+
+def read_rows(stream, fmt):
+    """Строки файла по одной, без загрузки файла в память.
+
+    Неразобранная строка JSON Lines отдается как None: ее пропускает
+    загрузка, а не прерывает.
+    """
+    if fmt == 'csv':
+        for row in csv.DictReader(stream):
+            yield {key: value or None for key, value in row.items()}
+        return
+    for line in stream:
+        line = line.strip()
+        if line:
+            try:
+                yield json.loads(line)
+            except ValueError:
+                yield None
+
+
+def batched(rows, batch_size):
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) == batch_size:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+@transaction.atomic
+def bulk_create_posts(posts, batch_size=None):
+    """bulk_create постов с их собственным pub_date, созданные посты с id.
+
+    auto_now_add подставляет в pub_date текущее время, поэтому даты
+    возвращаются одним UPDATE сразу после вставки: поле модели не
+    меняется, и это безопасно для соседних потоков. SQLite не
+    возвращает id из bulk_create, а запись в базу идет одним
+    писателем: новые посты - это id больше последнего до вставки.
+    """
+    posts = list(posts)
+    if not posts:
+        return posts
+    pub_dates = [post.pub_date for post in posts]
+    last_id = Post.objects.aggregate(last=Max('id'))['last'] or 0
+    Post.objects.bulk_create(posts, batch_size=batch_size)
+    posts = list(Post.objects.filter(id__gt=last_id).order_by('id'))
+    for post, pub_date in zip(posts, pub_dates):
+        post.pub_date = pub_date
+    Post.objects.bulk_update(posts, ['pub_date'], batch_size=batch_size)
+    return posts
@@ -1,6 +1,7 @@
 from django.urls import path
+from django.utils.feedgenerator import Atom1Feed, Rss201rev2Feed
 
-from . import views
+from . import feeds, views
 
 app_name = 'posts'
 
@@ -11,4 +12,38 @@ urlpatterns = [
     path('posts/<int:post_id>/', views.post_detail, name='post_detail'),
     path('create/', views.post_create, name='post_create'),
     path('posts/<int:post_id>/edit/', views.post_edit, name='post_edit'),
+    path('group-lookup/', views.group_lookup, name='group_lookup'),
+    path('feed/rss/', feeds.PostsFeed(Rss201rev2Feed), name='index_rss'),
+    path('feed/atom/', feeds.PostsFeed(Atom1Feed), name='index_atom'),
+    path('feed/json/', feeds.PostsFeed(feeds.JSONFeed), name='index_json'),
+    path(
+        'group/<slug:slug>/feed/rss/',
+        feeds.GroupFeed(Rss201rev2Feed),
+        name='group_rss'
+    ),
+    path(
+        'group/<slug:slug>/feed/atom/',
+        feeds.GroupFeed(Atom1Feed),
+        name='group_atom'
+    ),
+    path(
+        'group/<slug:slug>/feed/json/',
+        feeds.GroupFeed(feeds.JSONFeed),
+        name='group_json'
+    ),
+    path(
+        'profile/<str:username>/feed/rss/',
+        feeds.AuthorFeed(Rss201rev2Feed),
+        name='profile_rss'
+    ),
+    path(
+        'profile/<str:username>/feed/atom/',
+        feeds.AuthorFeed(Atom1Feed),
+        name='profile_atom'
+    ),
+    path(
+        'profile/<str:username>/feed/json/',
+        feeds.AuthorFeed(feeds.JSONFeed),
+        name='profile_json'
+    ),
 ]
@@ -1,37 +1,65 @@
 from django.contrib.auth.decorators import login_required
 from django.core.paginator import Paginator
+from django.http import JsonResponse
 from django.shortcuts import get_object_or_404, redirect, render
 
+from core.db_router import read_from_replica
+from core.ratelimit import ratelimit
+
+from .archive import edit_archived_post
+from .cache import (cache_anonymous_page, group_page_tags, index_page_tags,
+                    profile_page_tags)
 from .forms import PostForm
-from .models import Group, Post, User
+from .freshness import (conditional_page, group_freshness, index_freshness,
+                        post_detail_freshness, profile_freshness)
+from .models import (ArchivedPost, Group, Post, User, author_archived_count,
+                     author_posts_count)
+from .paginators import CursorPaginator, FeedWithArchive, elided_page_range
 
 POST_LIMIT = 10
+GROUP_LOOKUP_LIMIT = 20
+
 
+def paginator(request, posts_category, count=None):
+    """"Добавляем пагинацию, ?cursor= включает keyset-режим.
 
-def paginator(request, posts_category):
-    """"Добавляем пагинацию"""
+    count - заранее известное число постов, чтобы не считать их COUNT(*).
+    В page_obj.elided_page_range - окно номеров страниц для шаблона.
+    """
+    if 'cursor' in request.GET:
+        return CursorPaginator(posts_category, POST_LIMIT).get_page(
+            request.GET.get('cursor')
+        )
     paginator = Paginator(posts_category, POST_LIMIT)
-    page_number = request.GET.get('page')
-    return paginator.get_page(page_number)
+    if count is not None:
+        paginator.count = count
+    page = paginator.get_page(request.GET.get('page'))
+    page.elided_page_range = list(elided_page_range(page))
+    return page
 
 
+@read_from_replica
+@conditional_page(index_freshness)
+@cache_anonymous_page(index_page_tags)
 def index(request):
     """Выводим список последних постов"""
-    post_list_author = Post.objects.select_related('author').all()
-    page_obj = paginator(request, post_list_author)
+    post_list = Post.objects.for_feed()
+    page_obj = paginator(request, post_list)
     context = {
         'page_obj': page_obj
     }
     return render(request, 'posts/index.html', context)
 
 
+@read_from_replica
+@conditional_page(group_freshness)
+@cache_anonymous_page(group_page_tags)
 def group_posts(request, slug):
     """Выводим содержание постов в конкретной группе"""
     group_list = Group.objects.all()
-    post_list_group = Post.objects.select_related('group').all()
     group = get_object_or_404(group_list, slug=slug)
-    posts = post_list_group.filter(group=group)
-    page_obj = paginator(request, posts)
+    posts = group.posts.for_feed()
+    page_obj = paginator(request, posts, group.posts_count)
     context = {
         'group': group,
         'posts': posts,
@@ -40,14 +68,24 @@ def group_posts(request, slug):
     return render(request, 'posts/group_list.html', context)
 
 
+@read_from_replica
+@conditional_page(profile_freshness)
+@cache_anonymous_page(profile_page_tags)
 def profile(request, username):
     """Выводим посты конкретного пользователя"""
     is_profile = True
-    user_list = User.objects.all()
+    user_list = User.objects.select_related('post_counter')
     author = get_object_or_404(user_list, username=username)
-    author_posts = Post.objects.select_related('author').filter(author=author)
-    count_posts = author_posts.count()
-    page_obj = paginator(request, author_posts)
+    count_posts = author_posts_count(author)
+    author_posts = author.posts.for_feed()
+    archived_count = author_archived_count(author)
+    if archived_count:
+        # Глубокие страницы дочитываются из архива.
+        author_posts = FeedWithArchive(
+            author_posts, author.archived_posts.for_feed(),
+            count_posts - archived_count
+        )
+    page_obj = paginator(request, author_posts, count_posts)
     context = {
         'author': author,
         'page_obj': page_obj,
@@ -57,13 +95,15 @@ def profile(request, username):
     return render(request, 'posts/profile.html', context)
 
 
+@read_from_replica
+@conditional_page(post_detail_freshness)
 def post_detail(request, post_id):
     """Выводим конкретный пост пользователя"""
-    post_list_group = Post.objects.select_related('group').all()
-    post_selected = get_object_or_404(post_list_group, id=post_id)
-    author = post_selected.author
-    author_posts = author.posts.all()
-    count_author_posts = author_posts.count()
+    post_selected = (
+        Post.objects.for_detail().filter(id=post_id).first()
+        or get_object_or_404(ArchivedPost.objects.for_detail(), id=post_id)
+    )
+    count_author_posts = author_posts_count(post_selected.author)
     context = {
         'post_selected': post_selected,
         'count_posts': count_author_posts
@@ -72,6 +112,7 @@ def post_detail(request, post_id):
 
 
 @login_required
+@ratelimit('post_create', by=('user',))
 def post_create(request):
     """Форма для публикации поста"""
     form = PostForm(request.POST or None)
@@ -87,15 +128,21 @@ def post_create(request):
 def post_edit(request, post_id):
     """Форма редактирования поста"""
     is_edit = True
-    post_list_author = Post.objects.select_related('author').all()
-    post_selected = get_object_or_404(post_list_author, id=post_id)
-    if post_selected.author != request.user:
+    archived = None
+    post_selected = Post.objects.filter(id=post_id).first()
+    if post_selected is None:
+        archived = get_object_or_404(ArchivedPost.objects.all(), id=post_id)
+        post_selected = archived.as_post()
+    if post_selected.author_id != request.user.id:
         return redirect('posts:post_detail', post_id)
     form = PostForm(request.POST or None, instance=post_selected)
     if request.method == 'POST' and form.is_valid():
         post = form.save(commit=False)
         post.author = request.user
-        form.save()
+        if archived is not None:
+            edit_archived_post(archived, post)
+        else:
+            form.save()
         return redirect('posts:post_detail', post.id)
     context = {
         'is_edit': is_edit,
@@ -103,3 +150,24 @@ def post_edit(request, post_id):
         'post_selected': post_selected
     }
     return render(request, 'posts/create_post.html', context)
+
+
+@login_required
+@read_from_replica
+def group_lookup(request):
+    """Группы по началу названия для виджета выбора группы в форме"""
+    query = request.GET.get('q', '').strip()[:200]
+    groups = {}
+    # Диапазон по индексу чувствителен к регистру: "кот" ищем и как "Кот".
+    for prefix in dict.fromkeys((query, query[:1].upper() + query[1:])):
+        if prefix:
+            groups.update(
+                (group.pk, group) for group in Group.objects.title_prefix(
+                    prefix
+                ).only('id', 'slug', 'title')[:GROUP_LOOKUP_LIMIT]
+            )
+    groups = sorted(groups.values(), key=lambda group: group.title)
+    return JsonResponse({'results': [
+        {'id': group.pk, 'slug': group.slug, 'title': group.title}
+        for group in groups[:GROUP_LOOKUP_LIMIT]
+    ]}, json_dumps_params={'ensure_ascii': False})
@@ -0,0 +1,34 @@
+from django import forms
+from django.urls import reverse_lazy
+
+
+class GroupAutocomplete(forms.Select):
+    """Выбор группы с подсказками из posts:group_lookup.
+
+    В HTML попадает только выбранная группа (один запрос по id) и пустой
+    вариант, остальные варианты подгружает js/group_autocomplete.js.
+    Поле остается ModelChoiceField: проверка - один get() по первичному
+    ключу.
+    """
+    lookup_url = reverse_lazy('posts:group_lookup')
+
+    class Media:
+        js = ('js/group_autocomplete.js',)
+
+    def get_context(self, name, value, attrs):
+        context = super().get_context(name, value, attrs)
+        context['widget']['attrs']['data-lookup-url'] = str(self.lookup_url)
+        return context
+
+    def optgroups(self, name, value, attrs=None):
+        selected = [pk for pk in value if str(pk).isdigit()]
+        options = [self.create_option(
+            name, '', self.choices.field.empty_label, not selected, 0
+        )]
+        if selected:
+            queryset = self.choices.queryset.filter(pk__in=selected)
+            for index, group in enumerate(queryset, start=1):
+                options.append(self.create_option(
+                    name, str(group.pk), str(group), True, index
+                ))
+        return [(None, options, 0)]
@@ -0,0 +1,169 @@
+import re
+from functools import lru_cache
+
+from django.conf import settings
+from django.db import connection
+from django.utils.module_loading import import_string
+
+from posts.models import ArchivedPost, Post
+
+FTS_TABLE = 'search_post_fts'
+INDEX_BATCH_SIZE = 1000
+
+
+@lru_cache(maxsize=None)
+def get_backend():
+    """Бэкенд поиска из settings.SEARCH_BACKEND"""
+    return import_string(settings.SEARCH_BACKEND)()
+
+
+class PostResults:
+    """Ленивая выдача для Paginator: COUNT и срезы уходят в бэкенд,
+    посты загружаются только для текущей страницы в порядке ранга.
+    """
+
+    def __init__(self, count, fetch_ids):
+        self._count = count
+        self._fetch_ids = fetch_ids
+
+    def count(self):
+        return self._count()
+
+    def __len__(self):
+        return self.count()
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return self[key:key + 1][0]
+        ids = self._fetch_ids(key.start or 0, key.stop)
+        posts = Post.objects.for_feed().in_bulk(ids)
+        archived = [pk for pk in ids if pk not in posts]
+        if archived:
+            # Индекс хранит и архивные посты, id у них прежние.
+            posts.update(ArchivedPost.objects.for_feed().in_bulk(archived))
+        return [posts[pk] for pk in ids if pk in posts]
+
+
+class BaseSearchBackend:
+    """Интерфейс поискового бэкенда"""
+
+    def index_posts(self, posts):
+        raise NotImplementedError
+
+    def remove_posts(self, post_ids):
+        raise NotImplementedError
+
+    def rebuild(self):
+        """Переиндексируем все посты, возвращаем их число"""
+        raise NotImplementedError
+
+    def search(self, query):
+        """PostResults, упорядоченные по релевантности"""
+        raise NotImplementedError
+
+
+class DatabaseSearchBackend(BaseSearchBackend):
+    """LIKE-поиск по Post.text без индекса, для любых СУБД.
+
+    Ищет только в горячей таблице, архив не просматривается.
+    """
+
+    def index_posts(self, posts):
+        pass
+
+    def remove_posts(self, post_ids):
+        pass
+
+    def rebuild(self):
+        return Post.objects.count()
+
+    def search(self, query):
+        posts = Post.objects.filter(text__icontains=query).values_list(
+            'id', flat=True
+        )
+        return PostResults(
+            posts.count, lambda start, stop: list(posts[start:stop])
+        )
+
+
+class SqliteFTS5Backend(BaseSearchBackend):
+    """Инвертированный индекс SQLite FTS5, ранжирование bm25"""
+
+    @staticmethod
+    def build_match(query):
+        """Каждое слово - фраза в кавычках, последнее ищется по префиксу"""
+        words = re.findall(r'\w+', query)
+        if not words:
+            return None
+        phrases = ['"{}"'.format(word) for word in words]
+        phrases[-1] += '*'
+        return ' '.join(phrases)
+
+    def index_posts(self, posts):
+        rows = [(post.pk, post.text) for post in posts]
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(pk,) for pk, _ in rows]
+            )
+            cursor.executemany(
+                f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (%s, %s)', rows
+            )
+
+    def remove_posts(self, post_ids):
+        with connection.cursor() as cursor:
+            cursor.executemany(
+                f'DELETE FROM {FTS_TABLE} WHERE rowid = %s',
+                [(pk,) for pk in post_ids]
+            )
+
+    def rebuild(self):
+        total = 0
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+            for model in (Post, ArchivedPost):
+                batch = []
+                posts = model.objects.order_by().values_list('id', 'text')
+                for row in posts.iterator(chunk_size=INDEX_BATCH_SIZE):
+                    batch.append(row)
+                    if len(batch) == INDEX_BATCH_SIZE:
+                        total += self._insert(cursor, batch)
+                        batch = []
+                total += self._insert(cursor, batch)
+            cursor.execute(
+                f"INSERT INTO {FTS_TABLE}({FTS_TABLE}) VALUES ('optimize')"
+            )
+        return total
+
+    @staticmethod
+    def _insert(cursor, rows):
+        cursor.executemany(
+            f'INSERT INTO {FTS_TABLE}(rowid, text) VALUES (%s, %s)', rows
+        )
+        return len(rows)
+
+    def search(self, query):
+        match = self.build_match(query)
+        if match is None:
+            return PostResults(lambda: 0, lambda start, stop: [])
+
+        def count():
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT count(*) FROM {FTS_TABLE} '
+                    f'WHERE {FTS_TABLE} MATCH %s', [match]
+                )
+                return cursor.fetchone()[0]
+
+        def fetch_ids(start, stop):
+            limit = -1 if stop is None else stop - start
+            with connection.cursor() as cursor:
+                cursor.execute(
+                    f'SELECT rowid FROM {FTS_TABLE} '
+                    f'WHERE {FTS_TABLE} MATCH %s '
+                    f'ORDER BY rank LIMIT %s OFFSET %s',
+                    [match, limit, start]
+                )
+                return [row[0] for row in cursor.fetchall()]
+
+        return PostResults(count, fetch_ids)
@@ -0,0 +1,13 @@
+from django.core.management.base import BaseCommand
+
+from search.backends import get_backend
+
+
+class Command(BaseCommand):
+    help = 'Заново строит поисковый индекс по всем постам.'
+
+    def handle(self, *args, **options):
+        total = get_backend().rebuild()
+        self.stdout.write(self.style.SUCCESS(
+            f'Проиндексировано постов: {total}'
+        ))
@@ -0,0 +1,24 @@
+from django.db.models.signals import post_delete, post_save
+from django.dispatch import receiver
+
+from posts.models import ArchivedPost, Post
+from posts.signals import posts_bulk_created
+
+from .backends import get_backend
+
+
+@receiver(post_save, sender=Post)
+@receiver(post_save, sender=ArchivedPost)
+def index_saved_post(sender, instance, **kwargs):
+    get_backend().index_posts([instance])
+
+
+@receiver(posts_bulk_created, sender=Post)
+def index_bulk_created_posts(sender, posts, **kwargs):
+    get_backend().index_posts(posts)
+
+
+@receiver(post_delete, sender=Post)
+@receiver(post_delete, sender=ArchivedPost)
+def remove_deleted_post(sender, instance, **kwargs):
+    get_backend().remove_posts([instance.pk])
@@ -0,0 +1,74 @@
+from io import StringIO
+
+from django.contrib.auth import get_user_model
+from django.core.management import call_command
+from django.db import connection
+from django.test import Client, TestCase
+from django.urls import reverse
+
+from posts.models import Post
+
+from .backends import FTS_TABLE
+
+User = get_user_model()
+
+
+class SearchTests(TestCase):
+    @classmethod
+    def setUpClass(cls):
+        super().setUpClass()
+        cls.user = User.objects.create_user(username='LucyTestSearch')
+        cls.post_cats = Post.objects.create(
+            text='Коты спят весь день, коты любят спать', author=cls.user
+        )
+        cls.post_dogs = Post.objects.create(
+            text='Собаки гуляют, а коты спят', author=cls.user
+        )
+        Post.objects.create(text='Про погоду', author=cls.user)
+
+    def setUp(self):
+        self.guest_client = Client()
+
+    def search(self, query, **params):
+        response = self.guest_client.get(
+            reverse('search:results'), {'q': query, **params}
+        )
+        return list(response.context['page_obj'] or [])
+
+    def test_ranked_results(self):
+        """Пост с большим числом совпадений выше в выдаче."""
+        self.assertEqual(self.search('коты'), [self.post_cats, self.post_dogs])
+
+    def test_prefix_and_empty_query(self):
+        """Последнее слово ищется по префиксу, пустой запрос пуст."""
+        self.assertEqual(self.search('соба'), [self.post_dogs])
+        self.assertEqual(self.search('"*'), [])
+
+    def test_index_follows_post_changes(self):
+        """Индекс обновляется при правке и удалении поста."""
+        post = Post.objects.get(id=self.post_dogs.id)
+        post.text = 'Только собаки'
+        post.save()
+        self.assertEqual(self.search('коты'), [self.post_cats])
+        post.delete()
+        self.assertEqual(self.search('собаки'), [])
+
+    def test_rebuild_command(self):
+        """Команда rebuild_search_index восстанавливает индекс."""
+        with connection.cursor() as cursor:
+            cursor.execute(f'DELETE FROM {FTS_TABLE}')
+        self.assertEqual(self.search('погоду'), [])
+        call_command('rebuild_search_index', stdout=StringIO())
+        self.assertEqual(len(self.search('погоду')), 1)
+
+    def test_pagination_keeps_query(self):
+        """Ссылки пагинатора сохраняют поисковый запрос."""
+        Post.objects.bulk_create(
+            Post(text=f'Кот номер {i}', author=self.user) for i in range(12)
+        )
+        call_command('rebuild_search_index', stdout=StringIO())
+        response = self.guest_client.get(
+            reverse('search:results'), {'q': 'кот'}
+        )
+        self.assertContains(response, '?q=%D0%BA%D0%BE%D1%82&amp;page=2')
+        self.assertEqual(len(self.search('кот', page=2)), 4)
@@ -0,0 +1,26 @@
+from django.core.paginator import Paginator
+from django.shortcuts import render
+from django.utils.http import urlencode
+
+from posts.paginators import elided_page_range
+from posts.views import POST_LIMIT
+
+from .backends import get_backend
+
+
+def search(request):
+    """Выводим найденные посты, самые релевантные первыми"""
+    query = request.GET.get('q', '').strip()
+    page_obj = None
+    if query:
+        results = get_backend().search(query)
+        page_obj = Paginator(results, POST_LIMIT).get_page(
+            request.GET.get('page')
+        )
+        page_obj.elided_page_range = list(elided_page_range(page_obj))
+    context = {
+        'query': query,
+        'page_obj': page_obj,
+        'page_query': urlencode({'q': query}) + '&',
+    }
+    return render(request, 'search/results.html', context)
@@ -0,0 +1,40 @@
+// Подсказки для поля группы: вместо всех групп в <select> только
+// найденные по началу названия (posts:group_lookup).
+document.querySelectorAll('select[data-lookup-url]').forEach(function (select) {
+  var input = document.createElement('input');
+  var timer = null;
+  input.type = 'search';
+  input.className = 'form-control mb-2';
+  input.placeholder = 'Начните вводить название группы';
+  input.setAttribute('aria-controls', select.id);
+  select.parentNode.insertBefore(input, select);
+
+  function render(groups) {
+    var empty = select.options[0];
+    var current = select.value;
+    select.innerHTML = '';
+    select.appendChild(empty);
+    groups.forEach(function (group) {
+      var option = new Option(group.title, group.id);
+      option.selected = String(group.id) === current;
+      select.appendChild(option);
+    });
+    if (!select.value && groups.length) {
+      select.value = groups[0].id;
+    }
+  }
+
+  input.addEventListener('input', function () {
+    clearTimeout(timer);
+    var query = input.value.trim();
+    if (!query) {
+      return;
+    }
+    timer = setTimeout(function () {
+      var url = select.dataset.lookupUrl + '?q=' + encodeURIComponent(query);
+      fetch(url, {credentials: 'same-origin'})
+        .then(function (response) { return response.json(); })
+        .then(function (data) { render(data.results); });
+    }, 200);
+  });
+});
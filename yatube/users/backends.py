@@ -0,0 +1,30 @@
+from django.conf import settings
+from django.contrib.auth.backends import ModelBackend
+from django.core.cache import caches
+
+USER_KEY = 'users.user:{}'
+
+
+def user_cache():
+    return caches[settings.SESSION_CACHE_ALIAS]
+
+
+def forget_user(user_id):
+    user_cache().delete(USER_KEY.format(user_id))
+
+
+class CachedModelBackend(ModelBackend):
+    """ModelBackend, который берет пользователя сессии из кэша сессий.
+
+    Копия удаляется при любом сохранении пользователя (users.signals),
+    кэш общий для воркеров: смена пароля и блокировка видны сразу.
+    """
+
+    def get_user(self, user_id):
+        key = USER_KEY.format(user_id)
+        user = user_cache().get(key)
+        if user is None:
+            user = super().get_user(user_id)
+            if user is not None:
+                user_cache().set(key, user)
+        return user
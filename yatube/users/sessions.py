@@ -0,0 +1,35 @@
+from django.contrib.sessions.backends import cached_db
+
+
+class SessionStore(cached_db.SessionStore):
+    """cached_db-сессии в общем для воркеров кэше SESSION_CACHE_ALIAS.
+
+    Запись живет не дольше TIMEOUT кэша и срока самой сессии; выход
+    удаляет ее из кэша сразу для всех процессов.
+    """
+
+    def cache_timeout(self, expiry=None):
+        return min(
+            self.get_expiry_age(expiry=expiry), self._cache.default_timeout
+        )
+
+    def load(self):
+        try:
+            data = self._cache.get(self.cache_key)
+        except Exception:
+            data = None
+        if data is None:
+            session = self._get_session_from_db()
+            if session:
+                data = self.decode(session.session_data)
+                self._cache.set(
+                    self.cache_key, data,
+                    self.cache_timeout(expiry=session.expire_date)
+                )
+            else:
+                data = {}
+        return data
+
+    def save(self, must_create=False):
+        super(cached_db.SessionStore, self).save(must_create)
+        self._cache.set(self.cache_key, self._session, self.cache_timeout())
@@ -1,3 +1,125 @@
-# from django.test import TestCase
+import os
+import subprocess
+import sys
 
-# Create your tests here.
+from django.conf import settings
+from django.contrib.auth import get_user_model
+from django.core.cache import caches
+from django.db import connection
+from django.test import Client, TestCase
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+
+from users.backends import USER_KEY
+
+User = get_user_model()
+
+# Другой воркер: отдельный процесс с теми же настройками.
+OTHER_WORKER = '''
+import sys
+import django
+django.setup()
+from django.core.cache import caches
+from django.conf import settings
+cache = caches[settings.SESSION_CACHE_ALIAS]
+print(sorted(key for key in sys.argv[1:] if cache.get(key) is not None))
+'''
+
+
+class CachedSessionTest(TestCase):
+    def setUp(self):
+        caches[settings.SESSION_CACHE_ALIAS].clear()
+        self.user = User.objects.create_user(
+            username='LucyTestSession', password='Old-pass-123'
+        )
+        self.client = Client()
+        self.client.force_login(self.user)
+
+    def queried_tables(self, url):
+        with CaptureQueriesContext(connection) as queries:
+            response = self.client.get(url)
+        sql = ' '.join(query['sql'] for query in queries)
+        return response, {
+            table for table in ('django_session', 'auth_user')
+            if f'"{table}"' in sql
+        }
+
+    def test_session_and_user_from_cache(self):
+        """Повторный запрос не читает сессию и пользователя из БД."""
+        url = reverse('posts:post_create')
+        self.client.get(url)
+        response, tables = self.queried_tables(url)
+        self.assertEqual(response.status_code, 200)
+        self.assertEqual(tables, set())
+        self.assertEqual(response.context['user'], self.user)
+
+    def test_logout_drops_session(self):
+        """После выхода старая кука сессии не авторизует."""
+        cookie = self.client.cookies[settings.SESSION_COOKIE_NAME].value
+        self.client.get(reverse('users:logout'))
+        stale_client = Client()
+        stale_client.cookies[settings.SESSION_COOKIE_NAME] = cookie
+        response = stale_client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_password_change_logs_out_other_sessions(self):
+        """Смена пароля оставляет вход только в текущей сессии."""
+        other_client = Client()
+        other_client.force_login(self.user)
+        other_client.get(reverse('posts:post_create'))
+        self.client.post(reverse('users:password_change_form'), {
+            'old_password': 'Old-pass-123',
+            'new_password1': 'New-pass-456',
+            'new_password2': 'New-pass-456',
+        })
+        response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 200)
+        response = other_client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 302)
+
+    def test_user_edit_is_visible(self):
+        """Правка пользователя сбрасывает его копию в кэше."""
+        self.client.get(reverse('posts:post_create'))
+        User.objects.filter(pk=self.user.pk).update(username='stale')
+        response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.context['user'].username, 'LucyTestSession')
+        self.user.username = 'LucyRenamed'
+        self.user.save()
+        response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.context['user'].username, 'LucyRenamed')
+        self.user.is_active = False
+        self.user.save()
+        response = self.client.get(reverse('posts:post_create'))
+        self.assertEqual(response.status_code, 302)
+
+    def cached_in_other_worker(self, *keys):
+        output = subprocess.run(
+            [sys.executable, '-c', OTHER_WORKER, *keys],
+            cwd=settings.BASE_DIR, check=True, capture_output=True,
+            text=True,
+            env={
+                **os.environ,
+                'DJANGO_SETTINGS_MODULE': 'yatube.settings',
+                # Тот же временный каталог, что у тестов (core.testing).
+                'SESSIONS_CACHE_DIR': settings.CACHES[
+                    settings.SESSION_CACHE_ALIAS
+                ]['LOCATION'],
+            }
+        ).stdout
+        return [key for key in keys if f"'{key}'" in output]
+
+    def test_other_workers_see_logout_and_edit(self):
+        """Выход и правка пользователя видны в других процессах."""
+        self.client.get(reverse('posts:post_create'))
+        session_key = self.client.session.cache_key
+        user_key = USER_KEY.format(self.user.pk)
+        self.assertEqual(
+            self.cached_in_other_worker(session_key, user_key),
+            [session_key, user_key]
+        )
+        self.user.is_active = False
+        self.user.save()
+        self.client.get(reverse('users:logout'))
+        self.assertEqual(
+            self.cached_in_other_worker(session_key, user_key), []
+        )
@@ -5,6 +5,8 @@ from django.contrib.auth.views import PasswordResetCompleteView
 
 from django.urls import path
 
+from core.ratelimit import ratelimit
+
 from . import views
 
 app_name = 'users'
@@ -12,7 +14,7 @@ app_name = 'users'
 urlpatterns = [
     path(
         'signup/',
-        views.SignUp.as_view(),
+        ratelimit('signup', by=('ip',))(views.SignUp.as_view()),
         name='signup'
     ),
     path(
@@ -22,7 +24,9 @@ urlpatterns = [
     ),
     path(
         'login/',
-        LoginView.as_view(template_name='users/login.html'),
+        ratelimit('login', by=('ip',))(
+            LoginView.as_view(template_name='users/login.html')
+        ),
         name='login'
     ),
     path(
@@ -41,11 +45,20 @@ urlpatterns = [
     ),
     path(
         'password_reset_form/',
-        PasswordResetView.as_view(
-            template_name='users/password_reset_form.html'
+        ratelimit('password_reset', by=('ip',))(
+            PasswordResetView.as_view(
+                template_name='users/password_reset_form.html'
+            )
         ),
         name='password_reset_form'
     ),
+    # Перекрываем password_reset/ из django.contrib.auth.urls, чтобы
+    # лимит нельзя было обойти.
+    path(
+        'password_reset/',
+        ratelimit('password_reset', by=('ip',))(PasswordResetView.as_view()),
+        name='password_reset'
+    ),
     path(
         'password_reset_done/',
         PasswordChangeDoneView.as_view(
@@ -36,18 +36,25 @@ ALLOWED_HOSTS = [
 
 INSTALLED_APPS = [
     'about.apps.AboutConfig',
-    'core.apps.CoreConfig',
     'posts.apps.PostsConfig',
     'users.apps.UsersConfig',
+    'search.apps.SearchConfig',
+    'api.apps.ApiConfig',
     'django.contrib.admin',
     'django.contrib.auth',
     'django.contrib.contenttypes',
     'django.contrib.sessions',
     'django.contrib.messages',
     'django.contrib.staticfiles',
+    'core.apps.CoreConfig',
 ]
 
 MIDDLEWARE = [
+    'core.middleware.static.StaticFilesMiddleware',
+    'core.middleware.instrumentation.InstrumentationMiddleware',
+    'core.middleware.metrics.MetricsMiddleware',
+    'core.middleware.db_routing.PrimaryPinMiddleware',
+    'core.middleware.compression.CompressionMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
@@ -67,8 +74,18 @@ TEMPLATES = [
     {
         'BACKEND': 'django.template.backends.django.DjangoTemplates',
         'DIRS': [TEMPLATES_DIR],
-        'APP_DIRS': True,
         'OPTIONS': {
+            # Скомпилированные шаблоны живут в памяти процесса и при
+            # DEBUG; при правке шаблонов запускайте с TEMPLATES_CACHED=0.
+            'loaders': [
+                'django.template.loaders.filesystem.Loader',
+                'django.template.loaders.app_directories.Loader',
+            ] if os.environ.get('TEMPLATES_CACHED', '1') == '0' else [
+                ('django.template.loaders.cached.Loader', [
+                    'django.template.loaders.filesystem.Loader',
+                    'django.template.loaders.app_directories.Loader',
+                ]),
+            ],
             'context_processors': [
                 'django.template.context_processors.debug',
                 'django.template.context_processors.request',
@@ -88,9 +105,203 @@ WSGI_APPLICATION = 'yatube.wsgi.application'
 
 DATABASES = {
     'default': {
-        'ENGINE': 'django.db.backends.sqlite3',
+        # sqlite3 с пулом соединений, общим для потоков воркера
+        # (core.pool): в конце запроса соединение возвращается в пул,
+        # а не закрывается.
+        'ENGINE': 'core.db.sqlite3_pool',
         'NAME': os.path.join(BASE_DIR, 'db.sqlite3'),
+        'CONN_MAX_AGE': 0,
+        'POOL': {
+            'MIN_SIZE': int(os.environ.get('DATABASE_POOL_MIN_SIZE', 1)),
+            'MAX_SIZE': int(os.environ.get('DATABASE_POOL_MAX_SIZE', 10)),
+            'TIMEOUT': 10,
+            'MAX_IDLE': 300,
+        },
+    }
+}
+
+# Применяются к каждому новому соединению SQLite (core.sqlite): с WAL
+# читатели работают одновременно с единственным писателем, а писатели
+# ждут блокировку busy_timeout мс вместо ошибки "database is locked".
+SQLITE_PRAGMAS = {
+    'busy_timeout': 5000,
+    'journal_mode': 'WAL',
+    'synchronous': 'NORMAL',
+    'cache_size': -20000,
+    'mmap_size': 256 * 1024 * 1024,
+    'temp_store': 'MEMORY',
+}
+
+# Реплики для чтения лент: файлы SQLite через запятую, которые
+# синхронизируются с основной БД (для локальной проверки - копии
+# db.sqlite3). После записи пользователь DATABASE_REPLICA_PIN секунд
+# читает с основной БД, и столько же не кэшируется прочитанное с реплик
+# после сброса тегов кэша.
+
+DATABASE_REPLICAS = []
+
+for number, name in enumerate(
+        filter(None, os.environ.get('DATABASE_REPLICA_FILES', '').split(',')),
+        start=1):
+    DATABASES[f'replica_{number}'] = {
+        'ENGINE': 'core.db.sqlite3_pool',
+        'NAME': name,
+        'POOL': DATABASES['default']['POOL'],
+        'TEST': {'MIRROR': 'default'},
     }
+    DATABASE_REPLICAS.append(f'replica_{number}')
+
+DATABASE_ROUTERS = ['core.db_router.PrimaryReplicaRouter']
+
+DATABASE_REPLICA_PIN = 10
+
+
+# Cache
+# https://docs.djangoproject.com/en/2.2/topics/cache/
+
+CACHES = {
+    # Карточки постов, страницы для анонимов и версии тегов (posts.cache).
+    # Сброс тега при записи должен дойти до всех воркеров, иначе другие
+    # воркеры отдают старые карточки, страницы и ETag до истечения
+    # таймаутов: кэш общий для процессов, как и 'sessions'. Версии тегов
+    # лежат вместе с карточками и страницами, MAX_ENTRIES - с запасом на
+    # все карточки ленты; вытесненный тег лишь сбрасывает свои ключи
+    'default': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'default')
+        ),
+        'OPTIONS': {
+            'MAX_ENTRIES': 50000,
+        },
+    },
+    # Сессии и пользователи сессий: кэш должен быть общим для всех
+    # воркеров, иначе выход, смена пароля и блокировка видны только в
+    # обработавшем их процессе. Файловый кэш общий для процессов одного
+    # сервера; на нескольких серверах - memcached. Кэш хранит pickle:
+    # каталог не должен быть доступен на запись другим пользователям,
+    # поэтому он не в общем /tmp
+    'sessions': {
+        'BACKEND': 'django.core.cache.backends.filebased.FileBasedCache',
+        'LOCATION': os.environ.get(
+            'SESSIONS_CACHE_DIR', os.path.join(BASE_DIR, 'cache', 'sessions')
+        ),
+        'TIMEOUT': 60 * 60,
+        'OPTIONS': {
+            'MAX_ENTRIES': 10000,
+        },
+    },
+}
+
+SESSION_ENGINE = 'users.sessions'
+
+SESSION_CACHE_ALIAS = 'sessions'
+
+AUTHENTICATION_BACKENDS = ['users.backends.CachedModelBackend']
+
+# Тесты работают с файловыми кэшами во временном каталоге, а не в
+# каталогах запущенных воркеров
+
+TEST_RUNNER = 'core.testing.TestRunner'
+
+
+# Полнотекстовый поиск: SQLite FTS5 или search.backends.DatabaseSearchBackend
+
+SEARCH_BACKEND = 'search.backends.SqliteFTS5Backend'
+
+
+# Архив (manage.py archive_posts): посты старше этого срока пачками
+# переезжают из posts_post в posts_archivedpost; страница поста и глубокие
+# страницы профиля читают их оттуда
+
+POSTS_ARCHIVE_AFTER_DAYS = 365
+
+POSTS_ARCHIVE_BATCH_SIZE = 500
+
+
+# Замеры каждого запроса: заголовок Server-Timing и строка JSON в логгере
+# core.instrumentation (чтобы их получать, поставьте ему уровень INFO)
+
+INSTRUMENTATION_ENABLED = True
+
+INSTRUMENTATION_SAMPLE_RATE = 1.0
+
+# /metrics в текстовом формате Prometheus; при нескольких воркерах
+# METRICS_MULTIPROCESS_DIR указывает на общий каталог, тогда любой воркер
+# отдает сумму по всем. Страница открыта сотрудникам сайта и адресам из
+# METRICS_ALLOWED_IPS (адрес сборщика метрик, через запятую в переменной
+# окружения); по умолчанию список пуст. За обратным прокси на том же
+# сервере все запросы приходят с REMOTE_ADDR=127.0.0.1: localhost в
+# список не добавляйте, а закройте /metrics на прокси или откройте адрес
+# сборщика, который ходит к воркеру мимо прокси
+
+METRICS_ENABLED = True
+
+METRICS_ALLOWED_IPS = [
+    address for address in
+    os.environ.get('METRICS_ALLOWED_IPS', '').split(',') if address
+]
+
+METRICS_MULTIPROCESS_DIR = os.environ.get('METRICS_MULTIPROCESS_DIR')
+
+METRICS_FLUSH_INTERVAL = 5
+
+# gzip для HTML и других текстовых ответов: тела короче GZIP_MIN_LENGTH
+# и типы содержимого, начинающиеся с GZIP_EXCLUDED_TYPES, уходят как есть
+
+GZIP_LEVEL = 6
+
+GZIP_MIN_LENGTH = 1024
+
+GZIP_EXCLUDED_TYPES = [
+    'image/', 'audio/', 'video/', 'font/woff',
+    'application/gzip', 'application/zip', 'application/x-bzip',
+    'application/x-xz', 'application/pdf', 'application/octet-stream',
+]
+
+# Лимиты частоты для записи и форм входа (core.ratelimit): ведро токенов
+# на политику, 'число/период' с периодом s, m, h или d. LocalStorage
+# держит ведра в процессе, CacheStorage делит их через RATELIMIT_CACHE
+
+RATELIMIT_ENABLED = True
+
+RATELIMIT_STORAGE = 'core.ratelimit.LocalStorage'
+
+RATELIMIT_CACHE = 'default'
+
+RATELIMITS = {
+    'post_create': '10/m',
+    'login': '10/m',
+    'signup': '5/m',
+    'password_reset': '5/h',
+}
+
+# Прогрев воркера при загрузке yatube.wsgi: шаблоны, таблицы URL,
+# переводы и валидаторы паролей готовы до первого запроса. Команды
+# manage.py не прогреваются, вручную - manage.py warmup
+
+WARMUP_ON_START = os.environ.get('WARMUP_ON_START', '1') == '1'
+
+LOGGING = {
+    'version': 1,
+    'disable_existing_loggers': False,
+    'handlers': {
+        'console': {
+            'class': 'logging.StreamHandler',
+        },
+    },
+    'loggers': {
+        'core.instrumentation': {
+            'handlers': ['console'],
+            'level': os.environ.get('INSTRUMENTATION_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+        'core.warmup': {
+            'handlers': ['console'],
+            'level': os.environ.get('WARMUP_LOG_LEVEL', 'WARNING'),
+            'propagate': False,
+        },
+    },
 }
 
 
@@ -132,6 +343,13 @@ USE_TZ = True
 
 STATIC_URL = '/static/'
 
+# manage.py collectstatic складывает сюда копии с хэшем содержимого в
+# имени и их .gz; отдает их core.middleware.static.StaticFilesMiddleware
+
+STATIC_ROOT = os.path.join(BASE_DIR, 'staticfiles')
+
+STATICFILES_STORAGE = 'core.staticfiles.CompressedManifestStaticFilesStorage'
+
 LOGIN_URL = 'users:login'
 LOGIN_REDIRECT_URL = 'posts:index'
 
@@ -9,8 +9,15 @@ https://docs.djangoproject.com/en/2.2/howto/deployment/wsgi/
 
 import os
 
+from django.conf import settings
 from django.core.wsgi import get_wsgi_application
 
 os.environ.setdefault('DJANGO_SETTINGS_MODULE', 'yatube.settings')
 
 application = get_wsgi_application()
+
+# Прогреваем только обслуживающий запросы процесс: приложения уже
+# загружены, а migrate и другие команды manage.py сюда не приходят.
+if settings.WARMUP_ON_START:
+    from core import warmup
+    warmup.run()